@@ -0,0 +1,38 @@
+# admission.py - Admission control for lookups under overload
+# Jab bahut saare lookups already chal rahe ho ya updates late pahunch rahe ho,
+# naya lookup queue karne ki jagah turant "busy" reply milta hai.
+
+
+class AdmissionController:
+    """Bounds in-flight lookups globally and per command.
+
+    Runs on the event loop only, so plain ints are enough. try_admit()
+    returns None when the lookup may proceed (call release() afterwards),
+    otherwise the reason it was shed.
+    """
+
+    def __init__(self, max_in_flight=50, max_in_flight_per_command=15, max_queue_delay=10.0):
+        self.max_in_flight = max_in_flight
+        self.max_in_flight_per_command = max_in_flight_per_command
+        self.max_queue_delay = max_queue_delay
+        self.in_flight = 0
+        self.per_command = {}
+
+    def try_admit(self, cmd, queue_delay=0.0):
+        if queue_delay > self.max_queue_delay:
+            return "queue_delay"
+        if self.in_flight >= self.max_in_flight:
+            return "global_limit"
+        if self.per_command.get(cmd, 0) >= self.max_in_flight_per_command:
+            return "command_limit"
+        self.in_flight += 1
+        self.per_command[cmd] = self.per_command.get(cmd, 0) + 1
+        return None
+
+    def release(self, cmd):
+        self.in_flight -= 1
+        remaining = self.per_command[cmd] - 1
+        if remaining:
+            self.per_command[cmd] = remaining
+        else:
+            del self.per_command[cmd]
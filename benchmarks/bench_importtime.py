@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# benchmarks/bench_importtime.py - Where cold-start time goes: imports and DB init
+#
+# Usage: python benchmarks/bench_importtime.py [--runs N] [--top N]
+#
+# 1. Runs `python -X importtime -c "import main"` N times in fresh
+#    processes and prints the median cumulative time of the heaviest
+#    imports plus the self time of the bot's own modules.
+# 2. Times post_init's database work (init_db + initial admin seeding)
+#    on a fresh database and again on an up-to-date one.
+# Run it on two checkouts to compare before/after.
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_MODULES = {os.path.splitext(f)[0] for f in os.listdir(ROOT) if f.endswith(".py")}
+
+
+def parse_importtime(stderr):
+    """{module: (self_us, cumulative_us, depth)} from -X importtime output."""
+    result = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        result[name.strip()] = (int(self_us), int(cumulative), depth)
+    return result
+
+
+def import_runs(runs):
+    samples = defaultdict(list)
+    walls = []
+    env = dict(os.environ, BOT_TOKEN="")
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import main"],
+            cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+        )
+        walls.append(time.perf_counter() - start)
+        for name, values in parse_importtime(proc.stderr).items():
+            samples[name].append(values)
+    return walls, samples
+
+
+async def db_init_times(admins):
+    workdir = tempfile.mkdtemp(prefix="osint-importtime-")
+    os.environ["DB_PATH"] = os.path.join(workdir, "bench.db")
+    sys.path.insert(0, ROOT)
+    import database
+
+    timings = {}
+    for label in ("fresh", "current"):
+        start = time.perf_counter()
+        await database.init_db()
+        await database.add_admins(admins, 1)
+        timings[label] = time.perf_counter() - start
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time and DB-init startup benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--admins", type=int, default=10)
+    args = parser.parse_args()
+
+    walls, samples = import_runs(args.runs)
+    median = lambda values, i: statistics.median(v[i] for v in values)
+    print(f"python -c 'import main': median {statistics.median(walls) * 1000:.0f} ms wall "
+          f"({args.runs} runs, includes interpreter startup)")
+    print(f"  import main: {median(samples['main'], 1) / 1000:.1f} ms cumulative\n")
+
+    direct = [(name, median(v, 1)) for name, v in samples.items() if v[0][2] == 1]
+    direct.sort(key=lambda item: item[1], reverse=True)
+    print("Heaviest imports made by main (median cumulative ms):")
+    for name, cumulative in direct[:args.top]:
+        print(f"  {cumulative / 1000:8.1f}  {name}")
+
+    own = sorted(((name, median(v, 0)) for name, v in samples.items() if name in REPO_MODULES),
+                 key=lambda item: item[1], reverse=True)
+    print("\nBot modules (median self ms):")
+    for name, self_us in own:
+        print(f"  {self_us / 1000:8.2f}  {name}")
+
+    timings = asyncio.run(db_init_times(list(range(1000, 1000 + args.admins))))
+    print(f"\npost_init DB work ({args.admins} initial admins): "
+          f"fresh {timings['fresh'] * 1000:.1f} ms, schema current {timings['current'] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
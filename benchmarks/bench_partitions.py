@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# benchmarks/bench_partitions.py - Recent-window query times as lookup history grows
+#
+# Usage: python benchmarks/bench_partitions.py [--years 1 2 4] [--per-day 1000] [--repeat 5]
+#
+# Builds a synthetic lookups history ending today (per-day rows, a few
+# heavy users, blob hashes from a small pool) for each history length, in
+# two layouts:
+#   single      - schema v1: one lookups table, queried with the old SQL
+#   partitioned - database.py: lookups_YYYYMM tables + query router
+# and times the admin queries that only need recent data (/dailystats 7,
+# /userlookups, /export of the last 7 days) plus all-time /lookupstats.
+# Best of --repeat runs; the first (cold) partitioned /lookupstats call
+# is shown separately because closed months are counted once per process.
+
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiosqlite  # noqa: E402
+
+import database  # noqa: E402
+from config import COMMANDS  # noqa: E402
+
+HEAVY_USER = 42
+
+
+def synthetic_rows(years, per_day, seed):
+    """(user_id, command, query, result_hash, timestamp) oldest first, ending now (UTC)."""
+    rng = random.Random(seed)
+    commands = list(COMMANDS)
+    hashes = [bytes([i]) * 16 for i in range(64)]
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    days = int(years * 365)
+    for day in range(days, -1, -1):
+        base = now - timedelta(days=day)
+        for i in range(per_day):
+            ts = base - timedelta(seconds=rng.randrange(86400)) if day else now - timedelta(seconds=i)
+            user = HEAVY_USER if rng.random() < 0.01 else rng.randint(1, 50000)
+            yield (user, rng.choice(commands), f"q{rng.randrange(10 ** 6)}",
+                   rng.choice(hashes), ts.strftime('%Y-%m-%d %H:%M:%S'))
+
+
+def build_single(path, rows):
+    db = sqlite3.connect(path)
+    db.execute('''
+        CREATE TABLE lookups (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER, command TEXT, query TEXT, result TEXT, result_hash BLOB,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    db.execute('CREATE TABLE result_blobs (hash BLOB PRIMARY KEY, body TEXT NOT NULL)')
+    db.executemany('INSERT INTO result_blobs VALUES (?, ?)', [(bytes([i]) * 16, '{}') for i in range(64)])
+    db.executemany('INSERT INTO lookups (user_id, command, query, result_hash, timestamp) VALUES (?, ?, ?, ?, ?)', rows)
+    db.commit()
+    db.close()
+
+
+async def build_partitioned(path, rows):
+    database.DB_PATH = path
+    await database.init_db()
+    by_month = {}
+    for row in rows:
+        by_month.setdefault(row[4][:7].replace('-', ''), []).append(row)
+    async with aiosqlite.connect(path) as db:
+        for month in by_month:
+            await database._create_partition(db, month)
+        await database._rebuild_lookup_views(db)
+        await db.commit()
+    db = sqlite3.connect(path)
+    db.executemany('INSERT OR IGNORE INTO result_blobs VALUES (?, ?)', [(bytes([i]) * 16, '{}') for i in range(64)])
+    for month, month_rows in by_month.items():
+        db.executemany(f'INSERT INTO {database.partition_table(month)} (user_id, command, query, result_hash, timestamp) '
+                       f'VALUES (?, ?, ?, ?, ?)', month_rows)
+    db.commit()
+    db.close()
+
+
+# Schema v1 queries, as database.py ran them before partitioning
+async def single_daily_stats(path, days=7):
+    since = (datetime.now() - timedelta(days=days)).date().isoformat()
+    async with aiosqlite.connect(path) as db:
+        async with db.execute('''
+            SELECT date(timestamp) as day, command, COUNT(*)
+            FROM lookups WHERE date(timestamp) >= ?
+            GROUP BY day, command ORDER BY day DESC
+        ''', (since,)) as cursor:
+            return await cursor.fetchall()
+
+
+async def single_user_lookups(path, user_id, limit=10):
+    async with aiosqlite.connect(path) as db:
+        async with db.execute('''
+            SELECT command, query, timestamp FROM lookups
+            WHERE user_id = ? ORDER BY timestamp DESC LIMIT ?
+        ''', (user_id, limit)) as cursor:
+            return await cursor.fetchall()
+
+
+async def single_export(path, since, chunk=1000):
+    sql = ("SELECT l.id, l.user_id, l.command, l.query, b.body, l.timestamp FROM lookups l "
+           "LEFT JOIN result_blobs b ON b.hash = l.result_hash WHERE l.id > ? AND l.timestamp >= ? ORDER BY l.id LIMIT ?")
+    total, last_id = 0, 0
+    async with aiosqlite.connect(path) as db:
+        while True:
+            async with db.execute(sql, (last_id, since, chunk)) as cursor:
+                rows = await cursor.fetchall()
+            if not rows:
+                return total
+            total += len(rows)
+            last_id = rows[-1][0]
+
+
+async def single_lookup_stats(path, limit=10):
+    async with aiosqlite.connect(path) as db:
+        async with db.execute('''
+            SELECT command, COUNT(*) as cnt FROM lookups
+            GROUP BY command ORDER BY cnt DESC LIMIT ?
+        ''', (limit,)) as cursor:
+            return await cursor.fetchall()
+
+
+async def partitioned_export(since):
+    total = 0
+    async for chunk in database.iter_lookups(since=since):
+        total += len(chunk)
+    return total
+
+
+async def best_ms(factory, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await factory()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+async def run(args):
+    since = (datetime.now(timezone.utc) - timedelta(days=7)).strftime('%Y-%m-%d')
+    print(f"{'years':>5}{'rows':>10} {'layout':<12}{'daily7 ms':>10}{'user ms':>9}{'export7 ms':>11}"
+          f"{'stats ms':>10}{'stats cold':>11}")
+    for years in args.years:
+        rows = list(synthetic_rows(years, args.per_day, args.seed))
+        workdir = tempfile.mkdtemp(prefix="osint-partitions-")
+        try:
+            single = os.path.join(workdir, "single.db")
+            build_single(single, rows)
+            timings = [
+                await best_ms(lambda: single_daily_stats(single), args.repeat),
+                await best_ms(lambda: single_user_lookups(single, HEAVY_USER), args.repeat),
+                await best_ms(lambda: single_export(single, since), args.repeat),
+                await best_ms(lambda: single_lookup_stats(single), args.repeat),
+            ]
+            print(f"{years:>5}{len(rows):>10} {'single':<12}" + "".join(
+                f"{t:>{w}.1f}" for t, w in zip(timings, (10, 9, 11, 10))) + f"{'-':>11}")
+
+            partitioned = os.path.join(workdir, "partitioned.db")
+            await build_partitioned(partitioned, rows)
+            database._closed_counts.clear()
+            cold = await best_ms(lambda: database.get_lookup_stats(), 1)
+            timings = [
+                await best_ms(lambda: database.get_daily_stats(7), args.repeat),
+                await best_ms(lambda: database.get_user_lookups(HEAVY_USER, 10), args.repeat),
+                await best_ms(lambda: partitioned_export(since), args.repeat),
+                await best_ms(lambda: database.get_lookup_stats(), args.repeat),
+            ]
+            print(f"{'':>15} {'partitioned':<12}" + "".join(
+                f"{t:>{w}.1f}" for t, w in zip(timings, (10, 9, 11, 10))) + f"{cold:>11.1f}")
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lookup partitioning benchmark")
+    parser.add_argument("--years", type=float, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--per-day", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
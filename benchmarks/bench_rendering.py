@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# benchmarks/bench_rendering.py - Old vs render.py response rendering on large payloads
+#
+# Usage: python benchmarks/bench_rendering.py [--number N] [--scale K]
+#
+# Per lookup the bot renders the user reply (HTML <pre>) and the log channel
+# message (MarkdownV2 code block) from the same pretty-printed JSON, and
+# /start, /help, /admin render the command lists. "old" re-creates the
+# previous inline code; "new" is render.py. Also shows why escaping of big
+# bodies uses replace chains rather than str.translate tables.
+
+import argparse
+import html
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import render  # noqa: E402
+from config import COMMANDS, CMD_LIST_FOOTER  # noqa: E402
+from payloads import PAYLOADS  # noqa: E402
+
+FOOTER = render.RESULT_FOOTER
+ESCAPE_CHARS = ['_', '*', '[', ']', '(', ')', '~', '`', '>', '#', '+', '-', '=', '|', '{', '}', '.', '!']
+HTML_TABLE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+ADMIN_LINES = tuple(f"`/admin{i}` - admin command {i}" for i in range(26))
+
+
+def old_escape_md(text):
+    for ch in ESCAPE_CHARS:
+        text = text.replace(ch, '\\' + ch)
+    return text
+
+
+def old_render(json_str, username, cmd, query):
+    output_html = f"<pre>{html.escape(json_str)}</pre>{FOOTER}"
+    log_text = (
+        f"👤 *User:* 1 (@{old_escape_md(username)})\n"
+        f"🔍 *Command:* /{cmd}\n"
+        f"📝 *Query:* `{old_escape_md(query)}`\n\n"
+        f"```json\n{json_str}\n```"
+    )
+    return output_html, log_text
+
+
+def new_render(json_str, username, cmd, query):
+    return render.result_html(json_str), render.log_markdown(1, username, cmd, query, json_str)
+
+
+def old_commands_text():
+    lines = ["📋 **AVAILABLE COMMANDS**", "────────────────────────────"]
+    for cmd, info in COMMANDS.items():
+        lines.append(f"• `/{cmd} [{info['param']}]` → {info['desc']}")
+    lines.append(CMD_LIST_FOOTER)
+    admin = ["👑 **ADMIN COMMANDS**", "────────────────────────────", *ADMIN_LINES, CMD_LIST_FOOTER]
+    return "\n".join(lines), "\n".join(admin)
+
+
+def bench(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Response rendering micro-benchmark")
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument("--scale", type=int, default=4, help="payload repeated this many times")
+    args = parser.parse_args()
+
+    static = (render.commands_text(COMMANDS, CMD_LIST_FOOTER),
+              render.admin_commands_text(ADMIN_LINES, CMD_LIST_FOOTER))
+    print(f"command lists: rebuild {bench(old_commands_text, args.number * 10):.1f} us, "
+          f"prebuilt {bench(lambda: static, args.number * 10):.2f} us")
+
+    print(f"\n{'payload':<10}{'bytes':>9}{'old us':>10}{'new us':>10}{'html.escape':>13}"
+          f"{'replace':>10}{'translate':>11}")
+    for name, factory in PAYLOADS.items():
+        json_str = json.dumps([factory() for _ in range(args.scale)], indent=2, ensure_ascii=False)
+        old = bench(lambda: old_render(json_str, "some_user.name", name, "27AAPFU0939F1ZV"), args.number)
+        new = bench(lambda: new_render(json_str, "some_user.name", name, "27AAPFU0939F1ZV"), args.number)
+        escape = bench(lambda: html.escape(json_str), args.number)
+        chain = bench(lambda: render.escape_html(json_str), args.number)
+        table = bench(lambda: json_str.translate(HTML_TABLE), args.number // 10 or 1)
+        print(f"{name:<10}{len(json_str):>9}{old:>10.0f}{new:>10.0f}{escape:>13.0f}{chain:>10.0f}{table:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# benchmarks/bench_result_dedup.py - Inline lookup results vs content-addressed result_blobs
+#
+# Usage: python benchmarks/bench_result_dedup.py [--lookups N] [--seed S]
+#
+# Generates a lookup log shaped like production: popular queries repeat
+# (Zipf-like), pincode/IFSC/GST pools are small, and a share of lookups
+# return the same error or "not found" payload. Then it compares:
+#   inline   - old save_lookup (full JSON in every lookups row)
+#   dedup    - database.save_lookup (result_blobs, one row per distinct body)
+#   migrate  - init_db() run on the inline DB, then VACUUM
+# and prints DB size and insert time for each.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import aiosqlite  # noqa: E402
+
+import database  # noqa: E402
+from config import COMMANDS  # noqa: E402
+from jsonutil import dumps as json_dumps  # noqa: E402
+from payloads import PAYLOADS  # noqa: E402
+
+# Distinct queries seen per command; chhote pools = zyada repeats
+POOL_SIZES = {"pincode": 300, "ifsc": 400, "gst": 500, "ip": 2000}
+DEFAULT_POOL = 5000
+ERROR_RESULTS = [
+    ({"error": "Request timeout"}, 0.10),
+    ({"error": "API returned 502"}, 0.03),
+    ({"status": False, "message": "No record found"}, 0.12),
+]
+
+
+def result_for(cmd, rank):
+    """Deterministic result body for the rank-th distinct query of cmd."""
+    factory = PAYLOADS.get(cmd)
+    if factory is not None:
+        payload = factory()
+        target = payload[0] if isinstance(payload, list) else payload
+        target["query_rank"] = rank
+        return payload
+    rng = random.Random(f"{cmd}:{rank}")
+    return {
+        "status": True,
+        "source": cmd,
+        "data": [
+            {"name": f"Person {rng.randint(1, 10 ** 6)}", "address": "x" * rng.randint(40, 120),
+             "mobile": str(rng.randint(6 * 10 ** 9, 10 ** 10 - 1)), "circle": rng.choice(["DL", "MH", "UP", "KA"])}
+            for _ in range(rng.randint(1, 6))
+        ],
+    }
+
+
+def make_dataset(n, seed):
+    rng = random.Random(seed)
+    commands = list(COMMANDS)
+    cache = {}
+    rows = []
+    for i in range(n):
+        cmd = rng.choice(commands)
+        user_id = rng.randint(1, 2000)
+        roll, acc, result = rng.random(), 0.0, None
+        for payload, share in ERROR_RESULTS:
+            acc += share
+            if roll < acc:
+                result = payload
+                break
+        pool = POOL_SIZES.get(cmd, DEFAULT_POOL)
+        rank = min(int(rng.paretovariate(0.5)), pool)
+        if result is None:
+            key = (cmd, rank)
+            if key not in cache:
+                cache[key] = result_for(cmd, rank)
+            result = cache[key]
+        rows.append((user_id, cmd, f"q{rank}", result))
+    return rows
+
+
+async def old_save_lookup(path, user_id, command, query, result):
+    async with aiosqlite.connect(path) as db:
+        await db.execute('''
+            INSERT INTO lookups (user_id, command, query, result)
+            VALUES (?, ?, ?, ?)
+        ''', (user_id, command, query, json_dumps(result)))
+        await db.execute('UPDATE users SET lookups = lookups + 1 WHERE user_id = ?', (user_id,))
+        await db.commit()
+
+
+async def create_inline_db(path):
+    async with aiosqlite.connect(path) as db:
+        await db.execute('CREATE TABLE users (user_id INTEGER PRIMARY KEY, lookups INTEGER DEFAULT 0)')
+        await db.execute('''
+            CREATE TABLE lookups (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER,
+                command TEXT,
+                query TEXT,
+                result TEXT,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        await db.commit()
+
+
+async def vacuum(path):
+    async with aiosqlite.connect(path) as db:
+        await db.execute('VACUUM')
+
+
+def size_kib(path):
+    return round(os.path.getsize(path) / 1024)
+
+
+async def run(args):
+    rows = make_dataset(args.lookups, args.seed)
+    distinct = len({json_dumps(r[3]) for r in rows})
+    workdir = tempfile.mkdtemp(prefix="osint-dedup-")
+    report = {"lookups": len(rows), "distinct_results": distinct}
+    try:
+        inline_path = os.path.join(workdir, "inline.db")
+        await create_inline_db(inline_path)
+        start = time.perf_counter()
+        for row in rows:
+            await old_save_lookup(inline_path, *row)
+        report["inline"] = {"insert_s": round(time.perf_counter() - start, 3), "size_kib": size_kib(inline_path)}
+
+        dedup_path = os.path.join(workdir, "dedup.db")
+        database.DB_PATH = dedup_path
+        await database.init_db()
+        start = time.perf_counter()
+        for row in rows:
+            await database.save_lookup(*row)
+        report["dedup"] = {"insert_s": round(time.perf_counter() - start, 3), "size_kib": size_kib(dedup_path)}
+
+        migrated_path = os.path.join(workdir, "migrated.db")
+        shutil.copy(inline_path, migrated_path)
+        database.DB_PATH = migrated_path
+        start = time.perf_counter()
+        await database.init_db()
+        elapsed = time.perf_counter() - start
+        before_vacuum = size_kib(migrated_path)
+        await vacuum(migrated_path)
+        report["migrate"] = {"seconds": round(elapsed, 3), "size_kib_before_vacuum": before_vacuum,
+                             "size_kib": size_kib(migrated_path)}
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inline vs deduplicated lookup result storage")
+    parser.add_argument("--lookups", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+    inline, dedup = report["inline"], report["dedup"]
+    print(f"size: {inline['size_kib']} KiB -> {dedup['size_kib']} KiB "
+          f"({1 - dedup['size_kib'] / inline['size_kib']:.0%} smaller), "
+          f"insert: {inline['insert_s']}s -> {dedup['insert_s']}s")
+
+
+if __name__ == "__main__":
+    main()
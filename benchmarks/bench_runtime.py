@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# benchmarks/bench_runtime.py - Lookup throughput / p99 under each runtime profile
+#
+# Usage: python benchmarks/bench_runtime.py [--lookups 2000] [--concurrency 64]
+#                                           [--payload-bytes 20000] [--repeat 3]
+#
+# Runs the e2e harness (stub upstreams, fake Bot API, real main.py in webhook
+# mode) once per setting: default loop + default GC, uvloop only, GC tuning
+# only (gc.freeze after post_init + GC_THRESHOLDS), and RUNTIME_PROFILE=fast.
+# Upstream latency defaults to 0 so the bot process itself is the bottleneck.
+# Settings run interleaved --repeat times; the median run per setting is shown.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+
+import aiohttp
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+from e2e import run_scenario, COMMANDS  # noqa: E402
+from stubs import StubUpstreams, FakeBotAPI  # noqa: E402
+
+SETTINGS = {
+    "default": {"RUNTIME_PROFILE": "default"},
+    "uvloop": {"RUNTIME_UVLOOP": "1"},
+    "gc_tuned": {"RUNTIME_GC_FREEZE": "1", "GC_THRESHOLDS": "50000,20,100"},
+    "fast": {"RUNTIME_PROFILE": "fast"},
+}
+
+
+async def main_async(args):
+    stubs = StubUpstreams(COMMANDS, latency=args.upstream_latency, payload_bytes=args.payload_bytes)
+    fake = FakeBotAPI()
+    stub_url = await stubs.start()
+    fake_url = await fake.start()
+    runs = {name: [] for name in args.settings}
+    try:
+        async with aiohttp.ClientSession() as session:
+            for _ in range(args.repeat):
+                for name in args.settings:
+                    result = await run_scenario(args, 1, stub_url, fake, fake_url, session, SETTINGS[name])
+                    runs[name].append(result)
+                    print(json.dumps({"setting": name, **result}), file=sys.stderr)
+    finally:
+        await stubs.stop()
+        await fake.stop()
+    return runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runtime profile benchmark")
+    parser.add_argument("--settings", nargs="+", default=list(SETTINGS), choices=list(SETTINGS))
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--upstream-latency", type=float, default=0.0)
+    parser.add_argument("--payload-bytes", type=int, default=20000)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    args.realistic_limits = False
+    random.seed(args.seed)
+
+    try:
+        import uvloop  # noqa: F401
+    except ImportError:
+        print("note: uvloop not installed, uvloop/fast fall back to the default loop", file=sys.stderr)
+
+    runs = asyncio.run(main_async(args))
+    print(f"\n{'setting':<10}{'lookups/s':>11}{'p50 ms':>9}{'p99 ms':>9}{'failed':>8}{'log err':>9}")
+    for name, results in runs.items():
+        median = sorted(results, key=lambda r: r["lookups_per_sec"])[len(results) // 2]
+        p99 = statistics.median(r["latency_ms"]["p99"] or 0 for r in results)
+        print(f"{name:<10}{median['lookups_per_sec']:>11}{median['latency_ms']['p50']:>9}{p99:>9}"
+              f"{sum(r['failed'] for r in results):>8}{sum(r['log_errors'] for r in results):>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# benchmarks/bench_serialization.py - stdlib json vs orjson on lookup payloads
+#
+# Usage: python benchmarks/bench_serialization.py [--number N]
+# Measures the per-lookup serialization work: pretty dump for the reply,
+# compact dump for save_lookup and parsing the raw upstream body.
+
+import argparse
+import json
+import timeit
+
+from payloads import PAYLOADS
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def stdlib_ops(obj, raw):
+    return {
+        "dumps_indent": lambda: json.dumps(obj, indent=2, ensure_ascii=False),
+        "dumps_compact": lambda: json.dumps(obj, ensure_ascii=False),
+        "loads": lambda: json.loads(raw),
+    }
+
+
+def orjson_ops(obj, raw):
+    return {
+        "dumps_indent": lambda: orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8"),
+        "dumps_compact": lambda: orjson.dumps(obj).decode("utf-8"),
+        "loads": lambda: orjson.loads(raw),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="stdlib json vs orjson")
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    backends = [("json", stdlib_ops)]
+    if orjson is not None:
+        backends.append(("orjson", orjson_ops))
+    else:
+        print("orjson not installed, only stdlib json measured")
+
+    print(f"{'payload':<10} {'bytes':>8} {'op':<14} " + " ".join(f"{name + ' µs':>12}" for name, _ in backends))
+    for name, factory in PAYLOADS.items():
+        obj = factory()
+        raw = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        results = {}
+        for backend, ops in backends:
+            for op, fn in ops(obj, raw).items():
+                secs = min(timeit.repeat(fn, number=args.number, repeat=3))
+                results.setdefault(op, []).append(secs / args.number * 1e6)
+        for op, timings in results.items():
+            cols = " ".join(f"{t:>12.1f}" for t in timings)
+            print(f"{name:<10} {len(raw):>8} {op:<14} {cols}")
+
+
+if __name__ == "__main__":
+    main()
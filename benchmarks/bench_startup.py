@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# benchmarks/bench_startup.py - Time-to-ready and idle memory of main.py
+#
+# Usage: python benchmarks/bench_startup.py [--runs N] [--idle SECONDS] [--root CHECKOUT]
+# Starts `python main.py` on a free port, polls GET / until it answers,
+# waits for the process to settle and reads VmRSS from /proc (Linux only).
+# Before/after: --root points at another checkout (e.g. a `git worktree` of
+# the older commit), so the same script times both. BOT_TOKEN is taken from
+# the environment; without it only the web server starts.
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def rss_kib(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def one_run(root, idle):
+    port = free_port()
+    env = dict(os.environ, PORT=str(port))
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "main.py"], cwd=root, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            if proc.poll() is not None:
+                raise RuntimeError("main.py exited during startup")
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1).read()
+                break
+            except OSError:
+                time.sleep(0.01)
+        ready = time.perf_counter() - start
+        time.sleep(idle)
+        return ready, rss_kib(proc.pid)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="main.py startup benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--idle", type=float, default=3.0)
+    parser.add_argument("--root", default=ROOT, help="checkout whose main.py is started")
+    args = parser.parse_args()
+
+    readies, rss = [], []
+    for _ in range(args.runs):
+        r, m = one_run(args.root, args.idle)
+        readies.append(r)
+        rss.append(m)
+    print(json.dumps({
+        "runs": args.runs,
+        "ready_seconds_median": round(statistics.median(readies), 3),
+        "ready_seconds_min": round(min(readies), 3),
+        "idle_rss_kib_median": int(statistics.median(rss)),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
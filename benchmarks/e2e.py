@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+# benchmarks/e2e.py - End-to-end throughput/latency benchmark, fully offline
+#
+# Usage:
+#   python benchmarks/e2e.py [--workers 1 2 4] [--concurrency 32] [--lookups 500]
+#                            [--upstream-latency 0.2] [--payload-bytes 2000]
+#                            [--error-rate 0.0] [--realistic-limits]
+#
+# Starts stub upstream servers and a fake Bot API, then runs the real
+# main.py (webhook mode, WORKERS=N) against them and POSTs synthetic
+# command updates to its webhook with `concurrency` virtual users. A
+# lookup is complete when the fake Bot API sees the reply quoting it.
+# Writes one JSON report per run to benchmarks/results/.
+#
+# By default the bot's own rate limits, send scheduler and load shedding
+# are switched off so the numbers reflect the code path, not the policy;
+# --realistic-limits keeps production settings.
+#
+# The bot's log is scanned after each run (before shutdown): ERROR records
+# and stray tracebacks are reported as log_errors and make the script exit 1,
+# so a run that "completes" while every log post fails is not green.
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiohttp
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+
+from config import COMMANDS  # noqa: E402
+from stubs import StubUpstreams, FakeBotAPI, command_update, free_port  # noqa: E402
+
+SECRET = "bench-secret"
+TEXT_RECORD = re.compile(r"^\d{4}-\d\d-\d\d [\d:,]+ - \S+ - (\w+) - ")
+ERROR_LEVELS = {"ERROR", "CRITICAL"}
+
+
+def lookup_mix():
+    """(command text) for every command, using its canary query."""
+    return [f"/{cmd} {info['canary']}" for cmd, info in COMMANDS.items() if info.get("canary")]
+
+
+def scrape_total(text, metric):
+    total = 0.0
+    for line in text.splitlines():
+        if line.startswith(metric) and not line.startswith("#"):
+            name = line.split("{", 1)[0].split(" ", 1)[0]
+            if name == metric:
+                total += float(line.rsplit(" ", 1)[1])
+    return total
+
+
+def log_errors(path):
+    """First line of every ERROR/CRITICAL record and of every traceback not attached to one."""
+    errors, in_error = [], False
+    with open(path, errors="replace") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            level = None
+            match = TEXT_RECORD.match(line)
+            if match:
+                level = match.group(1)
+            elif line.startswith("{"):
+                try:
+                    level = json.loads(line).get("level")
+                except ValueError:
+                    pass
+            if level is not None:
+                in_error = level in ERROR_LEVELS
+                if in_error:
+                    errors.append(line[:300])
+            elif line.startswith("Traceback (most recent call last)") and not in_error:
+                errors.append(line)
+    return errors
+
+
+def report_log_errors(errors, limit=5):
+    if errors:
+        print(f"{len(errors)} error(s) in the bot log:", file=sys.stderr)
+        for line in errors[:limit]:
+            print(f"  {line}", file=sys.stderr)
+
+
+async def wait_healthy(session, url, proc, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("bot process exited during startup")
+        try:
+            async with session.get(url) as resp:
+                if resp.status == 200 and (await resp.json()).get("status") == "healthy":
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError(f"{url} did not become healthy")
+
+
+async def scrape_metrics(session, ports):
+    db_ops = 0.0
+    for port in ports:
+        async with session.get(f"http://127.0.0.1:{port}/metrics") as resp:
+            db_ops += scrape_total(await resp.text(), "osint_db_duration_seconds_count")
+    return db_ops
+
+
+@contextlib.asynccontextmanager
+async def running_bot(session, workers, fake_url, stub_url, realistic_limits=False, extra_env=None):
+    """Run main.py in webhook mode against the fakes; yields (webhook URL, metrics ports, log path)."""
+    port = free_port()
+    base_port = free_port()
+    metric_ports = [base_port + i for i in range(workers)] if workers > 1 else [port]
+    workdir = tempfile.mkdtemp(prefix="osint-bench-")
+    env = dict(
+        os.environ,
+        BOT_TOKEN="123456:BENCHMARK",
+        BOT_API_BASE_URL=fake_url,
+        UPDATE_MODE="webhook",
+        WEBHOOK_URL=f"http://127.0.0.1:{port}",
+        WEBHOOK_SECRET=SECRET,
+        PORT=str(port),
+        WORKERS=str(workers),
+        WORKER_BASE_PORT=str(base_port),
+        DB_PATH=os.path.join(workdir, "bench.db"),
+        UPSTREAM_STUB_URL=stub_url,
+        PROBE_ENABLED="0",
+        INITIAL_ADMINS="1",
+        OWNER_ID="1",
+        # Virtual users repeat the same canary lookups on purpose
+        DEDUPE_ENABLED="0",
+    )
+    if not realistic_limits:
+        env.update(RATE_LIMITS_ENABLED="0", SEND_LIMITS_ENABLED="0",
+                   MAX_IN_FLIGHT="100000", MAX_IN_FLIGHT_PER_COMMAND="100000", MAX_QUEUE_DELAY="3600")
+    env.update(extra_env or {})
+    log_path = os.path.join(workdir, "bot.log")
+    log = open(log_path, "w")
+    proc = subprocess.Popen([sys.executable, os.path.join(ROOT, "main.py")], cwd=workdir, env=env,
+                            stdout=log, stderr=subprocess.STDOUT)
+    try:
+        await wait_healthy(session, f"http://127.0.0.1:{port}/health", proc)
+        for p in metric_ports:
+            await wait_healthy(session, f"http://127.0.0.1:{p}/health", proc)
+        yield f"http://127.0.0.1:{port}/telegram/webhook", metric_ports, log_path
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+        log.close()
+
+
+async def send_and_wait(session, fake, webhook, chat_id, message_id, update, timeout):
+    """POST one update to the bot; return seconds until its reply, or None on failure."""
+    reply = fake.expect_reply(chat_id, message_id)
+    start = time.perf_counter()
+    async with session.post(webhook, json=update, headers={"X-Telegram-Bot-Api-Secret-Token": SECRET}) as resp:
+        if resp.status != 200:
+            fake.forget(chat_id, message_id)
+            return None
+    try:
+        return await asyncio.wait_for(reply, timeout=timeout) - start
+    except asyncio.TimeoutError:
+        fake.forget(chat_id, message_id)
+        return None
+
+
+def latency_summary(latencies):
+    if not latencies:
+        return {"p50": None, "p99": None, "max": None}
+    latencies = sorted(latencies)
+    return {
+        "p50": round(statistics.median(latencies) * 1000, 1),
+        "p99": round(latencies[max(0, int(len(latencies) * 0.99) - 1)] * 1000, 1),
+        "max": round(latencies[-1] * 1000, 1),
+    }
+
+
+async def run_scenario(args, workers, stub_url, fake, fake_url, session, extra_env=None):
+    async with running_bot(session, workers, fake_url, stub_url, args.realistic_limits,
+                           extra_env) as (webhook, metric_ports, log_path):
+        texts = lookup_mix()
+        latencies, failures = [], 0
+        remaining = [args.lookups]
+
+        async def one_lookup(vu):
+            nonlocal failures
+            chat_id = -1001000000000 - vu
+            message_id, update = command_update(100000 + vu, chat_id, random.choice(texts))
+            latency = await send_and_wait(session, fake, webhook, chat_id, message_id, update, args.timeout)
+            if latency is None:
+                failures += 1
+            else:
+                latencies.append(latency)
+
+        async def virtual_user(vu):
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                await one_lookup(vu)
+
+        # Warm-up: connections, DB file, code paths
+        await asyncio.gather(*(one_lookup(vu) for vu in range(min(args.concurrency, 8))))
+        latencies.clear()
+        failures = 0
+        db_before = await scrape_metrics(session, metric_ports)
+        calls_before = sum(fake.calls.values())
+
+        start = time.perf_counter()
+        await asyncio.gather(*(virtual_user(vu) for vu in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+
+        db_ops = await scrape_metrics(session, metric_ports) - db_before
+        tg_calls = sum(fake.calls.values()) - calls_before
+        completed = len(latencies)
+        # Shutdown se pehle: terminate ke waqt ke pending-request errors run ka hissa nahi
+        errors = log_errors(log_path)
+        report_log_errors(errors)
+        return {
+            "workers": workers,
+            "lookups": args.lookups,
+            "completed": completed,
+            "failed": failures,
+            "duration_s": round(elapsed, 3),
+            "lookups_per_sec": round(completed / elapsed, 2),
+            "latency_ms": latency_summary(latencies),
+            "db_ops_per_lookup": round(db_ops / completed, 2) if completed else None,
+            "telegram_calls_per_lookup": round(tg_calls / completed, 2) if completed else None,
+            "log_errors": len(errors),
+            "log_error_samples": errors[:5],
+        }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main_async(args):
+    stubs = StubUpstreams(COMMANDS, latency=args.upstream_latency,
+                          payload_bytes=args.payload_bytes, error_rate=args.error_rate)
+    fake = FakeBotAPI()
+    stub_url = await stubs.start()
+    fake_url = await fake.start()
+    runs = []
+    try:
+        async with aiohttp.ClientSession() as session:
+            for workers in args.workers:
+                result = await run_scenario(args, workers, stub_url, fake, fake_url, session)
+                print(json.dumps(result))
+                runs.append(result)
+    finally:
+        await stubs.stop()
+        await fake.stop()
+    return runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end OSINT bot benchmark")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--lookups", type=int, default=500)
+    parser.add_argument("--upstream-latency", type=float, default=0.2)
+    parser.add_argument("--payload-bytes", type=int, default=2000)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--realistic-limits", action="store_true")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    runs = asyncio.run(main_async(args))
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": git_revision(),
+        "python": sys.version.split()[0],
+        "params": {k: v for k, v in vars(args).items()},
+        "runs": runs,
+    }
+    out_dir = os.path.join(HERE, "results")
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"e2e-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"report written to {path}")
+    if any(run["log_errors"] for run in runs):
+        sys.exit("bot logged errors during the run, see log_error_samples")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# benchmarks/payloads.py - Representative upstream payloads for benchmarks
+# Shapes roughly follow real /gst, /vchalan and /pincode responses.
+
+import random
+
+
+def gst_payload(filings=120):
+    """GST registration with a long filing history."""
+    return {
+        "gstin": "27AAPFU0939F1ZV",
+        "legal_name": "ÜBER TRADING & CO. प्राइवेट लिमिटेड",
+        "trade_name": "Uber Traders",
+        "status": "Active",
+        "registration_date": "2017-07-01",
+        "address": {
+            "building": "Shop No. 12, Ground Floor",
+            "street": "M.G. Road",
+            "city": "Pune",
+            "state": "Maharashtra",
+            "pincode": "411001",
+        },
+        "nature_of_business": ["Wholesale Business", "Retail Business", "Office / Sale Office"],
+        "filings": [
+            {
+                "return_type": random.choice(["GSTR1", "GSTR3B"]),
+                "period": f"{m % 12 + 1:02d}{2017 + m // 12}",
+                "filed_on": f"{2017 + m // 12}-{m % 12 + 1:02d}-11",
+                "status": "Filed",
+                "mode": "ONLINE",
+            }
+            for m in range(filings)
+        ],
+    }
+
+
+def vchalan_payload(chalans=40):
+    """Vehicle registration with pending and paid chalans."""
+    return {
+        "registration": "MH12AB1234",
+        "owner": "R***** K****",
+        "pending": [
+            {
+                "chalan_no": f"MH{random.randint(10**11, 10**12 - 1)}",
+                "date": "2024-03-14 18:22:05",
+                "location": "Shivajinagar Junction, Pune — सिग्नल",
+                "offence": "Jumping red light / Not wearing helmet",
+                "amount": random.choice([500, 1000, 2000]),
+                "status": "Pending",
+            }
+            for _ in range(chalans // 2)
+        ],
+        "paid": [
+            {
+                "chalan_no": f"MH{random.randint(10**11, 10**12 - 1)}",
+                "date": "2023-11-02 09:10:44",
+                "location": "Hinjewadi Phase 1",
+                "offence": "Over speeding",
+                "amount": 2000,
+                "status": "Paid",
+                "receipt": None,
+            }
+            for _ in range(chalans - chalans // 2)
+        ],
+    }
+
+
+def pincode_payload(offices=30):
+    """postalpincode.in style list response."""
+    return [
+        {
+            "Message": f"Number of pincode(s) found:{offices}",
+            "Status": "Success",
+            "PostOffice": [
+                {
+                    "Name": f"Post Office {i}",
+                    "Description": None,
+                    "BranchType": random.choice(["Sub Post Office", "Branch Post Office"]),
+                    "DeliveryStatus": random.choice(["Delivery", "Non-Delivery"]),
+                    "Circle": "Maharashtra",
+                    "District": "Pune",
+                    "Division": "Pune City East",
+                    "Region": "Pune",
+                    "Block": "Haveli",
+                    "State": "Maharashtra",
+                    "Country": "India",
+                    "Pincode": "411001",
+                }
+                for i in range(offices)
+            ],
+        }
+    ]
+
+
+PAYLOADS = {
+    "gst": gst_payload,
+    "vchalan": vchalan_payload,
+    "pincode": pincode_payload,
+}
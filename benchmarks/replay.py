@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# benchmarks/replay.py - Replay a captured traffic file against the real bot, offline
+#
+# Usage:
+#   python benchmarks/replay.py capture.jsonl [--speed 1.0] [--workers 1]
+#                               [--payload-bytes 2000] [--realistic-limits]
+#
+# Capture file: bot ko CAPTURE_PATH=/path/capture.jsonl ke saath chalao (see
+# capture.py). Replay me har captured command usi relative time (t / speed)
+# pe webhook ko POST hota hai. Hashed chat/user IDs synthetic IDs ban jaate
+# hain aur hashed queries per-command valid synthetic queries - same hash,
+# same query, isliye cache hits aur repeat lookups production jaise rehte hain.
+# Upstream stubs captured per-command latencies se sample karte hain.
+#
+# Plain text, media aur button presses replay nahi hote (counted in the
+# report); --speed 5 means five times the recorded rate.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+
+import aiohttp
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+
+from config import COMMANDS  # noqa: E402
+from validators import normalize_query  # noqa: E402
+from stubs import StubUpstreams, FakeBotAPI, command_update  # noqa: E402
+from e2e import running_bot, send_and_wait, latency_summary, git_revision, log_errors, report_log_errors  # noqa: E402
+
+
+def load_capture(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def synthetic_query(cmd_info, query_hash):
+    """Deterministic valid query for a hashed one: canary with its digits/letters reshuffled."""
+    canary = cmd_info.get("canary") or ""
+    rng = random.Random(query_hash)
+    for _ in range(10):
+        chars = list(canary)
+        for i, ch in enumerate(chars[1:], 1):
+            if ch.isdigit():
+                chars[i] = str(rng.randint(0, 9))
+            elif ch.islower():
+                chars[i] = rng.choice("abcdefghijklmnopqrstuvwxyz")
+        candidate = "".join(chars)
+        if normalize_query(cmd_info, candidate) is not None:
+            return candidate
+    return canary
+
+
+class IdMap:
+    """Hashed capture IDs -> stable synthetic Telegram IDs."""
+
+    def __init__(self):
+        self._users = {}
+        self._chats = {}
+
+    def user(self, h):
+        return self._users.setdefault(h, 200000 + len(self._users))
+
+    def chat(self, h, chat_type, user_id):
+        if chat_type == "private":
+            return user_id
+        return self._chats.setdefault(h, -1002000000000 - len(self._chats))
+
+
+def build_schedule(events):
+    """[(t, user_id, chat_id, text)] for replayable commands plus a Counter of skipped kinds."""
+    ids = IdMap()
+    queries = {}
+    schedule, skipped = [], Counter()
+    for ev in events:
+        kind = ev.get("kind")
+        if kind in ("start", "upstream"):
+            continue
+        cmd = ev.get("cmd")
+        if kind != "command" or cmd not in COMMANDS:
+            skipped[kind if kind != "command" else "command:" + str(cmd)] += 1
+            continue
+        user_id = ids.user(ev.get("user"))
+        chat_id = ids.chat(ev.get("chat"), ev.get("chat_type"), user_id)
+        text = f"/{cmd}"
+        if ev.get("query"):
+            key = (cmd, ev["query"])
+            if key not in queries:
+                queries[key] = synthetic_query(COMMANDS[cmd], ev["query"])
+            text += " " + queries[key]
+        schedule.append((ev["t"], user_id, chat_id, text))
+    schedule.sort(key=lambda item: item[0])
+    return schedule, skipped
+
+
+def upstream_samples(events):
+    samples = defaultdict(list)
+    errors = Counter()
+    for ev in events:
+        if ev.get("kind") == "upstream":
+            samples[ev["cmd"]].append(ev["latency"])
+            if not ev.get("ok"):
+                errors[ev["cmd"]] += 1
+    return dict(samples), errors
+
+
+async def replay(args, schedule, samples, error_rate):
+    stubs = StubUpstreams(COMMANDS, payload_bytes=args.payload_bytes,
+                          error_rate=error_rate, latency_samples=samples)
+    fake = FakeBotAPI()
+    stub_url = await stubs.start()
+    fake_url = await fake.start()
+    latencies, per_command, failures = [], defaultdict(list), Counter()
+    lag = []
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with running_bot(session, args.workers, fake_url, stub_url, args.realistic_limits) as (webhook, _, log_path):
+                start = time.perf_counter()
+
+                async def fire(t, user_id, chat_id, text):
+                    delay = t / args.speed - (time.perf_counter() - start)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    lag.append(max(0.0, -delay))
+                    message_id, update = command_update(user_id, chat_id, text)
+                    cmd = text.split()[0][1:]
+                    latency = await send_and_wait(session, fake, webhook, chat_id, message_id, update, args.timeout)
+                    if latency is None:
+                        failures[cmd] += 1
+                    else:
+                        latencies.append(latency)
+                        per_command[cmd].append(latency)
+
+                await asyncio.gather(*(fire(*item) for item in schedule))
+                elapsed = time.perf_counter() - start
+                errors = log_errors(log_path)
+                report_log_errors(errors)
+    finally:
+        await stubs.stop()
+        await fake.stop()
+    return {
+        "replayed": len(schedule),
+        "completed": len(latencies),
+        "failed": sum(failures.values()),
+        "duration_s": round(elapsed, 3),
+        "max_send_lag_ms": round(max(lag, default=0.0) * 1000, 1),
+        "latency_ms": latency_summary(latencies),
+        "log_errors": len(errors),
+        "log_error_samples": errors[:5],
+        "per_command": {cmd: dict(latency_summary(v), count=len(v), failed=failures[cmd])
+                        for cmd, v in sorted(per_command.items())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay captured OSINT bot traffic")
+    parser.add_argument("capture")
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--payload-bytes", type=int, default=2000)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--realistic-limits", action="store_true")
+    args = parser.parse_args()
+
+    events = load_capture(args.capture)
+    schedule, skipped = build_schedule(events)
+    samples, errors = upstream_samples(events)
+    calls = sum(len(v) for v in samples.values())
+    error_rate = sum(errors.values()) / calls if calls else 0.0
+    print(f"{len(schedule)} commands to replay, skipped {dict(skipped)}, upstream error rate {error_rate:.1%}")
+
+    result = asyncio.run(replay(args, schedule, samples, error_rate))
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": git_revision(),
+        "python": sys.version.split()[0],
+        "params": vars(args),
+        "skipped": dict(skipped),
+        "upstream_error_rate": round(error_rate, 4),
+        "result": result,
+    }
+    print(json.dumps(result))
+    out_dir = os.path.join(HERE, "results")
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"replay-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"report written to {path}")
+    if result["log_errors"]:
+        sys.exit("bot logged errors during the replay, see log_error_samples")
+
+
+if __name__ == "__main__":
+    main()
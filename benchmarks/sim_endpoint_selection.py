@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# benchmarks/sim_endpoint_selection.py - EndpointSelector convergence and failover
+#
+# Usage: python benchmarks/sim_endpoint_selection.py [--lookups N]
+# Three simulated providers for one command: slow, fast, and fast-but-flaky.
+# Prints which endpoint served each window of lookups and the mean latency
+# seen by users, first with all providers up, then with "fast" going down.
+# In-memory only; tests/test_upstream_selection.py drives call_command_api
+# against real local HTTP stubs (failover, timeouts, EWMA updates).
+
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from upstream import EndpointSelector  # noqa: E402
+
+TIMEOUT = 20.0
+
+PROVIDERS = {
+    "https://slow.example/?q={}": {"latency": 1.2, "error_rate": 0.0},
+    "https://fast.example/?q={}": {"latency": 0.15, "error_rate": 0.01},
+    "https://flaky.example/?q={}": {"latency": 0.1, "error_rate": 0.4},
+}
+
+
+def attempt(url, down):
+    spec = PROVIDERS[url]
+    if url in down:
+        return TIMEOUT, False
+    latency = random.expovariate(1 / spec["latency"])
+    return latency, random.random() >= spec["error_rate"]
+
+
+def run_phase(selector, endpoints, lookups, window, down=()):
+    served = {}
+    total_latency = 0.0
+    for i in range(1, lookups + 1):
+        spent = 0.0
+        for ep in selector.order(endpoints)[:2]:
+            latency, ok = attempt(ep["url"], down)
+            selector.record(ep["url"], latency, ok)
+            spent += latency
+            if ok:
+                served[ep["url"]] = served.get(ep["url"], 0) + 1
+                break
+        total_latency += spent
+        if i % window == 0:
+            share = ", ".join(f"{url.split('//')[1].split('.')[0]}={n}" for url, n in sorted(served.items()))
+            print(f"  lookups {i - window + 1:>4}-{i:<4} served by: {share:<32} mean latency {total_latency / window:.2f}s")
+            served, total_latency = {}, 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EndpointSelector simulation")
+    parser.add_argument("--lookups", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    selector = EndpointSelector()
+    endpoints = [{"url": url} for url in PROVIDERS]
+    window = max(args.lookups // 8, 1)
+    print("all providers up:")
+    run_phase(selector, endpoints, args.lookups, window)
+    print("fast provider down:")
+    run_phase(selector, endpoints, args.lookups, window, down={"https://fast.example/?q={}"})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# benchmarks/sim_send_scheduler.py - SendScheduler against a fake Bot API
+#
+# Usage: python benchmarks/sim_send_scheduler.py [--broadcast N] [--seconds S]
+# The fake Bot API answers "429 RetryAfter" whenever a send would break
+# Telegram's limits (30/s overall, 1/s per private chat, 20/min per group).
+# A /broadcast to N users runs while interactive lookup replies arrive in
+# groups at a steady rate. Runs once without and once with the scheduler.
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict, deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sendqueue import SendScheduler, PRIORITY_INTERACTIVE, PRIORITY_BROADCAST, is_private_chat  # noqa: E402
+
+
+class FakeRetryAfter(Exception):
+    pass
+
+
+class FakeBotAPI:
+    """Sliding-window enforcement of Telegram's documented send limits."""
+
+    def __init__(self):
+        self.global_window = deque()
+        self.chat_windows = defaultdict(deque)
+        self.sent = 0
+        self.rejected = 0
+
+    async def send(self, chat_id):
+        await asyncio.sleep(0.005)  # network round trip
+        now = time.monotonic()
+        limit, window = (1, 1.0) if is_private_chat(chat_id) else (20, 60.0)
+        chat = self.chat_windows[chat_id]
+        for q, w in ((self.global_window, 1.0), (chat, window)):
+            while q and q[0] <= now - w:
+                q.popleft()
+        if len(self.global_window) >= 30 or len(chat) >= limit:
+            self.rejected += 1
+            raise FakeRetryAfter()
+        self.global_window.append(now)
+        chat.append(now)
+        self.sent += 1
+
+
+async def send(api, scheduler, chat_id, priority):
+    while True:
+        if scheduler:
+            await scheduler.acquire(chat_id, priority)
+        try:
+            return await api.send(chat_id)
+        except FakeRetryAfter:
+            if scheduler:
+                scheduler.pause(1.0)
+            await asyncio.sleep(1.0)
+
+
+async def scenario(use_scheduler, broadcast_size, seconds, lookup_rate):
+    api = FakeBotAPI()
+    scheduler = SendScheduler(global_limit=(25.0, 5)) if use_scheduler else None
+    latencies = []
+
+    async def broadcast():
+        start = time.monotonic()
+        for uid in range(1, broadcast_size + 1):
+            await send(api, scheduler, 10_000 + uid, PRIORITY_BROADCAST)
+        return time.monotonic() - start
+
+    async def reply(chat_id):
+        start = time.monotonic()
+        await send(api, scheduler, chat_id, PRIORITY_INTERACTIVE)
+        latencies.append(time.monotonic() - start)
+
+    async def lookups():
+        tasks = []
+        end = time.monotonic() + seconds
+        while time.monotonic() < end:
+            tasks.append(asyncio.create_task(reply(-100 - random.randint(0, 19))))
+            await asyncio.sleep(1 / lookup_rate)
+        await asyncio.gather(*tasks)
+
+    # Broadcast copies go out concurrently like a real send loop would with
+    # several admins / retries in flight
+    broadcast_task = asyncio.create_task(broadcast())
+    burst = [asyncio.create_task(send(api, scheduler, 50_000 + i, PRIORITY_BROADCAST)) for i in range(broadcast_size)]
+    await lookups()
+    broadcast_time = await broadcast_task
+    await asyncio.gather(*burst)
+    latencies.sort()
+    return {
+        "sent": api.sent,
+        "rejected_429": api.rejected,
+        "broadcast_seconds": round(broadcast_time, 2),
+        "reply_p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "reply_p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SendScheduler simulation")
+    parser.add_argument("--broadcast", type=int, default=150)
+    parser.add_argument("--seconds", type=float, default=8.0)
+    parser.add_argument("--lookup-rate", type=float, default=4.0)
+    args = parser.parse_args()
+    random.seed(1)
+    for use_scheduler in (False, True):
+        result = asyncio.run(scenario(use_scheduler, args.broadcast, args.seconds, args.lookup_rate))
+        print(f"{'with' if use_scheduler else 'without':>7} scheduler: {result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+# benchmarks/stubs.py - Local stand-ins for upstream APIs and the Telegram Bot API
+# Used by e2e.py (and replay tooling) so the real bot can run fully offline.
+
+import asyncio
+import itertools
+import json
+import random
+import socket
+import time
+from collections import Counter
+
+from aiohttp import web
+
+from payloads import PAYLOADS
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# ==================== STUB UPSTREAMS ====================
+def filler_payload(cmd, size):
+    """Generic JSON object of roughly `size` bytes."""
+    records = []
+    while len(json.dumps(records)) < size:
+        i = len(records)
+        records.append({"id": i, "name": f"{cmd} record {i}", "value": "x" * 40, "active": i % 2 == 0})
+    return {"status": "ok", "source": cmd, "records": records}
+
+
+class StubUpstreams:
+    """One aiohttp server answering GET /{cmd}?q=... for every command.
+
+    latency is the mean of an exponential delay; error_rate is the share
+    of requests answered with HTTP 500. latency_samples ({cmd: [seconds]},
+    e.g. from a capture) replaces the exponential delay for those commands.
+    """
+
+    def __init__(self, commands, latency=0.2, payload_bytes=2000, error_rate=0.0, latency_samples=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.latency_samples = latency_samples or {}
+        self.requests = 0
+        self._bodies = {}
+        for cmd in commands:
+            factory = PAYLOADS.get(cmd)
+            payload = factory() if factory else filler_payload(cmd, payload_bytes)
+            self._bodies[cmd] = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.runner = None
+        self.port = None
+
+    async def handle(self, request):
+        self.requests += 1
+        cmd = request.match_info["cmd"]
+        samples = self.latency_samples.get(cmd)
+        if samples:
+            await asyncio.sleep(random.choice(samples))
+        elif self.latency:
+            await asyncio.sleep(random.expovariate(1 / self.latency))
+        if random.random() < self.error_rate:
+            return web.Response(status=500, text="stub error")
+        body = self._bodies.get(cmd)
+        if body is None:
+            raise web.HTTPNotFound()
+        return web.Response(body=body, content_type="application/json")
+
+    async def start(self, port=None):
+        app = web.Application()
+        app.router.add_get("/{cmd}", self.handle)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        self.port = port or free_port()
+        await web.TCPSite(self.runner, "127.0.0.1", self.port).start()
+        return f"http://127.0.0.1:{self.port}"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+# ==================== FAKE BOT API ====================
+class FakeBotAPI:
+    """Minimal Bot API: answers every method and records what the bot sent.
+
+    Replies (messages quoting a message) resolve the future registered with
+    expect_reply(chat_id, message_id), which is how drivers measure latency.
+    """
+
+    BOT_USER = {"id": 999000, "is_bot": True, "first_name": "BenchBot", "username": "bench_bot"}
+
+    def __init__(self):
+        self.calls = Counter()
+        self.documents = []  # (method, chat_id, filename, bytes) of every uploaded file
+        self.texts = []      # (chat_id, text) of every sendMessage
+        self._message_ids = itertools.count(1)
+        self._waiting = {}  # (chat_id, message_id) -> future
+        self.runner = None
+        self.port = None
+
+    def expect_reply(self, chat_id, message_id):
+        fut = asyncio.get_running_loop().create_future()
+        self._waiting[(chat_id, message_id)] = fut
+        return fut
+
+    def forget(self, chat_id, message_id):
+        self._waiting.pop((chat_id, message_id), None)
+
+    def _message(self, chat_id, params):
+        chat_type = "private" if chat_id > 0 else "supergroup"
+        msg = {
+            "message_id": next(self._message_ids),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": chat_type, "title": "bench"},
+            "from": self.BOT_USER,
+        }
+        if "text" in params:
+            msg["text"] = params["text"]
+        return msg
+
+    @staticmethod
+    def _reply_target(params):
+        if "reply_parameters" in params:
+            try:
+                return int(json.loads(params["reply_parameters"])["message_id"])
+            except (ValueError, KeyError, TypeError):
+                return None
+        if "reply_to_message_id" in params:
+            return int(params["reply_to_message_id"])
+        return None
+
+    async def handle(self, request):
+        method = request.match_info["method"]
+        self.calls[method] += 1
+        params = dict(await request.post())
+        if method == "getMe":
+            result = self.BOT_USER
+        elif method == "getChatMember":
+            result = {"status": "member", "user": {"id": int(params.get("user_id", 0)), "is_bot": False, "first_name": "U"}}
+        elif method.startswith(("send", "copy", "forward", "edit")):
+            chat_id = int(params.get("chat_id", 0))
+            upload = params.get("document")
+            if hasattr(upload, "file"):
+                self.documents.append((method, chat_id, upload.filename, upload.file.read()))
+            if method == "sendMessage":
+                self.texts.append((chat_id, params.get("text", "")))
+            target = self._reply_target(params)
+            if target is not None:
+                fut = self._waiting.pop((chat_id, target), None)
+                if fut is not None and not fut.done():
+                    fut.set_result(time.perf_counter())
+            result = {"message_id": next(self._message_ids)} if method == "copyMessage" else self._message(chat_id, params)
+        elif method == "exportChatInviteLink":
+            result = "https://t.me/+bench"
+        elif method == "getUpdates":
+            await asyncio.sleep(1)
+            result = []
+        else:
+            result = True
+        return web.json_response({"ok": True, "result": result})
+
+    async def start(self, port=None):
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_post("/bot{token}/{method}", self.handle)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        self.port = port or free_port()
+        await web.TCPSite(self.runner, "127.0.0.1", self.port).start()
+        return f"http://127.0.0.1:{self.port}/bot"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+# ==================== SYNTHETIC UPDATES ====================
+_update_ids = itertools.count(1)
+_message_ids = itertools.count(1)
+
+
+def command_update(user_id, chat_id, text):
+    """Telegram Update dict for a command message; negative chat_id is a group."""
+    message_id = next(_message_ids)
+    command = text.split()[0]
+    if chat_id > 0:
+        chat = {"id": chat_id, "type": "private", "first_name": f"user{user_id}"}
+    else:
+        chat = {"id": chat_id, "type": "supergroup", "title": f"group {chat_id}"}
+    return message_id, {
+        "update_id": next(_update_ids),
+        "message": {
+            "message_id": message_id,
+            "date": int(time.time()),
+            "chat": chat,
+            "from": {"id": user_id, "is_bot": False, "first_name": f"user{user_id}", "username": f"user{user_id}"},
+            "text": text,
+            "entities": [{"type": "bot_command", "offset": 0, "length": len(command)}],
+        },
+    }
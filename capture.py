@@ -0,0 +1,65 @@
+# capture.py - Opt-in traffic recorder for load-test replay
+# CAPTURE_PATH set ho toh har incoming update aur har upstream call ka timing
+# ek JSONL file me likha jata hai. User/chat IDs aur queries salted hash ho jaate
+# hain, isliye file me koi personal data nahi hota. Replay: benchmarks/replay.py
+
+import os
+import time
+import hmac
+import hashlib
+
+from jsonutil import dumps as json_dumps
+
+
+class TrafficRecorder:
+    """Appends one compact JSON object per event; "t" is seconds since start."""
+
+    def __init__(self, path, salt=None):
+        self.path = path
+        self.salt = (salt or os.urandom(16).hex()).encode()
+        self.start = time.monotonic()
+        self._file = open(path, "a", encoding="utf-8", buffering=64 * 1024)
+        self._write({"kind": "start", "wall": time.time()})
+
+    def _hash(self, value):
+        return hmac.new(self.salt, str(value).encode(), hashlib.sha256).hexdigest()[:12]
+
+    def _write(self, event):
+        event["t"] = round(time.monotonic() - self.start, 4)
+        self._file.write(json_dumps(event) + "\n")
+
+    def update(self, update):
+        """Record a telegram.Update (messages and button presses only)."""
+        chat = update.effective_chat
+        user = update.effective_user
+        base = {
+            "chat": self._hash(chat.id) if chat else None,
+            "chat_type": chat.type if chat else None,
+            "user": self._hash(user.id) if user else None,
+        }
+        if update.message and update.message.text:
+            text = update.message.text
+            parts = text.split(maxsplit=1)
+            if text.startswith('/'):
+                base.update(kind="command", cmd=parts[0][1:].split('@')[0].lower())
+                if len(parts) > 1:
+                    base.update(query=self._hash(parts[1].strip().lower()), query_len=len(parts[1]))
+            else:
+                base.update(kind="text", length=len(text))
+        elif update.message:
+            base.update(kind="media")
+        elif update.callback_query:
+            action = (update.callback_query.data or "").split(":", 1)[0]
+            base.update(kind="callback", action=action)
+        else:
+            return
+        self._write(base)
+
+    def upstream(self, cmd, latency, ok, error=None):
+        event = {"kind": "upstream", "cmd": cmd, "latency": round(latency, 4), "ok": ok}
+        if error:
+            event["error"] = error
+        self._write(event)
+
+    def close(self):
+        self._file.close()
@@ -7,11 +7,13 @@ import os
 # Render dashboard mein environment variable set karo: BOT_TOKEN
 BOT_TOKEN = os.environ.get("BOT_TOKEN", "YOUR_BOT_TOKEN_HERE")
 # ⚠️ Agar env variable set nahi hai toh default "YOUR_BOT_TOKEN_HERE" use hoga, jo ki kaam nahi karega.
+# Local Bot API server ya benchmarks ke fake Bot API ke liye override karo
+BOT_API_BASE_URL = os.environ.get("BOT_API_BASE_URL", "https://api.telegram.org/bot")
 
 # ==================== DATABASE ====================
 # ⚠️ WARNING: SQLite on Render free tier will LOSE DATA on every restart!
 # For production, use PostgreSQL (add DATABASE_URL env variable and modify database.py)
-DB_PATH = "bot_database.db"  # SQLite file name
+DB_PATH = os.environ.get("DB_PATH", "bot_database.db")  # SQLite file name
 
 # ==================== OWNER & ADMINS ====================
 # Render dashboard mein environment variable set karo: OWNER_ID (as integer)
@@ -57,12 +59,18 @@ GLOBAL_BLACKLIST = [
 ]
 
 # ==================== COMMANDS ====================
-# Har command ka URL, parameter description, log channel ID, description, extra blacklist
+# Har command ka URL, parameter description, log channel ID, validator (validators.py me),
+# canary (health probe ke liye harmless test query), description, extra blacklist
+# Ek se zyada equivalent APIs ho toh "url" ki jagah ordered list do:
+#   "endpoints": [{"url": "https://a.example/?q={}"}, {"url": "https://b.example/?q={}", "adapter": "unwrap_data"}]
+# Adapters upstream.py me hain. Bot sabse fast/healthy endpoint pehle try karta hai, fail hone pe agla.
 COMMANDS = {
     "num": {
         "url": "https://api.subhxcosmo.in/api?key=SATYAM2&type=mobile&term={}",
         "param": "10-digit number",
         "log": LOG_CHANNELS["num"],
+        "validator": "indian_mobile",
+        "canary": "9999999999",
         "desc": "Phone number basic lookup",
         "extra_blacklist": ['owner', 
                             'https://t.me/SUBHXCOSMO \n BUY INSTANT CHEAP PRICE'
@@ -72,6 +80,8 @@ COMMANDS = {
         "url": "https://tg2num-owner-api.vercel.app/?userid={}",
         "param": "user id",
         "log": LOG_CHANNELS["tg2num"],
+        "validator": "numeric_id",
+        "canary": "777000",
         "desc": "Telegram user ID to number (if available)",
         "extra_blacklist": []
     },
@@ -79,6 +89,8 @@ COMMANDS = {
         "url": "https://vehicle-info-aco-api.vercel.app/info?vehicle={}",
         "param": "RC number",
         "log": LOG_CHANNELS["vehicle"],
+        "validator": "rc_number",
+        "canary": "DL01AA0001",
         "desc": "Vehicle registration details",
         "extra_blacklist": []
     },
@@ -86,6 +98,8 @@ COMMANDS = {
         "url": "https://api.b77bf911.workers.dev/vehicle?registration={}",
         "param": "RC number",
         "log": LOG_CHANNELS["vchalan"],
+        "validator": "rc_number",
+        "canary": "DL01AA0001",
         "desc": "Pending & paid chalan info",
         "extra_blacklist": []
     },
@@ -93,6 +107,8 @@ COMMANDS = {
         "url": "https://abbas-apis.vercel.app/api/ip?ip={}",
         "param": "IP address",
         "log": LOG_CHANNELS["ip"],
+        "validator": "ip_address",
+        "canary": "8.8.8.8",
         "desc": "IP geolocation & ISP details",
         "extra_blacklist": []
     },
@@ -100,6 +116,8 @@ COMMANDS = {
         "url": "https://abbas-apis.vercel.app/api/email?mail={}",
         "param": "email",
         "log": LOG_CHANNELS["email"],
+        "validator": "email",
+        "canary": "test@example.com",
         "desc": "Email validation & domain info",
         "extra_blacklist": []
     },
@@ -107,6 +125,8 @@ COMMANDS = {
         "url": "https://abbas-apis.vercel.app/api/ff-info?uid={}",
         "param": "uid",
         "log": LOG_CHANNELS["ffinfo"],
+        "validator": "numeric_id",
+        "canary": "12345678",
         "desc": "Free Fire basic player info",
         "extra_blacklist": [
             "developer",
@@ -120,6 +140,8 @@ COMMANDS = {
         "url": "https://abbas-apis.vercel.app/api/ff-ban?uid={}",
         "param": "uid",
         "log": LOG_CHANNELS["ffban"],
+        "validator": "numeric_id",
+        "canary": "12345678",
         "desc": "Free Fire ban status check",
         "extra_blacklist": []
     },
@@ -127,6 +149,8 @@ COMMANDS = {
         "url": "https://api.postalpincode.in/pincode/{}",
         "param": "6-digit pincode",
         "log": LOG_CHANNELS["pincode"],
+        "validator": "pincode",
+        "canary": "110001",
         "desc": "Area & post office details",
         "extra_blacklist": []
     },
@@ -134,6 +158,8 @@ COMMANDS = {
         "url": "https://abbas-apis.vercel.app/api/ifsc?ifsc={}",
         "param": "IFSC code",
         "log": LOG_CHANNELS["ifsc"],
+        "validator": "ifsc",
+        "canary": "SBIN0000691",
         "desc": "Bank branch details",
         "extra_blacklist": []
     },
@@ -141,6 +167,8 @@ COMMANDS = {
         "url": "https://api.b77bf911.workers.dev/gst?number={}",
         "param": "GST number",
         "log": LOG_CHANNELS["gst"],
+        "validator": "gst",
+        "canary": "27AAPFU0939F1ZV",
         "desc": "GST registration info",
         "extra_blacklist": []
     },
@@ -148,6 +176,8 @@ COMMANDS = {
         "url": "https://mkhossain.alwaysdata.net/instanum.php?username={}",
         "param": "username",
         "log": LOG_CHANNELS["insta"],
+        "validator": "instagram_username",
+        "canary": "instagram",
         "desc": "Instagram public profile info",
         "extra_blacklist": []
     },
@@ -155,6 +185,8 @@ COMMANDS = {
         "url": "https://openosintx.vippanel.in/tgusrinfo.php?key=OpenOSINTX-FREE&user={}",
         "param": "username/userid",
         "log": LOG_CHANNELS["tginfo"],
+        "validator": "telegram_user",
+        "canary": "telegram",
         "desc": "Telegram basic info",
         "extra_blacklist": []
     },
@@ -162,6 +194,8 @@ COMMANDS = {
         "url": "https://api.b77bf911.workers.dev/telegram?user={}",
         "param": "username/userid",
         "log": LOG_CHANNELS["tginfopro"],
+        "validator": "telegram_user",
+        "canary": "telegram",
         "desc": "Telegram advanced profile data",
         "extra_blacklist": []
     },
@@ -169,6 +203,8 @@ COMMANDS = {
         "url": "https://abbas-apis.vercel.app/api/github?username={}",
         "param": "username",
         "log": LOG_CHANNELS["git"],
+        "validator": "github_username",
+        "canary": "github",
         "desc": "GitHub account details",
         "extra_blacklist": []
     },
@@ -176,11 +212,185 @@ COMMANDS = {
         "url": "https://abbas-apis.vercel.app/api/pakistan?number={}",
         "param": "number",
         "log": LOG_CHANNELS["pak"],
+        "validator": "pakistan_number",
+        "canary": "03001234567",
         "desc": "Pakistan phone lookup",
         "extra_blacklist": []
     },
 }
 
+# ==================== UPSTREAM APIS ====================
+UPSTREAM_TIMEOUT = 20        # seconds per request
+UPSTREAM_MAX_ATTEMPTS = 2    # ek lookup me max itne endpoints try honge (failover)
+
+# Background health probe: har cycle me sab endpoints ek-ek karke canary query se check hote hain
+PROBE_ENABLED = os.environ.get("PROBE_ENABLED", "1") == "1"
+PROBE_INTERVAL = 600         # seconds per cycle (±20% jitter)
+PROBE_HISTORY = 50           # har command ke last itne probe results yaad rahenge
+PROBE_MAX_IN_FLIGHT = 5      # itne user lookups chal rahe ho toh probe skip
+
+# ==================== RESULT PAGES ====================
+# Lambe results file ki jagah ◀ ▶ pages me (RESULT_PAGES_ENABLED=0 -> purana file upload)
+RESULT_PAGES_ENABLED = os.environ.get("RESULT_PAGES_ENABLED", "1") == "1"
+RESULT_PAGE_CHARS = 3500      # ek page ka max escaped text (Telegram limit 4096 incl. header/footer)
+RESULT_PAGE_TTL = 1800        # itne seconds tak buttons kaam karenge
+RESULT_PAGE_CACHE_SIZE = 200  # max results memory me; purane pehle hatte hain
+
+# ==================== EXPORT ====================
+# /export: gzip parts isse bade ho toh naya document (Telegram bot upload limit 50 MB)
+EXPORT_PART_BYTES = int(os.environ.get("EXPORT_PART_BYTES", str(45 * 1024 * 1024)))
+EXPORT_CHUNK_ROWS = 1000                # ek DB query me itni rows
+EXPORT_SPOOL_BYTES = 1024 * 1024        # isse bada part memory ki jagah temp file me
+
+# ==================== DB MAINTENANCE ====================
+# Background SQLite maintenance (sirf worker 0 chalata hai). Admin /dbstatus se last runs dikhte hain.
+DB_MAINTENANCE_ENABLED = os.environ.get("DB_MAINTENANCE_ENABLED", "1") == "1"
+DB_MAINTENANCE = {            # job -> interval (seconds)
+    "wal_checkpoint": 300,
+    "incremental_vacuum": 900,
+    "optimize": 3600,
+    "analyze": 24 * 3600,
+    "gc_result_blobs": 24 * 3600,
+    "archive_partitions": 24 * 3600,    # sirf jab LOOKUP_HOT_MONTHS > 0
+}
+DB_VACUUM_PAGES = 500                   # ek slice me itne free pages OS ko wapas
+DB_ANALYZE_LIMIT = 1000                 # PRAGMA analysis_limit (rows sampled per index)
+DB_WAL_MAX_BYTES = 16 * 1024 * 1024     # -wal file isse badi ho toh TRUNCATE checkpoint
+DB_MAINTENANCE_MAX_IN_FLIGHT = 2        # itne lookups chal rahe ho toh maintenance ruk jaata hai
+
+# ==================== LOOKUP PARTITIONS ====================
+# Lookups monthly tables (lookups_YYYYMM) me rehte hain. Admin /partitions archive YYYY-MM
+# ek beeta mahina LOOKUP_ARCHIVE_DIR/lookups_YYYYMM.db me move karke main DB se hata deta hai.
+# LOOKUP_HOT_MONTHS > 0: maintenance roz isse purane mahine khud archive karta hai (0 = off).
+LOOKUP_ARCHIVE_DIR = os.environ.get("LOOKUP_ARCHIVE_DIR", "archive")
+LOOKUP_HOT_MONTHS = int(os.environ.get("LOOKUP_HOT_MONTHS", "0"))
+
+# ==================== RATE LIMITS ====================
+# Token bucket limits for lookups: (tokens per second, burst size).
+# "user" = har user ke liye, "chat" = har group/chat ke liye, "command" = har command ke liye (sab users milake)
+# Owner aur admins exempt hain. WORKERS > 1: chat ke saare updates ek hi worker pe jaate hain,
+# isliye "chat" poora rehta hai; "command" bot-wide hai aur har worker ko 1/WORKERS milta hai;
+# "user" per worker hai (ek user alag workers wale chats me ho toh har worker pe apna bucket).
+RATE_LIMITS = {
+    "user": (1 / 6, 5),       # ~10 lookups/min, 5 ek saath
+    "chat": (20 / 60, 5),     # SEND_LIMITS["group"] jitna: har lookup group me ek reply bhejta hai,
+                              # zyada admit karne se lookups send bucket ke peeche admission slots rokte
+    "command": (3.0, 60),     # upstream API quota bachane ke liye
+}
+RATE_LIMITS_ENABLED = os.environ.get("RATE_LIMITS_ENABLED", "1") == "1"
+# Itne seconds idle rehne ke baad bucket memory se hata diya jata hai
+RATE_LIMIT_IDLE_TTL = 600
+
+# ==================== CONCURRENCY & LOAD SHEDDING ====================
+# Itne updates ek saath process ho sakte hain (slow API ek user ko block na kare).
+# Ek hi user ke ek chat me updates phir bhi ek ek karke chalte hain (conversation state)
+CONCURRENT_UPDATES = int(os.environ.get("CONCURRENT_UPDATES", "64"))
+# Overload pe naye lookups ko turant "busy" reply: in-flight limits aur max update delay (seconds)
+ADMISSION = {
+    "max_in_flight": int(os.environ.get("MAX_IN_FLIGHT", "50")),
+    "max_in_flight_per_command": int(os.environ.get("MAX_IN_FLIGHT_PER_COMMAND", "15")),
+    "max_queue_delay": float(os.environ.get("MAX_QUEUE_DELAY", "10")),
+}
+
+# ==================== DUPLICATE LOOKUPS ====================
+# Same chat + user + command + query dobara aaye jab pehla chal raha ho (ya DEDUPE_WINDOW
+# seconds ke andar shuru hua ho) toh duplicate skip. Duplicate bhejne wale ko ek chhota
+# "already processing" / "just answered" reply milta hai (har lookup pe ek hi baar, taaki
+# spam karne pe notices ka spam na ho). DEDUPE_NOTICE=0: bilkul chup.
+DEDUPE_ENABLED = os.environ.get("DEDUPE_ENABLED", "1") == "1"
+DEDUPE_WINDOW = float(os.environ.get("DEDUPE_WINDOW", "10"))
+DEDUPE_NOTICE = os.environ.get("DEDUPE_NOTICE", "1") == "1"
+
+# ==================== UPDATE MODE (POLLING / WEBHOOK) ====================
+# UPDATE_MODE=webhook set karo toh Telegram updates HTTP server pe aayenge (same port as /health).
+# Public URL: WEBHOOK_URL, warna Render ka RENDER_EXTERNAL_URL. Dono na ho toh polling pe fallback.
+UPDATE_MODE = os.environ.get("UPDATE_MODE", "polling").lower()
+WEBHOOK_URL = os.environ.get("WEBHOOK_URL") or os.environ.get("RENDER_EXTERNAL_URL", "")
+WEBHOOK_PATH = os.environ.get("WEBHOOK_PATH", "/telegram/webhook")
+# Secret token Telegram har request ke header me bhejta hai (A-Z, a-z, 0-9, _ and - only).
+# Set nahi kiya toh har start pe random generate hota hai.
+WEBHOOK_SECRET = os.environ.get("WEBHOOK_SECRET", "")
+# Sirf ye update types chahiye: commands/messages, button clicks, group membership
+ALLOWED_UPDATES = ["message", "callback_query", "chat_member"]
+
+# ==================== WORKERS & SHARED STATE ====================
+# Webhook mode me WORKERS > 1 ho toh main process router ban jata hai aur updates
+# chat ID ke hisaab se worker processes (ports WORKER_BASE_PORT...) me baant deta hai.
+WORKERS = int(os.environ.get("WORKERS", "1"))
+WORKER_BASE_PORT = int(os.environ.get("WORKER_BASE_PORT", "8100"))
+# Router ke spawn kiye hue worker me set hota hai
+WORKER_INDEX = int(os.environ["WORKER_INDEX"]) if os.environ.get("WORKER_INDEX") else None
+# Copy button data jaisa runtime state Redis me rakhna ho toh (multiple replicas ke liye)
+REDIS_URL = os.environ.get("REDIS_URL", "")
+
+# ==================== OUTGOING MESSAGE LIMITS ====================
+# Telegram limits: ~30 msg/s overall, ~1 msg/s per private chat, 20 msg/min per group.
+# (tokens per second, burst size). Yeh poore bot ke budgets hain: WORKERS > 1 ho toh
+# har worker ko global aur log ka 1/WORKERS hissa milta hai (log channels sab workers share karte hain).
+SEND_LIMITS = {
+    "global": (25.0, 5),    # burst chhota rakho: 5 + 25/s kabhi 30/s cross nahi karta
+    "private": (1.0, 3),
+    "group": (20 / 60, 5),
+    "log": (20 / 60, 20),   # LOG_CHANNELS ka apna bucket; bada burst spikes absorb karta hai
+}
+SEND_MAX_RETRIES = 2   # RetryAfter aane pe itni baar dobara try
+# 0 = limiter pass-through (sends turant, sirf benchmarks/testing ke liye)
+SEND_LIMITS_ENABLED = os.environ.get("SEND_LIMITS_ENABLED", "1") == "1"
+# Log channel posts background me jaate hain; itne pending ho toh naye drop (counted)
+LOG_POST_MAX_PENDING = int(os.environ.get("LOG_POST_MAX_PENDING", "500"))
+
+# ==================== PERFORMANCE TRACING ====================
+# Kitne lookups ka per-stage timing record ho (0 = off, 1 = sab). Owner /perf se dekh sakta hai.
+TRACE_SAMPLE_RATE = float(os.environ.get("TRACE_SAMPLE_RATE", "0.1"))
+# Har traced lookup ki ek JSON log line ("osint.perf" logger)
+TRACE_JSON_LOGS = os.environ.get("TRACE_JSON_LOGS", "0") == "1"
+
+# ==================== TRAFFIC CAPTURE ====================
+# Load testing ke liye: CAPTURE_PATH set karo toh anonymized updates + upstream timings JSONL me record honge.
+# CAPTURE_SALT set na ho toh har run ka random salt (IDs runs ke beech match nahi honge).
+CAPTURE_PATH = os.environ.get("CAPTURE_PATH", "")
+CAPTURE_SALT = os.environ.get("CAPTURE_SALT", "")
+
+# ==================== MEMORY DIAGNOSTICS ====================
+# Owner /mem aur GET /debug/memory (cache sizes, asyncio tasks, GC, tracemalloc). Default off.
+MEMDEBUG_ENABLED = os.environ.get("MEMDEBUG", "0") == "1"
+# HTTP endpoint ke liye "Authorization: Bearer <token>"; khali ho toh endpoint band rehta hai
+MEMDEBUG_TOKEN = os.environ.get("MEMDEBUG_TOKEN", "")
+
+# ==================== RUNTIME PROFILE ====================
+# RUNTIME_PROFILE=fast: uvloop event loop (installed ho toh), startup ke baad gc.freeze()
+# aur bade gen0 threshold (har lookup bahut saare temporary strings/dicts banata hai).
+# Har setting alag se bhi override ho sakti hai. Numbers: benchmarks/bench_runtime.py
+RUNTIME_PROFILE = os.environ.get("RUNTIME_PROFILE", "default").lower()
+_FAST_RUNTIME = RUNTIME_PROFILE == "fast"
+RUNTIME_UVLOOP = os.environ.get("RUNTIME_UVLOOP", "1" if _FAST_RUNTIME else "0") == "1"
+RUNTIME_GC_FREEZE = os.environ.get("RUNTIME_GC_FREEZE", "1" if _FAST_RUNTIME else "0") == "1"
+# "gen0,gen1,gen2"; khali = Python defaults (700,10,10)
+_GC_THRESHOLDS = os.environ.get("GC_THRESHOLDS", "50000,20,100" if _FAST_RUNTIME else "")
+GC_THRESHOLDS = tuple(int(x) for x in _GC_THRESHOLDS.split(",")) if _GC_THRESHOLDS else None
+
+# ==================== LOGGING ====================
+# Log lines ek queue me jaati hain aur alag thread stderr pe likhta hai (event loop block nahi hota).
+# LOG_FORMAT=json: har line JSON, lookup ke andar sab lines pe same request_id ("u<update_id>").
+# LOG_LEVELS: per-logger levels, e.g. "osint.lookup=WARNING" (per-lookup success lines band).
+# httpx=WARNING hamesha lagta hai (INFO pe URL me bot token leak hota); LOG_LEVELS usse tabhi
+# badalta hai jab httpx explicitly naam se diya ho.
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "text").lower()
+LOG_LEVELS = os.environ.get("LOG_LEVELS", "")
+LOG_QUEUE = os.environ.get("LOG_QUEUE", "1") == "1"
+
+# ==================== HEALTH CHECK ====================
+# /health unhealthy report karega agar itne seconds se getUpdates complete nahi hua
+HEALTH_POLL_STALL_SECONDS = int(os.environ.get("HEALTH_POLL_STALL_SECONDS", "120"))
+
+# Offline testing/benchmarks: sab upstream calls ek local stub server pe bhejo ({stub}/{cmd}?q=...)
+UPSTREAM_STUB_URL = os.environ.get("UPSTREAM_STUB_URL", "")
+if UPSTREAM_STUB_URL:
+    for _cmd, _info in COMMANDS.items():
+        _info["url"] = f"{UPSTREAM_STUB_URL.rstrip('/')}/{_cmd}?q={{}}"
+        _info.pop("endpoints", None)
+
 # ==================== BRANDING & FOOTER ====================
 BRANDING = {
     "developer": "@Nullprotocol_X",
@@ -2,15 +2,49 @@
 # ⚠️ WARNING: SQLite on Render free tier will LOSE DATA on every restart!
 # For production, use PostgreSQL or attach a persistent disk.
 
+import os
+import asyncio
+import hashlib
 import aiosqlite
-import json
-from datetime import datetime, timedelta
-from config import DB_PATH
+from jsonutil import dumps as json_dumps, loads as json_loads, JSONDecodeError
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from config import DB_PATH, LOOKUP_ARCHIVE_DIR
+from metrics import timed_db
 
 # ==================== INIT DATABASE ====================
+# Schema (tables, view, pragmas, migrations) badle toh isse bump karo;
+# init_db current DB pe saara DDL skip kar deta hai (PRAGMA user_version).
+SCHEMA_VERSION = 3
+# Migration ek worker karta hai; baaki itni der tak write lock ka wait karte hain
+INIT_LOCK_TIMEOUT = 600
+
+@timed_db
 async def init_db():
-    """Initialize all database tables if they don't exist."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    """Initialize all database tables if they don't exist, then make sure this month has a partition."""
+    async with aiosqlite.connect(DB_PATH, timeout=INIT_LOCK_TIMEOUT) as db:
+        if await _pragma_value(db, 'user_version') != SCHEMA_VERSION:
+            await _init_schema(db)
+        # Pehle lookups ke saath saare workers partition DDL pe na takrayein
+        if current_month() not in await _hot_months(db):
+            await _add_partition(db, current_month())
+
+async def _init_schema(db):
+    """Create tables and run migrations in one BEGIN IMMEDIATE transaction.
+
+    Every worker calls init_db at startup. Only the first one to get the
+    write lock migrates; the rest wait, re-read user_version and find it
+    current. A crash mid-way rolls everything back to the old schema.
+    """
+    # Sirf nayi (khali) DB pe asar karta hai; purani DB pe VACUUM ke bina mode nahi badalta.
+    # Pehli table bante waqt header me likha jaata hai, isliye transaction se pehle
+    await db.execute('PRAGMA auto_vacuum = INCREMENTAL')
+    await db.execute('BEGIN IMMEDIATE')
+    try:
+        if await _pragma_value(db, 'user_version') == SCHEMA_VERSION:
+            # Lock milne tak dusra worker migrate kar chuka
+            await db.rollback()
+            return
         # Users table
         await db.execute('''
             CREATE TABLE IF NOT EXISTS users (
@@ -40,17 +74,27 @@ async def init_db():
                 banned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
-        # Lookups log table
+        # Lookup results, stored once per distinct content (lookups_YYYYMM.result_hash -> hash)
+        await db.execute('''
+            CREATE TABLE IF NOT EXISTS result_blobs (
+                hash BLOB PRIMARY KEY,
+                body TEXT NOT NULL
+            )
+        ''')
+        # Schema v1 tak lookups ek hi table thi; uske rows monthly partitions me jaate hain
+        if await _object_type(db, 'lookups') == 'table':
+            await _migrate_inline_results(db)
+            await _partition_legacy_lookups(db)
+        # Lookups log: monthly partition tables + "lookups" / "lookups_full" views
+        await _rebuild_lookup_views(db)
+        # Archive ho chuke mahino ke lookup counts (/stats total ke liye)
         await db.execute('''
-            CREATE TABLE IF NOT EXISTS lookups (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                command TEXT,
-                query TEXT,
-                result TEXT,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            CREATE TABLE IF NOT EXISTS archived_lookups (
+                month TEXT PRIMARY KEY,
+                lookups INTEGER NOT NULL
             )
         ''')
+        await _backfill_archived_counts(db, LOOKUP_ARCHIVE_DIR)
         # Groups where bot is admin
         await db.execute('''
             CREATE TABLE IF NOT EXISTS bot_groups (
@@ -60,12 +104,367 @@ async def init_db():
                 added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
+        await db.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    # WAL: readers writers ko block nahi karte; checkpoint maintenance job karta hai.
+    # Transaction ke andar mode nahi badalta, isliye commit ke baad (persistent hai)
+    await db.execute('PRAGMA journal_mode = WAL')
+
+async def _object_type(db, name):
+    async with db.execute('SELECT type FROM sqlite_master WHERE name = ?', (name,)) as cursor:
+        row = await cursor.fetchone()
+    return row[0] if row else None
+
+# ==================== LOOKUP PARTITIONS ====================
+# Har UTC mahine ke lookups alag table me (lookups_YYYYMM). Queries sirf un partitions ko
+# chhooti hain jo unki date range me aate hain, isliye recent queries history ke saath slow
+# nahi hoti. Purane mahine archive_partition() se alag SQLite file me move ho kar main DB se
+# hat jaate hain. "lookups" view saare hot partitions ka UNION ALL hai (ad-hoc SQL ke liye).
+PARTITION_PREFIX = 'lookups_'
+# Har mahine ke ids month * ID_MONTH_SPAN se shuru: ids partitions ke across bhi badhte hain
+ID_MONTH_SPAN = 10 ** 9
+LOOKUP_COLUMNS = 'id, user_id, command, query, result_hash, timestamp'
+
+_partition_cache = (None, ())  # ((DB_PATH, PRAGMA schema_version), months)
+_closed_counts = {}            # (DB_PATH, month) -> {command: count}; beete mahine badalte nahi
+
+def partition_table(month):
+    return PARTITION_PREFIX + month
+
+def current_month():
+    """'YYYYMM' of the partition new lookups go to (UTC, like CURRENT_TIMESTAMP)."""
+    return datetime.now(timezone.utc).strftime('%Y%m')
+
+def shift_month(month, delta):
+    index = int(month[:4]) * 12 + int(month[4:]) - 1 + delta
+    return f'{index // 12:04d}{index % 12 + 1:02d}'
+
+def _lookup_table_ddl(name):
+    return f'''
+        CREATE TABLE IF NOT EXISTS {name} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            command TEXT,
+            query TEXT,
+            result_hash BLOB,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    '''
+
+async def _partition_months(db):
+    """Months with a partition table, read from sqlite_master (ascending)."""
+    async with db.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB ?",
+        (PARTITION_PREFIX + '[0-9]' * 6,)
+    ) as cursor:
+        return sorted(row[0][len(PARTITION_PREFIX):] for row in await cursor.fetchall())
+
+async def _hot_months(db):
+    """Cached _partition_months; re-read only when the schema changed (any worker's DDL)."""
+    global _partition_cache
+    key = (DB_PATH, await _pragma_value(db, 'schema_version'))
+    if _partition_cache[0] != key:
+        _partition_cache = (key, tuple(await _partition_months(db)))
+    return _partition_cache[1]
+
+def _months_in_range(months, since=None, until=None):
+    """Partitions that can hold rows with since <= timestamp <= until ('YYYY-MM-DD...')."""
+    lo = since[:7].replace('-', '') if since else None
+    hi = until[:7].replace('-', '') if until else None
+    return [m for m in months if (lo is None or m >= lo) and (hi is None or m <= hi)]
+
+async def _create_partition(db, month):
+    table = partition_table(month)
+    await db.execute(_lookup_table_ddl(table))
+    await db.execute(f'CREATE INDEX IF NOT EXISTS {table}_user ON {table} (user_id, timestamp)')
+    await db.execute(
+        'INSERT INTO sqlite_sequence (name, seq) SELECT ?, ? '
+        'WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = ?)',
+        (table, int(month) * ID_MONTH_SPAN, table)
+    )
+
+async def _rebuild_lookup_views(db):
+    months = await _partition_months(db)
+    if months:
+        body = ' UNION ALL '.join(f'SELECT {LOOKUP_COLUMNS} FROM {partition_table(m)}' for m in months)
+    else:
+        body = ('SELECT NULL AS id, NULL AS user_id, NULL AS command, NULL AS query, '
+                'NULL AS result_hash, NULL AS timestamp WHERE 0')
+    await db.execute('DROP VIEW IF EXISTS lookups_full')
+    await db.execute('DROP VIEW IF EXISTS lookups')
+    await db.execute(f'CREATE VIEW lookups AS {body}')
+    await db.execute('''
+        CREATE VIEW lookups_full AS
+        SELECT l.id, l.user_id, l.command, l.query, b.body AS result, l.timestamp
+        FROM lookups l LEFT JOIN result_blobs b ON b.hash = l.result_hash
+    ''')
+
+async def _add_partition(db, month):
+    """Create a month's partition and rebuild the views in one write transaction."""
+    await db.execute('BEGIN IMMEDIATE')
+    try:
+        # Dusre worker ne beech me bana di ho toh IF NOT EXISTS sab no-op hai
+        await _create_partition(db, month)
+        await _rebuild_lookup_views(db)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+async def _partition_legacy_lookups(db):
+    """Move rows of the single v1 lookups table into monthly partitions (ids kept).
+
+    Runs inside init_db's transaction; OR IGNORE keeps a re-run harmless.
+    """
+    month_expr = "COALESCE(strftime('%Y%m', timestamp), strftime('%Y%m', 'now'))"
+    async with db.execute(f'SELECT DISTINCT {month_expr} FROM lookups') as cursor:
+        months = [row[0] for row in await cursor.fetchall()]
+    for month in months:
+        await _create_partition(db, month)
+        await db.execute(
+            f'INSERT OR IGNORE INTO {partition_table(month)} ({LOOKUP_COLUMNS}) '
+            f'SELECT {LOOKUP_COLUMNS} FROM lookups WHERE {month_expr} = ?',
+            (month,)
+        )
+    await db.execute('DROP VIEW IF EXISTS lookups_full')
+    await db.execute('DROP TABLE lookups')
+
+async def _month_command_counts(db, month, current):
+    """{command: lookups} of one partition; closed months are computed once per process."""
+    key = (DB_PATH, month)
+    if month != current and key in _closed_counts:
+        return _closed_counts[key]
+    async with db.execute(f'SELECT command, COUNT(*) FROM {partition_table(month)} GROUP BY command') as cursor:
+        counts = dict(await cursor.fetchall())
+    if month < current:
+        _closed_counts[key] = counts
+    return counts
+
+@timed_db
+async def get_partition_info():
+    """[(month, lookups)] of every partition still in the main database."""
+    current = current_month()
+    async with aiosqlite.connect(DB_PATH) as db:
+        return [
+            (month, sum((await _month_command_counts(db, month, current)).values()))
+            for month in await _hot_months(db)
+        ]
+
+@timed_db
+async def archive_partition(month, archive_dir):
+    """Move one closed month into archive_dir/lookups_YYYYMM.db and drop it here.
+
+    The archive file is self-contained (its own lookups table, the result
+    blobs it references and a lookups_full view). Blobs left unreferenced in
+    the main database are removed by the next gc_result_blobs run.
+    Returns (path, rows).
+    """
+    if month >= current_month():
+        raise ValueError("current month cannot be archived")
+    table = partition_table(month)
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f'{table}.db')
+    async with aiosqlite.connect(DB_PATH) as db:
+        if month not in await _partition_months(db):
+            raise ValueError(f"no partition for {month}")
+        await db.execute('ATTACH DATABASE ? AS archive', (path,))
+        try:
+            await db.execute(_lookup_table_ddl('archive.lookups'))
+            await db.execute('CREATE INDEX IF NOT EXISTS archive.lookups_user ON lookups (user_id, timestamp)')
+            await db.execute('CREATE TABLE IF NOT EXISTS archive.result_blobs (hash BLOB PRIMARY KEY, body TEXT NOT NULL)')
+            # OR IGNORE: pichla archive beech me ruka ho toh dobara chalana safe hai
+            cursor = await db.execute(
+                f'INSERT OR IGNORE INTO archive.lookups ({LOOKUP_COLUMNS}) SELECT {LOOKUP_COLUMNS} FROM main.{table}'
+            )
+            rows = cursor.rowcount
+            await db.execute(
+                f'INSERT OR IGNORE INTO archive.result_blobs (hash, body) SELECT hash, body FROM main.result_blobs '
+                f'WHERE hash IN (SELECT result_hash FROM main.{table})'
+            )
+            await db.execute('''
+                CREATE VIEW IF NOT EXISTS archive.lookups_full AS
+                SELECT l.id, l.user_id, l.command, l.query, b.body AS result, l.timestamp
+                FROM lookups l LEFT JOIN result_blobs b ON b.hash = l.result_hash
+            ''')
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        finally:
+            await db.execute('DETACH DATABASE archive')
+        # Archive file commit ho chuki hai; ab main DB se partition hatao
+        await db.execute('BEGIN IMMEDIATE')
+        try:
+            await db.execute(
+                f'INSERT OR REPLACE INTO archived_lookups (month, lookups) SELECT ?, COUNT(*) FROM {table}',
+                (month,)
+            )
+            await db.execute(f'DROP TABLE {table}')
+            await db.execute('DELETE FROM sqlite_sequence WHERE name = ?', (table,))
+            await _rebuild_lookup_views(db)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+    _closed_counts.pop((DB_PATH, month), None)
+    return path, rows
+
+async def _backfill_archived_counts(db, archive_dir):
+    """Count archive files written before archived_lookups existed (schema v2)."""
+    if not os.path.isdir(archive_dir):
+        return
+    hot = set(await _partition_months(db))
+    async with db.execute('SELECT month FROM archived_lookups') as cursor:
+        known = {row[0] for row in await cursor.fetchall()}
+    for name in sorted(os.listdir(archive_dir)):
+        month = name[len(PARTITION_PREFIX):-len('.db')]
+        if not (name.startswith(PARTITION_PREFIX) and name.endswith('.db') and month.isdigit() and len(month) == 6):
+            continue
+        if month in hot or month in known:
+            continue
+        path = os.path.join(archive_dir, name)
+        async with aiosqlite.connect(f'file:{path}?mode=ro', uri=True) as archive:
+            async with archive.execute('SELECT COUNT(*) FROM lookups') as cursor:
+                rows = (await cursor.fetchone())[0]
+        await db.execute('INSERT INTO archived_lookups (month, lookups) VALUES (?, ?)', (month, rows))
+
+async def archive_old_partitions(hot_months, archive_dir):
+    """Archive every partition older than the newest hot_months months. Returns months archived."""
+    cutoff = shift_month(current_month(), -(hot_months - 1))
+    async with aiosqlite.connect(DB_PATH) as db:
+        old = [m for m in await _partition_months(db) if m < cutoff]
+    for month in old:
+        await archive_partition(month, archive_dir)
+    return old
+
+# ==================== RESULT BLOBS ====================
+MIGRATION_BATCH = 1000
+
+def result_hash(body):
+    """Content address of a serialized result (16-byte BLAKE2b digest)."""
+    return hashlib.blake2b(body.encode(), digest_size=16).digest()
+
+async def _migrate_inline_results(db):
+    """Move results stored inline in lookups.result into result_blobs, in batches.
+
+    Runs inside init_db's transaction. Bodies are re-serialized first so old
+    rows dedupe against new ones.
+    Freed pages are reused by SQLite; the file itself only shrinks on VACUUM.
+    """
+    async with db.execute('PRAGMA table_info(lookups)') as cursor:
+        columns = [row[1] for row in await cursor.fetchall()]
+    if 'result_hash' not in columns:
+        await db.execute('ALTER TABLE lookups ADD COLUMN result_hash BLOB')
+    while True:
+        async with db.execute(
+            'SELECT id, result FROM lookups WHERE result IS NOT NULL AND result_hash IS NULL LIMIT ?',
+            (MIGRATION_BATCH,)
+        ) as cursor:
+            rows = await cursor.fetchall()
+        if not rows:
+            break
+        bodies, updates = {}, []
+        for row_id, raw in rows:
+            try:
+                body = json_dumps(json_loads(raw))
+            except JSONDecodeError:
+                body = raw
+            digest = result_hash(body)
+            bodies[digest] = body
+            updates.append((digest, row_id))
+        await db.executemany('INSERT OR IGNORE INTO result_blobs (hash, body) VALUES (?, ?)', bodies.items())
+        await db.executemany('UPDATE lookups SET result = NULL, result_hash = ? WHERE id = ?', updates)
+
+@timed_db
+async def gc_result_blobs():
+    """Delete blobs no lookups row points at any more (mark-and-sweep). Returns blobs removed.
+
+    Deleting or archiving lookups rows never touches result_blobs; this sweep cleans up afterwards.
+    """
+    async with aiosqlite.connect(DB_PATH) as db:
+        # "lookups" view = saare hot partitions
+        cursor = await db.execute('''
+            DELETE FROM result_blobs
+            WHERE hash NOT IN (SELECT result_hash FROM lookups WHERE result_hash IS NOT NULL)
+        ''')
+        await db.commit()
+        return cursor.rowcount
+
+# ==================== MAINTENANCE ====================
+AUTO_VACUUM_MODES = {0: "none", 1: "full", 2: "incremental"}
+
+async def _pragma_value(db, name):
+    async with db.execute(f'PRAGMA {name}') as cursor:
+        return (await cursor.fetchone())[0]
+
+@timed_db
+async def get_db_info():
+    """File sizes and page counters for /dbstatus."""
+    async with aiosqlite.connect(DB_PATH) as db:
+        page_size = await _pragma_value(db, 'page_size')
+        info = {
+            'page_size': page_size,
+            'pages': await _pragma_value(db, 'page_count'),
+            'free_pages': await _pragma_value(db, 'freelist_count'),
+            'auto_vacuum': AUTO_VACUUM_MODES.get(await _pragma_value(db, 'auto_vacuum'), "?"),
+            'journal_mode': await _pragma_value(db, 'journal_mode'),
+        }
+    info['wal_bytes'] = os.path.getsize(DB_PATH + '-wal') if os.path.exists(DB_PATH + '-wal') else 0
+    return info
+
+@timed_db
+async def incremental_vacuum(pages):
+    """Return up to `pages` free pages to the OS. Returns pages freed."""
+    async with aiosqlite.connect(DB_PATH) as db:
+        before = await _pragma_value(db, 'freelist_count')
+        if not before:
+            return 0
+        # execute() sirf ek step chalata hai (= ek page); executescript poora pragma complete karta hai
+        await db.executescript(f'PRAGMA incremental_vacuum({int(pages)});')
+        return before - await _pragma_value(db, 'freelist_count')
+
+@timed_db
+async def optimize_db():
+    """PRAGMA optimize: re-analyzes only tables whose stats look stale."""
+    async with aiosqlite.connect(DB_PATH) as db:
+        await db.execute('PRAGMA optimize')
+
+@timed_db
+async def analyze_db(limit=1000):
+    """ANALYZE with analysis_limit, so each index is sampled instead of fully scanned."""
+    async with aiosqlite.connect(DB_PATH) as db:
+        await db.execute(f'PRAGMA analysis_limit = {int(limit)}')
+        await db.execute('ANALYZE')
         await db.commit()
 
+@timed_db
+async def wal_checkpoint(max_wal_bytes):
+    """PASSIVE checkpoint; TRUNCATE when the -wal file has grown past max_wal_bytes.
+
+    Returns (mode, busy, wal_pages, checkpointed_pages).
+    """
+    wal_path = DB_PATH + '-wal'
+    wal_bytes = os.path.getsize(wal_path) if os.path.exists(wal_path) else 0
+    mode = 'TRUNCATE' if wal_bytes > max_wal_bytes else 'PASSIVE'
+    async with aiosqlite.connect(DB_PATH) as db:
+        async with db.execute(f'PRAGMA wal_checkpoint({mode})') as cursor:
+            busy, log, checkpointed = await cursor.fetchone()
+    return mode, busy, log, checkpointed
+
 # ==================== USER FUNCTIONS ====================
+# Har lookup ke writes (update_user, save_lookup) process me ek ek karke. Event loop busy ho
+# toh khule transaction ka har statement loop ki baari ka wait karta hai; us beech baaki
+# connections SQLite ke busy timeout (5s) me atak kar "database is locked" dete the.
+# Yahan wait karna asyncio lock pe hota hai, bina timeout ke.
+_write_lock = asyncio.Lock()
+
+@timed_db
 async def update_user(user_id, username, first_name, last_name):
     """Update or insert user data."""
-    async with aiosqlite.connect(DB_PATH) as db:
+    async with _write_lock, aiosqlite.connect(DB_PATH) as db:
         await db.execute('''
             INSERT INTO users (user_id, username, first_name, last_name, last_seen)
             VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
@@ -77,12 +476,14 @@ async def update_user(user_id, username, first_name, last_name):
         ''', (user_id, username, first_name, last_name))
         await db.commit()
 
+@timed_db
 async def is_banned(user_id):
     """Check if a user is banned."""
     async with aiosqlite.connect(DB_PATH) as db:
         async with db.execute('SELECT 1 FROM banned WHERE user_id = ?', (user_id,)) as cursor:
             return await cursor.fetchone() is not None
 
+@timed_db
 async def ban_user(user_id, reason, banned_by):
     """Ban a user."""
     async with aiosqlite.connect(DB_PATH) as db:
@@ -90,6 +491,7 @@ async def ban_user(user_id, reason, banned_by):
                          (user_id, reason, banned_by))
         await db.commit()
 
+@timed_db
 async def unban_user(user_id):
     """Unban a user."""
     async with aiosqlite.connect(DB_PATH) as db:
@@ -97,24 +499,36 @@ async def unban_user(user_id):
         await db.commit()
 
 # ==================== ADMIN FUNCTIONS ====================
+@timed_db
 async def is_admin(user_id):
     """Check if a user is an admin."""
     async with aiosqlite.connect(DB_PATH) as db:
         async with db.execute('SELECT 1 FROM admins WHERE user_id = ?', (user_id,)) as cursor:
             return await cursor.fetchone() is not None
 
+@timed_db
 async def add_admin(user_id, added_by):
     """Add a new admin."""
     async with aiosqlite.connect(DB_PATH) as db:
         await db.execute('INSERT OR IGNORE INTO admins (user_id, added_by) VALUES (?, ?)', (user_id, added_by))
         await db.commit()
 
+@timed_db
+async def add_admins(user_ids, added_by):
+    """Add several admins in one transaction (startup seeding)."""
+    async with aiosqlite.connect(DB_PATH) as db:
+        await db.executemany('INSERT OR IGNORE INTO admins (user_id, added_by) VALUES (?, ?)',
+                             [(uid, added_by) for uid in user_ids])
+        await db.commit()
+
+@timed_db
 async def remove_admin(user_id):
     """Remove an admin."""
     async with aiosqlite.connect(DB_PATH) as db:
         await db.execute('DELETE FROM admins WHERE user_id = ?', (user_id,))
         await db.commit()
 
+@timed_db
 async def get_all_admins():
     """Return list of all admin user IDs."""
     async with aiosqlite.connect(DB_PATH) as db:
@@ -123,26 +537,93 @@ async def get_all_admins():
             return [row[0] for row in rows]
 
 # ==================== LOOKUP FUNCTIONS ====================
+@timed_db
 async def save_lookup(user_id, command, query, result):
     """Save a lookup to the database and increment user's lookup count."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute('''
-            INSERT INTO lookups (user_id, command, query, result)
-            VALUES (?, ?, ?, ?)
-        ''', (user_id, command, query, json.dumps(result, ensure_ascii=False)))
+    body = json_dumps(result)
+    digest = result_hash(body)
+    now = datetime.now(timezone.utc)
+    month = now.strftime('%Y%m')
+    async with _write_lock, aiosqlite.connect(DB_PATH) as db:
+        if month not in await _hot_months(db):
+            await _add_partition(db, month)
+        # Same result pehle se stored ho toh sirf index lookup hota hai, koi write nahi
+        await db.execute('INSERT OR IGNORE INTO result_blobs (hash, body) VALUES (?, ?)', (digest, body))
+        # Timestamp yahin se, taaki row usi mahine ki partition me ho jiska naam upar bana
+        await db.execute(f'''
+            INSERT INTO {partition_table(month)} (user_id, command, query, result_hash, timestamp)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (user_id, command, query, digest, now.strftime('%Y-%m-%d %H:%M:%S')))
         await db.execute('UPDATE users SET lookups = lookups + 1 WHERE user_id = ?', (user_id,))
         await db.commit()
 
+@timed_db
 async def get_user_lookups(user_id, limit=10):
     """Get recent lookups for a specific user."""
+    rows = []
     async with aiosqlite.connect(DB_PATH) as db:
-        async with db.execute('''
-            SELECT command, query, timestamp FROM lookups
-            WHERE user_id = ? ORDER BY timestamp DESC LIMIT ?
-        ''', (user_id, limit)) as cursor:
-            return await cursor.fetchall()
+        # Naye mahine pehle; limit poori hote hi purane partitions chhod do
+        for month in reversed(await _hot_months(db)):
+            async with db.execute(f'''
+                SELECT command, query, timestamp FROM {partition_table(month)}
+                WHERE user_id = ? ORDER BY timestamp DESC LIMIT ?
+            ''', (user_id, limit - len(rows))) as cursor:
+                rows.extend(await cursor.fetchall())
+            if len(rows) >= limit:
+                break
+    return rows
+
+# ==================== EXPORT ====================
+LOOKUP_EXPORT_COLUMNS = ('id', 'user_id', 'command', 'query', 'result', 'timestamp')
+USER_EXPORT_COLUMNS = ('user_id', 'username', 'first_name', 'last_name', 'lookups', 'joined_at', 'last_seen')
+
+async def iter_lookups(since=None, until=None, command=None, chunk=1000):
+    """Yield lists of lookup rows (LOOKUP_EXPORT_COLUMNS), keyset-paginated by id.
+
+    since/until are 'YYYY-MM-DD' (until inclusive); only partitions in that
+    range are read, oldest first. Har chunk alag query hai, isliye koi lamba
+    read transaction WAL checkpoint ko block nahi karta.
+    """
+    where, params = ['l.id > ?'], []
+    if since:
+        where.append('l.timestamp >= ?')
+        params.append(since)
+    if until:
+        where.append("l.timestamp < date(?, '+1 day')")
+        params.append(until)
+    if command:
+        where.append('l.command = ?')
+        params.append(command)
+    async with aiosqlite.connect(DB_PATH) as db:
+        for month in _months_in_range(await _hot_months(db), since, until):
+            sql = (f"SELECT l.id, l.user_id, l.command, l.query, b.body, l.timestamp "
+                   f"FROM {partition_table(month)} l LEFT JOIN result_blobs b ON b.hash = l.result_hash "
+                   f"WHERE {' AND '.join(where)} ORDER BY l.id LIMIT ?")
+            last_id = 0
+            while True:
+                async with db.execute(sql, (last_id, *params, chunk)) as cursor:
+                    rows = await cursor.fetchall()
+                if not rows:
+                    break
+                yield rows
+                last_id = rows[-1][0]
+
+async def iter_users(chunk=1000):
+    """Yield lists of user rows (USER_EXPORT_COLUMNS), keyset-paginated by user_id."""
+    sql = (f"SELECT {', '.join(USER_EXPORT_COLUMNS)} FROM users "
+           f"WHERE user_id > ? ORDER BY user_id LIMIT ?")
+    last_id = -2 ** 63
+    async with aiosqlite.connect(DB_PATH) as db:
+        while True:
+            async with db.execute(sql, (last_id, chunk)) as cursor:
+                rows = await cursor.fetchall()
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1][0]
 
 # ==================== STATS & USER LISTS ====================
+@timed_db
 async def get_all_users(limit=10, offset=0):
     """Get paginated list of all users, ordered by last seen."""
     async with aiosqlite.connect(DB_PATH) as db:
@@ -152,6 +633,7 @@ async def get_all_users(limit=10, offset=0):
         ''', (limit, offset)) as cursor:
             return await cursor.fetchall()
 
+@timed_db
 async def get_recent_users(days=7):
     """Get users active within the last N days."""
     since = (datetime.now() - timedelta(days=days)).isoformat()
@@ -162,6 +644,7 @@ async def get_recent_users(days=7):
         ''', (since,)) as cursor:
             return await cursor.fetchall()
 
+@timed_db
 async def get_inactive_users(days=30):
     """Get users inactive for more than N days."""
     since = (datetime.now() - timedelta(days=days)).isoformat()
@@ -172,6 +655,7 @@ async def get_inactive_users(days=30):
         ''', (since,)) as cursor:
             return await cursor.fetchall()
 
+@timed_db
 async def get_leaderboard(limit=10):
     """Get top users by lookup count."""
     async with aiosqlite.connect(DB_PATH) as db:
@@ -181,15 +665,21 @@ async def get_leaderboard(limit=10):
         ''', (limit,)) as cursor:
             return await cursor.fetchall()
 
+@timed_db
 async def get_stats():
     """Get overall bot statistics."""
     async with aiosqlite.connect(DB_PATH) as db:
         # Total users
         async with db.execute('SELECT COUNT(*) FROM users') as cur:
             total_users = (await cur.fetchone())[0]
-        # Total lookups
-        async with db.execute('SELECT COUNT(*) FROM lookups') as cur:
-            total_lookups = (await cur.fetchone())[0]
+        # Total lookups (hot partitions; beete mahino ke counts cached) + archived mahine
+        current = current_month()
+        total_lookups = 0
+        for month in await _hot_months(db):
+            total_lookups += sum((await _month_command_counts(db, month, current)).values())
+        async with db.execute('SELECT COALESCE(SUM(lookups), 0) FROM archived_lookups') as cur:
+            archived_lookups = (await cur.fetchone())[0]
+        total_lookups += archived_lookups
         # Total admins
         async with db.execute('SELECT COUNT(*) FROM admins') as cur:
             total_admins = (await cur.fetchone())[0]
@@ -199,31 +689,42 @@ async def get_stats():
         return {
             'total_users': total_users,
             'total_lookups': total_lookups,
+            'archived_lookups': archived_lookups,
             'total_admins': total_admins,
             'total_banned': total_banned
         }
 
+@timed_db
 async def get_daily_stats(days=7):
     """Get daily command usage statistics for the last N days."""
     since = (datetime.now() - timedelta(days=days)).date().isoformat()
     async with aiosqlite.connect(DB_PATH) as db:
-        async with db.execute('''
+        months = _months_in_range(await _hot_months(db), since)
+        if not months:
+            return []
+        # 'YYYY-MM-DD HH:MM:SS' >= 'YYYY-MM-DD' wahi hai jo date(timestamp) >= since
+        parts = ' UNION ALL '.join(
+            f'SELECT timestamp, command FROM {partition_table(m)} WHERE timestamp >= ?' for m in months
+        )
+        async with db.execute(f'''
             SELECT date(timestamp) as day, command, COUNT(*)
-            FROM lookups WHERE date(timestamp) >= ?
+            FROM ({parts})
             GROUP BY day, command ORDER BY day DESC
-        ''', (since,)) as cursor:
+        ''', (since,) * len(months)) as cursor:
             return await cursor.fetchall()
 
+@timed_db
 async def get_lookup_stats(limit=10):
     """Get most used commands."""
+    current = current_month()
+    totals = Counter()
     async with aiosqlite.connect(DB_PATH) as db:
-        async with db.execute('''
-            SELECT command, COUNT(*) as cnt FROM lookups
-            GROUP BY command ORDER BY cnt DESC LIMIT ?
-        ''', (limit,)) as cursor:
-            return await cursor.fetchall()
+        for month in await _hot_months(db):
+            totals.update(await _month_command_counts(db, month, current))
+    return totals.most_common(limit)
 
 # ==================== GROUP TRACKING ====================
+@timed_db
 async def add_bot_group(group_id, group_name, invite_link=None):
     """Add or update a group where bot is admin."""
     async with aiosqlite.connect(DB_PATH) as db:
@@ -233,12 +734,14 @@ async def add_bot_group(group_id, group_name, invite_link=None):
         ''', (group_id, group_name, invite_link))
         await db.commit()
 
+@timed_db
 async def remove_bot_group(group_id):
     """Remove a group from the list (when bot leaves or loses admin)."""
     async with aiosqlite.connect(DB_PATH) as db:
         await db.execute('DELETE FROM bot_groups WHERE group_id = ?', (group_id,))
         await db.commit()
 
+@timed_db
 async def get_all_groups():
     """Get all groups where bot is admin."""
     async with aiosqlite.connect(DB_PATH) as db:
@@ -0,0 +1,66 @@
+# dedupe.py - Duplicate lookup suppression
+# Reply slow ho toh groups me log same /num ya /vehicle baar baar bhejte hain.
+# Same (chat, user, command, normalized query) ka lookup chal raha ho ya abhi
+# window ke andar khatam hua ho, toh duplicate pe pura pipeline dobara nahi chalta.
+
+import time
+
+
+class RequestDeduper:
+    """Short-window registry of lookups keyed by (chat, user, command, query).
+
+    Runs on the event loop only and lives in process memory: all updates of a
+    chat reach the same worker (the router shards by chat). begin() returns
+    None when the caller owns the lookup (call finish() afterwards), otherwise
+    "in_flight" or "recent" for a duplicate; claim_notice() lets only the
+    first duplicate of a lookup get a notice.
+    """
+
+    def __init__(self, window=10.0, clock=time.monotonic):
+        self.window = window
+        self.clock = clock
+        self._entries = {}  # key -> [started_at, in_flight, noticed]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def begin(self, key):
+        now = self.clock()
+        self._expire(now)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[1]:
+                return "in_flight"
+            if entry[0] + self.window > now:
+                return "recent"
+            del self._entries[key]
+        self._entries[key] = [now, True, False]
+        return None
+
+    def claim_notice(self, key):
+        """True for the first caller per lookup, False afterwards (or when key is unknown)."""
+        entry = self._entries.get(key)
+        if entry is None or entry[2]:
+            return False
+        entry[2] = True
+        return True
+
+    def finish(self, key, completed=True):
+        """Mark the lookup done; a lookup that did not complete is forgotten so a retry runs."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        if not completed or entry[0] + self.window <= self.clock():
+            del self._entries[key]
+        else:
+            entry[1] = False
+
+    def _expire(self, now):
+        # Dict insertion order = start order; aage se expired entries hatao,
+        # pehli chalti hui ya fresh entry pe ruk jao
+        cutoff = now - self.window
+        while self._entries:
+            key, (started_at, in_flight, _) = next(iter(self._entries.items()))
+            if in_flight or started_at > cutoff:
+                break
+            del self._entries[key]
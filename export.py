@@ -0,0 +1,79 @@
+# export.py - Streaming gzip JSONL/CSV export for /export
+# Rows DB se chunks me aate hain (keyset cursor), gzip ho kar ek spooled buffer me
+# jaate hain (chhota ho toh memory, bada ho toh temp file), aur part limit cross
+# hote hi woh part bhej kar naya shuru hota hai. Memory table size pe depend nahi karti.
+
+import io
+import csv
+import gzip
+import asyncio
+import tempfile
+from contextlib import aclosing
+
+from jsonutil import dumps as json_dumps
+
+FORMATS = ("jsonl", "csv")
+
+
+class ExportPart:
+    """One standalone .gz file being written into a spooled buffer."""
+
+    def __init__(self, fmt, columns, spool_bytes):
+        self.fmt = fmt
+        self.columns = columns
+        self.buffer = tempfile.SpooledTemporaryFile(max_size=spool_bytes)
+        self.gz = gzip.GzipFile(fileobj=self.buffer, mode="wb", compresslevel=6)
+        self.rows = 0
+        if fmt == "csv":
+            self._write_csv([columns])
+
+    def _write_csv(self, rows):
+        text = io.StringIO()
+        csv.writer(text).writerows(rows)
+        self.gz.write(text.getvalue().encode("utf-8"))
+
+    def write_rows(self, rows):
+        if self.fmt == "csv":
+            self._write_csv(rows)
+        else:
+            columns = self.columns
+            self.gz.write("".join(json_dumps(dict(zip(columns, row))) + "\n" for row in rows).encode("utf-8"))
+        self.rows += len(rows)
+
+    def compressed_size(self):
+        # gzip apna thoda data buffer rakhta hai, isliye yeh approx hai (limit me margin rakho)
+        return self.buffer.tell()
+
+    def finish(self):
+        """Close the gzip stream and return the buffer rewound for reading."""
+        self.gz.close()
+        self.buffer.seek(0)
+        return self.buffer
+
+
+async def export_rows(chunks, fmt, columns, send_part, part_bytes, spool_bytes=1024 * 1024):
+    """Write an async generator of row chunks as gzip parts; await send_part(fileobj, part_no, rows).
+
+    A part is sent once its compressed size passes part_bytes, so part_bytes
+    should sit a few MB under the upload limit. Returns (rows, parts).
+    """
+    part = ExportPart(fmt, columns, spool_bytes)
+    total, parts = 0, 0
+    try:
+        # aclosing: beech me error aaye toh generator ka DB connection turant band ho
+        async with aclosing(chunks):
+            async for chunk in chunks:
+                # Compression CPU-bound hai; event loop ko free rakho
+                await asyncio.to_thread(part.write_rows, chunk)
+                total += len(chunk)
+                if part.compressed_size() >= part_bytes:
+                    parts += 1
+                    await send_part(part.finish(), parts, part.rows)
+                    part.buffer.close()
+                    part = ExportPart(fmt, columns, spool_bytes)
+        if part.rows or parts == 0:
+            parts += 1
+            await send_part(part.finish(), parts, part.rows)
+    finally:
+        part.buffer.close()
+    return total, parts
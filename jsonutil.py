@@ -0,0 +1,39 @@
+# jsonutil.py - Fast JSON serialization for OSINT Bot
+# orjson installed ho toh wahi use hoga, warna stdlib json pe fallback.
+
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson optional hai
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+# ==================== DUMPS / LOADS ====================
+if orjson is not None:
+    _OPTS = orjson.OPT_NON_STR_KEYS
+    _OPTS_INDENT = _OPTS | orjson.OPT_INDENT_2
+
+    def dumps(obj, indent=False):
+        """Serialize obj to a str (UTF-8, non-ASCII kept as is)."""
+        try:
+            return orjson.dumps(obj, option=_OPTS_INDENT if indent else _OPTS).decode("utf-8")
+        except TypeError:
+            # orjson 64-bit se bade int ya unknown types reject karta hai
+            return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False, default=str)
+
+    def loads(data):
+        """Parse JSON from str or bytes."""
+        return orjson.loads(data)
+else:
+    def dumps(obj, indent=False):
+        """Serialize obj to a str (UTF-8, non-ASCII kept as is)."""
+        return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False, default=str)
+
+    def loads(data):
+        """Parse JSON from str or bytes."""
+        return json.loads(data)
+
+# Dono backends ke parse errors (orjson.JSONDecodeError bhi ValueError hai)
+JSONDecodeError = ValueError
@@ -0,0 +1,117 @@
+# logsetup.py - Logging off the event loop, JSON format, per-lookup correlation IDs
+# Handlers sirf record ko queue me daalte hain; stderr pe likhna QueueListener ke
+# thread me hota hai. LOG_FORMAT=json ho toh har line ek JSON object hai, aur lookup
+# ke andar ki har line pe same request_id hota hai.
+
+import sys
+import copy
+import atexit
+import logging
+import contextvars
+import logging.handlers
+from queue import SimpleQueue
+
+from jsonutil import dumps as json_dumps
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"
+
+_EXC_FORMATTER = logging.Formatter()
+
+_request_id = contextvars.ContextVar("osint_request_id", default="-")
+_listener = None
+
+
+def set_request_id(request_id):
+    """Tag every log record of the current task (one update = one task) with request_id."""
+    _request_id.set(request_id)
+
+
+class RequestIdFilter(logging.Filter):
+    """Copies the current correlation ID onto the record.
+
+    Has to run where the record is created (on the event loop), not in the
+    listener thread, because the ID lives in a ContextVar.
+    """
+
+    def filter(self, record):
+        record.request_id = _request_id.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "msg": record.getMessage(),
+        }
+        exc = self.formatException(record.exc_info) if record.exc_info else record.exc_text
+        if exc:
+            entry["exc"] = exc
+        return json_dumps(entry)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # Message aur traceback yahin text ban jaate hain (args/exception objects thread
+        # ke beech share na hon), lekin final formatting listener thread me hoti hai
+        record = copy.copy(record)
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            record.exc_text = _EXC_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+# httpx har Bot API request ka URL (bot token ke saath) INFO pe log karta hai.
+# Hamesha lagta hai; LOG_LEVELS me httpx explicitly likha ho tabhi badalta hai.
+DEFAULT_MODULE_LEVELS = {"httpx": "WARNING"}
+
+
+def parse_levels(spec):
+    """"telegram=WARNING,osint.lookup=ERROR" -> {"telegram": "WARNING", ...}."""
+    levels = {}
+    for item in spec.split(","):
+        name, sep, level = item.partition("=")
+        if sep and name.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging(level="INFO", fmt="text", module_levels=None, use_queue=True):
+    """Configure the root logger; with use_queue, output is written by a listener thread."""
+    global _listener
+    stop_logging()
+    stream = logging.StreamHandler(sys.stderr)
+    stream.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+
+    if use_queue:
+        queue = SimpleQueue()
+        handler = _QueueHandler(queue)
+        _listener = logging.handlers.QueueListener(queue, stream, respect_handler_level=True)
+        _listener.start()
+    else:
+        handler = stream
+    handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    for old in root.handlers[:]:
+        root.removeHandler(old)
+    root.addHandler(handler)
+    root.setLevel(level)
+    for name, module_level in {**DEFAULT_MODULE_LEVELS, **(module_levels or {})}.items():
+        logging.getLogger(name).setLevel(module_level)
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread (safe to call twice)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+# Exit pe queue me bache records flush ho jayein
+atexit.register(stop_logging)
@@ -4,43 +4,91 @@
 import os
 import sys
 import re
-import json
 import uuid
 import time
 import asyncio
 import logging
-import threading
-import html
+import signal
+import hmac
+import secrets
 import aiosqlite
 import aiohttp
-from datetime import datetime
-from flask import Flask, jsonify
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit, quote
+from aiohttp import web
+from telegram import Bot, Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import (
     Application, CommandHandler, MessageHandler, ChatMemberHandler,
-    filters, ContextTypes, CallbackQueryHandler, ConversationHandler
+    filters, ContextTypes, CallbackQueryHandler, ConversationHandler, BaseRateLimiter, TypeHandler,
+    BaseUpdateProcessor
 )
+from telegram.error import RetryAfter, BadRequest
 from telegram.constants import ParseMode
+from telegram.request import HTTPXRequest
 
 # Import config and database
 from config import *
 from database import *
+from jsonutil import dumps as json_dumps, loads as json_loads, JSONDecodeError
+from ratelimit import TokenBucketLimiter
+from statestore import MemoryStore, create_store
+from validators import normalize_query
+from upstream import EndpointSelector, get_endpoints, adapt
+from prober import ProbeHistory, UpstreamProber
+from maintenance import DatabaseMaintenance
+from admission import AdmissionController
+from dedupe import RequestDeduper
+from pager import ResultPager, render_page, escaped_len
+from export import export_rows, FORMATS as EXPORT_FORMATS
+import tracing
+import render
+import runtime
+from logsetup import setup_logging, parse_levels, set_request_id
+from sendqueue import (
+    SendScheduler, PRIORITY_INTERACTIVE, PRIORITY_ADMIN, PRIORITY_LOG, PRIORITY_BROADCAST
+)
+import metrics
 
 # ==================== SETUP ====================
-logging.basicConfig(
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=logging.INFO
-)
+setup_logging(LOG_LEVEL, LOG_FORMAT, parse_levels(LOG_LEVELS), use_queue=LOG_QUEUE)
 logger = logging.getLogger(__name__)
-
-flask_app = Flask(__name__)
+# Har lookup ki success/progress lines; production me LOG_LEVELS="osint.lookup=WARNING" se band
+lookup_log = logging.getLogger("osint.lookup")
 
 # ==================== CONVERSATION STATES ====================
 WAITING_MESSAGE = 1
 
 # ==================== UTILITY FUNCTIONS ====================
 CACHE_EXPIRY = 300
-copy_cache = {}
+# Copy button data; shared between workers when REDIS_URL is set
+state_store = create_store(REDIS_URL)
+lookup_limiter = TokenBucketLimiter(idle_ttl=RATE_LIMIT_IDLE_TTL)
+upstream_selector = EndpointSelector()
+probe_history = ProbeHistory(size=PROBE_HISTORY)
+admission = AdmissionController(**ADMISSION)
+tracer = tracing.Tracer(sample_rate=TRACE_SAMPLE_RATE, json_logs=TRACE_JSON_LOGS)
+recorder = None  # TrafficRecorder when CAPTURE_PATH is set
+db_maintenance = None  # DatabaseMaintenance in the worker that runs it
+export_lock = asyncio.Lock()  # ek time pe ek hi export (memory/CPU bounded)
+deduper = RequestDeduper(window=DEDUPE_WINDOW)
+result_pager = ResultPager(page_chars=RESULT_PAGE_CHARS, ttl=RESULT_PAGE_TTL, max_entries=RESULT_PAGE_CACHE_SIZE)
+def worker_share(limit):
+    """This process's part of a bot-wide (rate, burst) budget when running as one of WORKERS."""
+    if WORKER_INDEX is None or WORKERS <= 1:
+        return limit
+    rate, burst = limit
+    return rate / WORKERS, max(1, burst // WORKERS)
+
+send_scheduler = SendScheduler(
+    global_limit=worker_share(SEND_LIMITS["global"]),
+    private_limit=SEND_LIMITS["private"],
+    group_limit=SEND_LIMITS["group"],
+    log_chats={info["log"] for info in COMMANDS.values() if info.get("log")},
+    log_limit=worker_share(SEND_LIMITS["log"])
+)
+# Command bucket bot-wide budget hai; chat/user buckets sharding ki wajah se per worker hi sahi hain
+lookup_limits = dict(RATE_LIMITS, command=worker_share(RATE_LIMITS["command"]))
+log_posts = set()  # background log channel sends (strong refs, warna task GC ho sakta hai)
 
 def clean_branding(text, extra_blacklist=None):
     if not text:
@@ -55,20 +103,160 @@ def clean_branding(text, extra_blacklist=None):
     return text.strip()
 
 async def call_api(url):
+    """GET url and parse JSON. Returns (ok, data); on failure data is {"error": ...}."""
+    host = urlsplit(url).hostname or "unknown"
+    status = "error"
+    start = time.perf_counter()
     async with aiohttp.ClientSession() as session:
         try:
-            async with session.get(url, timeout=20) as resp:
+            async with session.get(url, timeout=UPSTREAM_TIMEOUT) as resp:
+                status = str(resp.status)
                 if resp.status == 200:
                     try:
-                        return await resp.json()
-                    except:
-                        return {"error": "Invalid JSON response"}
+                        return True, json_loads(await resp.read())
+                    except JSONDecodeError:
+                        return False, {"error": "Invalid JSON response"}
                 else:
-                    return {"error": f"HTTP {resp.status}"}
+                    return False, {"error": f"HTTP {resp.status}"}
         except asyncio.TimeoutError:
-            return {"error": "Request timeout"}
+            status = "timeout"
+            return False, {"error": "Request timeout"}
         except Exception as e:
-            return {"error": str(e)}
+            return False, {"error": str(e)}
+        finally:
+            metrics.UPSTREAM_REQUESTS.inc(host=host, status=status)
+            metrics.UPSTREAM_LATENCY.observe(time.perf_counter() - start, host=host)
+
+async def call_command_api(cmd, cmd_info, query):
+    """Try the command's endpoints best-first, failing over on errors.
+
+    Returns the adapted payload of the first endpoint that succeeds, or the
+    last error payload if all attempts fail.
+    """
+    encoded = quote(query, safe='')
+    endpoints = upstream_selector.order(get_endpoints(cmd_info))[:UPSTREAM_MAX_ATTEMPTS]
+    data = None
+    for endpoint in endpoints:
+        url = endpoint["url"].format(encoded)
+        # Poora URL (query ke saath) sirf debug me
+        lookup_log.debug("🔗 API Call: %s", url)
+        start = time.perf_counter()
+        ok, data = await call_api(url)
+        latency = time.perf_counter() - start
+        upstream_selector.record(endpoint["url"], latency, ok)
+        if recorder:
+            recorder.upstream(cmd, latency, ok, None if ok else data["error"])
+        if ok:
+            return adapt(endpoint, data)
+        lookup_log.warning("⚠️ Upstream failed: %s", data['error'])
+    return data
+
+class InstrumentedRequest(HTTPXRequest):
+    """HTTPXRequest that records Bot API latency/status and the polling heartbeat."""
+
+    async def do_request(self, url, method, *args, **kwargs):
+        api_method = url.rsplit("/", 1)[-1]
+        status = "error"
+        start = time.perf_counter()
+        try:
+            code, payload = await super().do_request(url, method, *args, **kwargs)
+            status = str(code)
+            return code, payload
+        finally:
+            if api_method == "getUpdates":
+                if status != "error":
+                    metrics.mark_poll()
+            else:
+                metrics.TELEGRAM_REQUESTS.inc(method=api_method, status=status)
+                metrics.TELEGRAM_LATENCY.observe(time.perf_counter() - start, method=api_method)
+
+class ScheduledRateLimiter(BaseRateLimiter):
+    """Routes every outgoing message through send_scheduler.
+
+    Pass a PRIORITY_* value as rate_limit_args on bot calls; reply_* shortcuts
+    don't forward it and default to PRIORITY_INTERACTIVE. On RetryAfter all
+    sends pause for the requested time and the call is retried.
+
+    Always installed (PTB rejects rate_limit_args without a limiter); with
+    enabled=False every request goes straight through.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+
+    SCHEDULED_PREFIXES = ("send", "copy", "forward", "edit")
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    async def process_request(self, callback, args, kwargs, endpoint, data, rate_limit_args):
+        if not self.enabled or not endpoint.startswith(self.SCHEDULED_PREFIXES):
+            return await callback(*args, **kwargs)
+        priority = PRIORITY_INTERACTIVE if rate_limit_args is None else rate_limit_args
+        attempt = 0
+        while True:
+            await send_scheduler.acquire(data.get("chat_id"), priority)
+            try:
+                return await callback(*args, **kwargs)
+            except RetryAfter as e:
+                attempt += 1
+                if attempt > SEND_MAX_RETRIES:
+                    raise
+                delay = e.retry_after.total_seconds() if isinstance(e.retry_after, timedelta) else e.retry_after
+                logger.warning("⏳ RetryAfter %ss on %s, pausing all sends", delay, endpoint)
+                send_scheduler.pause(delay)
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """Concurrent updates, but one at a time per (chat, user).
+
+    ConversationHandler state (/broadcast, /dm, /bulkdm) is keyed by
+    (chat, user) and is not safe under concurrent updates: an admin's
+    quick reply could be checked before the entry command stored its state.
+    Different users and chats still run in parallel. The per-key wait
+    happens before a concurrency slot is taken, so one user flooding the
+    bot cannot tie up the slots of everyone else.
+    """
+
+    def __init__(self, max_concurrent_updates):
+        super().__init__(max_concurrent_updates)
+        self._keys = {}  # (chat_id, user_id) -> [asyncio.Lock, updates waiting or running]
+
+    @staticmethod
+    def conversation_key(update):
+        if not isinstance(update, Update):
+            return None
+        chat, user = update.effective_chat, update.effective_user
+        if chat is None and user is None:
+            return None
+        return (chat.id if chat else None, user.id if user else None)
+
+    async def process_update(self, update, coroutine):
+        key = self.conversation_key(update)
+        if key is None:
+            return await super().process_update(update, coroutine)
+        entry = self._keys.get(key)
+        if entry is None:
+            entry = self._keys[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                await super().process_update(update, coroutine)
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._keys[key]
+
+    async def do_process_update(self, update, coroutine):
+        await coroutine
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
 
 async def check_force_join(bot, user_id):
     missing = []
@@ -88,53 +276,70 @@ def get_force_join_keyboard(missing):
     keyboard.append([InlineKeyboardButton("✅ I've joined", callback_data="verify_join")])
     return InlineKeyboardMarkup(keyboard)
 
-def store_copy_data(data):
+async def store_copy_data(data):
     uid = str(uuid.uuid4())
-    copy_cache[uid] = {"data": data, "time": time.time()}
+    await state_store.set(f"copy:{uid}", data, ttl=CACHE_EXPIRY)
     return uid
 
-def get_copy_button(data):
-    return InlineKeyboardButton("📋 Copy", callback_data=f"copy:{store_copy_data(data)}")
+async def get_copy_button(data):
+    return InlineKeyboardButton("📋 Copy", callback_data=f"copy:{await store_copy_data(data)}")
 
 def get_search_button(cmd):
     return InlineKeyboardButton("🔍 Search", callback_data=f"search:{cmd}")
 
-# ==================== COMMAND LIST GENERATORS ====================
-def get_commands_list():
-    lines = ["📋 **AVAILABLE COMMANDS**", "────────────────────────────"]
-    for cmd, info in COMMANDS.items():
-        lines.append(f"• `/{cmd} [{info['param']}]` → {info['desc']}")
-    lines.append(CMD_LIST_FOOTER)
-    return "\n".join(lines)
-
-def get_admin_commands_list():
-    admin_cmds = [
-        "`/broadcast` - Send a message to all users (two-step)",
-        "`/dm <user_id>` - DM to one user (two-step)",
-        "`/bulkdm <id1> <id2> ...` - Bulk DM (two-step)",
-        "`/ban <user_id> [reason]` - Ban a user",
-        "`/unban <user_id>` - Unban a user",
-        "`/deleteuser <user_id>` - Delete user from DB",
-        "`/searchuser <query>` - Search users",
-        "`/users [page]` - List users",
-        "`/recentusers [days]` - Recently active users",
-        "`/inactiveusers [days]` - Inactive users",
-        "`/userlookups <user_id>` - User's last lookups",
-        "`/leaderboard` - Top users",
-        "`/stats` - Bot statistics",
-        "`/dailystats [days]` - Daily stats",
-        "`/lookupstats` - Command usage stats",
-        "`/addadmin <user_id>` (owner only)",
-        "`/removeadmin <user_id>` (owner only)",
-        "`/listadmins` - List all admins",
-        "`/settings` - Bot settings (WIP)",
-        "`/fulldbbackup` - Download database backup",
-        "`/group` - List groups where bot is admin"
-    ]
-    lines = ["👑 **ADMIN COMMANDS**", "────────────────────────────"]
-    lines.extend(admin_cmds)
-    lines.append(CMD_LIST_FOOTER)
-    return "\n".join(lines)
+def get_page_keyboard(result_id, index, total, cmd):
+    nav = []
+    if index > 0:
+        nav.append(InlineKeyboardButton("◀", callback_data=f"page:{result_id}:{index - 1}"))
+    nav.append(InlineKeyboardButton(f"{index + 1}/{total}", callback_data="noop"))
+    if index < total - 1:
+        nav.append(InlineKeyboardButton("▶", callback_data=f"page:{result_id}:{index + 1}"))
+    return InlineKeyboardMarkup([
+        nav,
+        [InlineKeyboardButton("📥 Full file", callback_data=f"pagefile:{result_id}"), get_search_button(cmd)],
+    ])
+
+def check_rate_limit(user_id, chat_id, cmd):
+    """Return (allowed, retry_after) for one lookup by user_id in chat_id."""
+    return lookup_limiter.try_acquire((
+        (("user", user_id), *lookup_limits["user"]),
+        (("chat", chat_id), *lookup_limits["chat"]),
+        (("command", cmd), *lookup_limits["command"]),
+    ))
+
+# ==================== COMMAND LIST TEXTS ====================
+ADMIN_COMMAND_LINES = (
+    "`/broadcast` - Send a message to all users (two-step)",
+    "`/dm <user_id>` - DM to one user (two-step)",
+    "`/bulkdm <id1> <id2> ...` - Bulk DM (two-step)",
+    "`/ban <user_id> [reason]` - Ban a user",
+    "`/unban <user_id>` - Unban a user",
+    "`/deleteuser <user_id>` - Delete user from DB",
+    "`/searchuser <query>` - Search users",
+    "`/users [page]` - List users",
+    "`/recentusers [days]` - Recently active users",
+    "`/inactiveusers [days]` - Inactive users",
+    "`/userlookups <user_id>` - User's last lookups",
+    "`/leaderboard` - Top users",
+    "`/stats` - Bot statistics",
+    "`/dailystats [days]` - Daily stats",
+    "`/lookupstats` - Command usage stats",
+    "`/apistatus` - Upstream API health (probe results)",
+    "`/dbstatus` - Database size and maintenance runs",
+    "`/partitions [archive YYYY-MM]` - Monthly lookup tables, archive an old month",
+    "`/addadmin <user_id>` (owner only)",
+    "`/removeadmin <user_id>` (owner only)",
+    "`/listadmins` - List all admins",
+    "`/settings` - Bot settings (WIP)",
+    "`/perf [command]` - Per-stage lookup latency (owner only)",
+    "`/mem [trace start|stop]` - Memory diagnostics (owner only, MEMDEBUG=1)",
+    "`/fulldbbackup` - Download database backup",
+    "`/export lookups|users [days|YYYY-MM-DD..YYYY-MM-DD] [command] [jsonl|csv]` - Gzipped data export",
+    "`/group` - List groups where bot is admin",
+)
+# Static hain, isliye startup pe ek baar render
+COMMANDS_TEXT = render.commands_text(COMMANDS, CMD_LIST_FOOTER)
+ADMIN_COMMANDS_TEXT = render.admin_commands_text(ADMIN_COMMAND_LINES, CMD_LIST_FOOTER)
 
 # ==================== FILTERS ====================
 async def group_only(update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
@@ -178,10 +383,10 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     try:
         await update_user(user.id, user.username, user.first_name, user.last_name)
     except Exception as e:
-        logger.error(f"Failed to update user: {e}")
+        logger.error("Failed to update user: %s", e)
     if not await force_join_filter(update, context):
         return
-    welcome = f"👋 **Welcome {user.first_name}!**\n\n" + get_commands_list()
+    welcome = f"👋 **Welcome {user.first_name}!**\n\n" + COMMANDS_TEXT
     await update.message.reply_text(welcome, parse_mode=ParseMode.MARKDOWN)
 
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -189,19 +394,88 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     try:
         await update_user(user.id, user.username, user.first_name, user.last_name)
     except Exception as e:
-        logger.error(f"Failed to update user: {e}")
+        logger.error("Failed to update user: %s", e)
     if not await force_join_filter(update, context):
         return
-    await update.message.reply_text(get_commands_list(), parse_mode=ParseMode.MARKDOWN)
+    await update.message.reply_text(COMMANDS_TEXT, parse_mode=ParseMode.MARKDOWN)
 
 async def admin_help(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user = update.effective_user
     if user.id != OWNER_ID and not await is_admin(user.id):
         await update.message.reply_text("❌ **This command is for admins only.**", parse_mode=ParseMode.MARKDOWN)
         return
-    await update.message.reply_text(get_admin_commands_list(), parse_mode=ParseMode.MARKDOWN)
+    await update.message.reply_text(ADMIN_COMMANDS_TEXT, parse_mode=ParseMode.MARKDOWN)
 
 # ==================== COMMAND HANDLER (with branding, log, long output as file) ====================
+# ==================== LOG CHANNEL POSTS ====================
+def spawn_log_post(coro):
+    """Run a log channel send in the background; drop it when too many are pending."""
+    if len(log_posts) >= LOG_POST_MAX_PENDING:
+        coro.close()
+        metrics.LOG_POSTS_DROPPED.inc()
+        lookup_log.warning("⚠️ %s log posts pending, dropping one", len(log_posts))
+        return
+    task = asyncio.create_task(tracing.background("log_channel", coro))
+    log_posts.add(task)
+    task.add_done_callback(log_posts.discard)
+
+async def post_log_file(bot, log_channel_id, file_bytes, filename, caption):
+    try:
+        await bot.send_document(
+            chat_id=log_channel_id,
+            document=file_bytes,
+            filename=filename,
+            caption=caption,
+            parse_mode=ParseMode.HTML,  # HTML for bold
+            rate_limit_args=PRIORITY_LOG
+        )
+        lookup_log.info("✅ File sent to log channel %s with HTML", log_channel_id)
+    except Exception as e:
+        lookup_log.error("❌ Log channel file send failed (HTML): %s", e, exc_info=True)
+        # Try sending without parse_mode (plain caption)
+        try:
+            await bot.send_document(
+                chat_id=log_channel_id,
+                document=file_bytes,
+                filename=filename,
+                caption=re.sub(r'<[^>]+>', '', caption),  # strip HTML tags
+                rate_limit_args=PRIORITY_LOG
+            )
+            lookup_log.info("✅ File sent to log channel (plain caption) %s", log_channel_id)
+        except Exception as e2:
+            lookup_log.error("❌ Log channel file send even plain failed: %s", e2, exc_info=True)
+
+async def post_log_text(bot, log_channel_id, log_text):
+    try:
+        await bot.send_message(
+            chat_id=log_channel_id,
+            text=log_text,
+            parse_mode='MarkdownV2',
+            rate_limit_args=PRIORITY_LOG
+        )
+        lookup_log.info("✅ Log sent to channel %s with MarkdownV2", log_channel_id)
+    except Exception as e:
+        lookup_log.error("❌ MarkdownV2 send failed: %s", e, exc_info=True)
+        # Fallback to Markdown (legacy)
+        try:
+            await bot.send_message(
+                chat_id=log_channel_id,
+                text=log_text,
+                parse_mode=ParseMode.MARKDOWN,
+                rate_limit_args=PRIORITY_LOG
+            )
+            lookup_log.info("✅ Log sent with legacy Markdown to %s", log_channel_id)
+        except Exception as e2:
+            lookup_log.error("❌ Legacy Markdown also failed: %s", e2, exc_info=True)
+            # Final fallback: plain text
+            try:
+                plain_text = re.sub(r'[*_`\\[\\]]', '', log_text)
+                await bot.send_message(chat_id=log_channel_id, text=plain_text, rate_limit_args=PRIORITY_LOG)
+                lookup_log.info("✅ Plain text log sent to %s", log_channel_id)
+            except Exception as e3:
+                lookup_log.error("❌ Plain text also failed: %s", e3, exc_info=True)
+
+@metrics.track_lookup
 async def handle_command(update: Update, context: ContextTypes.DEFAULT_TYPE, cmd: str, query: str):
     cmd_info = COMMANDS.get(cmd)
     if not cmd_info:
@@ -211,9 +485,10 @@ async def handle_command(update: Update, context: ContextTypes.DEFAULT_TYPE, cmd
     # ========== SPECIAL HANDLING FOR tg2num (REMOVED: username resolve) ==========
     # Ab tg2num sirf numeric user ID accept karega.
 
-    url = cmd_info["url"].format(query)
-    logger.info(f"🔗 API Call: {url}")
-    data = await call_api(url)
+    tracing.set_command(cmd)
+    t = tracing.mark()
+    data = await call_command_api(cmd, cmd_info, query)
+    tracing.record("call_api", t)
 
     # ========== REMOVE UNWANTED FIELDS FOR tg2num ==========
     if cmd == 'tg2num' and isinstance(data, dict):
@@ -239,159 +514,150 @@ async def handle_command(update: Update, context: ContextTypes.DEFAULT_TYPE, cmd
         }
 
     # Clean branding from original API response
-    json_str = json.dumps(data, indent=2, ensure_ascii=False)
+    t = tracing.mark()
+    json_str = json_dumps(data, indent=True)
+    tracing.record("json_dump", t)
+    t = tracing.mark()
     cleaned = clean_branding(json_str, cmd_info.get("extra_blacklist", []))
-    cleaned_escaped = html.escape(cleaned)
-
-    # Footer with HTML bold tags
-    extra_footer = "\n\n━━━━━━━━━━━━━━━━━━━━\n👨‍💻 <b>Developer:</b> @Nullprotocol_X\n⚡ <b>Powered by:</b> NULL PROTOCOL"
+    tracing.record("clean_branding", t)
 
-    # Prepare final HTML message for user
-    output_html = f"<pre>{cleaned_escaped}</pre>{extra_footer}"
-
-    # Check if output is too long
-    is_long = len(output_html) > 4096 or len(cleaned) > 3000
+    # Check if output is too long (escaped length counted without escaping everything)
+    is_long = len(cleaned) > 3000 or escaped_len(cleaned) + len("<pre></pre>") + len(render.RESULT_FOOTER) > 4096
     log_channel_id = cmd_info.get("log")
 
     if log_channel_id:
-        logger.info(f"📢 Log channel for /{cmd}: {log_channel_id}")
+        lookup_log.info("📢 Log channel for /%s: %s", cmd, log_channel_id)
     else:
-        logger.error(f"❌ No log channel configured for /{cmd}")
+        lookup_log.error("❌ No log channel configured for /%s", cmd)
 
-    # ========== HANDLE LONG OUTPUT (FILE) ==========
+    # ========== HANDLE LONG OUTPUT (PAGES / FILE) ==========
     if is_long:
         filename = f"{cmd}_{query[:50].replace(' ', '_')}.json"
+        file_bytes = cleaned.encode('utf-8')
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(cleaned)
-            logger.info(f"✅ File created: {filename}")
-
-            # 1. Send file to user
-            with open(filename, 'rb') as f:
+            # 1. Send first page (or the whole file) to user
+            t = tracing.mark()
+            if RESULT_PAGES_ENABLED:
+                result_id = result_pager.put(cleaned, filename, cmd)
+                entry = result_pager.get(result_id)
+                await update.message.reply_text(
+                    render_page(entry, 0, render.RESULT_FOOTER),
+                    parse_mode=ParseMode.HTML,
+                    reply_markup=get_page_keyboard(result_id, 0, len(entry.pages), cmd)
+                )
+                lookup_log.info("✅ Page 1/%s sent to user %s", len(entry.pages), update.effective_user.id)
+            else:
                 await update.message.reply_document(
-                    document=f,
+                    document=file_bytes,
                     filename=filename,
                     caption=f"📎 Output too long, sent as file.\n\nDeveloper: @Nullprotocol_X\nPowered by: NULL PROTOCOL"
                 )
-            logger.info(f"✅ File sent to user {update.effective_user.id}")
+                lookup_log.info("✅ File sent to user %s", update.effective_user.id)
+            tracing.record("reply", t)
 
-            # 2. Send same file to log channel with user info in caption (using HTML for bold)
+            # 2. Same file log channel me (background, user reply/DB write iska wait nahi karte)
             if log_channel_id:
-                user_info_caption = (
-                    f"👤 <b>User:</b> {update.effective_user.id} (@{update.effective_user.username or 'N/A'})\n"
-                    f"🔍 <b>Command:</b> /{cmd}\n"
-                    f"📝 <b>Query:</b> <code>{query}</code>\n\n"
-                    f"📎 Output too long, sent as file."
+                caption = render.log_caption_html(
+                    update.effective_user.id, update.effective_user.username, cmd, query
                 )
-                try:
-                    with open(filename, 'rb') as f:
-                        await context.bot.send_document(
-                            chat_id=log_channel_id,
-                            document=f,
-                            filename=filename,
-                            caption=user_info_caption,
-                            parse_mode=ParseMode.HTML  # HTML for bold
-                        )
-                    logger.info(f"✅ File sent to log channel {log_channel_id} with HTML")
-                except Exception as e:
-                    logger.error(f"❌ Log channel file send failed (HTML): {e}", exc_info=True)
-                    # Try sending without parse_mode (plain caption)
-                    try:
-                        with open(filename, 'rb') as f:
-                            await context.bot.send_document(
-                                chat_id=log_channel_id,
-                                document=f,
-                                filename=filename,
-                                caption=re.sub(r'<[^>]+>', '', user_info_caption)  # strip HTML tags
-                            )
-                        logger.info(f"✅ File sent to log channel (plain caption) {log_channel_id}")
-                    except Exception as e2:
-                        logger.error(f"❌ Log channel file send even plain failed: {e2}", exc_info=True)
+                spawn_log_post(post_log_file(context.bot, log_channel_id, file_bytes, filename, caption))
             else:
-                logger.warning("⚠️ No log channel, skipping file log.")
+                lookup_log.warning("⚠️ No log channel, skipping file log.")
 
         except Exception as e:
-            logger.error(f"❌ File handling error: {e}", exc_info=True)
+            lookup_log.error("❌ Long output handling error: %s", e, exc_info=True)
             await update.message.reply_text(f"❌ File send failed: {e}")
-        finally:
-            if os.path.exists(filename):
-                os.remove(filename)
-                logger.info(f"🗑️ File {filename} removed")
 
     # ========== HANDLE NORMAL OUTPUT (TEXT) ==========
     else:
+        t = tracing.mark()
+        output_html = render.result_html(cleaned)
+        tracing.record("html_escape", t)
+
         # Send to user (HTML format)
-        keyboard = [[get_copy_button(data), get_search_button(cmd)]]
+        t = tracing.mark()
+        keyboard = [[await get_copy_button(data), get_search_button(cmd)]]
         reply_markup = InlineKeyboardMarkup(keyboard)
         await update.message.reply_text(output_html, parse_mode=ParseMode.HTML, reply_markup=reply_markup)
-        logger.info(f"✅ Text response sent to user {update.effective_user.id}")
+        tracing.record("reply", t)
+        lookup_log.info("✅ Text response sent to user %s", update.effective_user.id)
 
-        # Send log as text message with syntax highlighting (MarkdownV2)
+        # Send log as text message with syntax highlighting (MarkdownV2), in the background
         if log_channel_id:
-            # Prepare JSON string for log
-            json_for_log = json.dumps(data, indent=2, ensure_ascii=False)
-            # Escape special characters for MarkdownV2
-            escape_chars = ['_', '*', '[', ']', '(', ')', '~', '`', '>', '#', '+', '-', '=', '|', '{', '}', '.', '!']
-            def escape_md(text):
-                for ch in escape_chars:
-                    text = text.replace(ch, '\\' + ch)
-                return text
-
-            # User info (safe part, no need to escape fully but we'll do basic)
-            user_info = f"👤 *User:* {update.effective_user.id} (@{escape_md(update.effective_user.username or 'N/A')})\n"
-            cmd_line = f"🔍 *Command:* /{cmd}\n"
-            query_line = f"📝 *Query:* `{escape_md(query)}`\n\n"
-            json_block = f"```json\n{json_for_log}\n```"
-
-            log_text = user_info + cmd_line + query_line + json_block
-
-            try:
-                await context.bot.send_message(
-                    chat_id=log_channel_id,
-                    text=log_text,
-                    parse_mode='MarkdownV2'
-                )
-                logger.info(f"✅ Log sent to channel {log_channel_id} with MarkdownV2")
-            except Exception as e:
-                logger.error(f"❌ MarkdownV2 send failed: {e}", exc_info=True)
-                # Fallback to Markdown (legacy)
-                try:
-                    await context.bot.send_message(
-                        chat_id=log_channel_id,
-                        text=log_text,
-                        parse_mode=ParseMode.MARKDOWN
-                    )
-                    logger.info(f"✅ Log sent with legacy Markdown to {log_channel_id}")
-                except Exception as e2:
-                    logger.error(f"❌ Legacy Markdown also failed: {e2}", exc_info=True)
-                    # Final fallback: plain text
-                    try:
-                        plain_text = re.sub(r'[*_`\\[\\]]', '', log_text)
-                        await context.bot.send_message(chat_id=log_channel_id, text=plain_text)
-                        logger.info(f"✅ Plain text log sent to {log_channel_id}")
-                    except Exception as e3:
-                        logger.error(f"❌ Plain text also failed: {e3}", exc_info=True)
+            # User ko `cleaned` gaya; log channel me uncleaned json_str (upstream branding ke saath),
+            # jaisa hamesha se tha. Dono same json_dumps output se bante hain, dobara serialize nahi hota
+            log_text = render.log_markdown(update.effective_user.id, update.effective_user.username, cmd, query, json_str)
+            spawn_log_post(post_log_text(context.bot, log_channel_id, log_text))
         else:
-            logger.warning("⚠️ No log channel, skipping text log.")
+            lookup_log.warning("⚠️ No log channel, skipping text log.")
 
     # Save lookup to DB
     try:
+        t = tracing.mark()
         await save_lookup(update.effective_user.id, cmd, query, data)
-        logger.info(f"✅ Lookup saved for user {update.effective_user.id}")
+        tracing.record("save_lookup", t)
+        lookup_log.info("✅ Lookup saved for user %s", update.effective_user.id)
     except Exception as e:
-        logger.error(f"❌ Failed to save lookup: {e}", exc_info=True)
+        lookup_log.error("❌ Failed to save lookup: %s", e, exc_info=True)
+
+DEDUPE_NOTICES = {
+    "in_flight": "⏳ Yeh lookup already processing hai, result aa raha hai.",
+    "recent": "✅ Yeh lookup abhi answer ho chuka hai, upar wala result dekho.",
+}
 
+def dedupe_key(update: Update):
+    """(chat, user, command, normalized query) of a lookup message, None for anything else."""
+    text = update.message.text
+    if not text or not text.startswith('/'):
+        return None
+    parts = text.split(maxsplit=1)
+    cmd = parts[0][1:].split('@')[0].lower()
+    if cmd not in COMMANDS or len(parts) < 2:
+        return None
+    query = normalize_query(COMMANDS[cmd], parts[1])
+    if query is None:
+        return None
+    return (update.effective_chat.id, update.effective_user.id, cmd, query)
+
+@tracer.traced
 async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    set_request_id(f"u{update.update_id}")
+    t = tracing.mark()
     if not await group_only(update, context):
         return
+    tracing.record("group_only", t)
+
+    # Same lookup chal raha ho / abhi hua ho toh force-join, upstream, log, DB sab skip
+    key = dedupe_key(update) if DEDUPE_ENABLED else None
+    if key:
+        state = deduper.begin(key)
+        if state:
+            metrics.DEDUPED.inc(command=key[2], state=state)
+            lookup_log.info("🔁 Duplicate /%s from %s in %s suppressed (%s)", key[2], key[1], key[0], state)
+            if DEDUPE_NOTICE and deduper.claim_notice(key):
+                await update.message.reply_text(DEDUPE_NOTICES[state])
+            return
+    completed = False
+    try:
+        completed = await process_message(update, context)
+    finally:
+        if key:
+            deduper.finish(key, completed)
+
+async def process_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Everything after group_only; True once a lookup was actually handled."""
+    t = tracing.mark()
     if not await force_join_filter(update, context):
         return
+    tracing.record("force_join", t)
 
     u = update.effective_user
+    t = tracing.mark()
     try:
         await update_user(u.id, u.username, u.first_name, u.last_name)
     except Exception as e:
-        logger.error(f"Failed to update user: {e}")
+        lookup_log.error("Failed to update user: %s", e)
+    tracing.record("update_user", t)
 
     text = update.message.text
     if not text or not text.startswith('/'):
@@ -406,10 +672,46 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text(f"Usage: `/{cmd} <{param}>`", parse_mode=ParseMode.MARKDOWN)
         return
 
-    await handle_command(update, context, cmd, query)
+    if cmd in COMMANDS:
+        normalized = normalize_query(COMMANDS[cmd], query)
+        if normalized is None:
+            metrics.INVALID_QUERIES.inc(command=cmd)
+            param = COMMANDS[cmd]["param"]
+            await update.message.reply_text(f"❌ Invalid {param}.\nUsage: `/{cmd} <{param}>`", parse_mode=ParseMode.MARKDOWN)
+            return
+        query = normalized
+
+    if cmd in COMMANDS and RATE_LIMITS_ENABLED and u.id != OWNER_ID and not await is_admin(u.id):
+        allowed, retry_after = check_rate_limit(u.id, update.effective_chat.id, cmd)
+        if not allowed:
+            metrics.RATE_LIMITED.inc(command=cmd)
+            await update.message.reply_text(
+                f"⏳ **Thoda slow karo!** {int(retry_after) + 1}s baad try karo.",
+                parse_mode=ParseMode.MARKDOWN
+            )
+            return
+
+    if cmd in COMMANDS:
+        queue_delay = time.time() - update.message.date.timestamp()
+        shed_reason = admission.try_admit(cmd, queue_delay)
+        if shed_reason:
+            metrics.SHED.inc(command=cmd, reason=shed_reason)
+            lookup_log.warning("🚦 Shed /%s (%s)", cmd, shed_reason)
+            await update.message.reply_text("🚦 **Bot abhi busy hai.** Thodi der baad try karo.", parse_mode=ParseMode.MARKDOWN)
+            return
+        try:
+            await handle_command(update, context, cmd, query)
+        finally:
+            admission.release(cmd)
+        return True
+
+    # Unknown command handle_command tak nahi jaata: uske metrics har naye naam pe nayi
+    # series banate (koi bhi group member /metrics ko unbounded bada kar sakta tha)
+    await update.message.reply_text("❌ Command not found.")
 
 # ==================== CALLBACK HANDLER ====================
 async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    set_request_id(f"u{update.update_id}")
     query = update.callback_query
     await query.answer()
     data = query.data
@@ -426,19 +728,50 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             )
     elif data.startswith("copy:"):
         uid = data.split(":", 1)[1]
-        entry = copy_cache.get(uid)
-        if entry and (time.time() - entry["time"]) < CACHE_EXPIRY:
+        entry = await state_store.pop(f"copy:{uid}")
+        if entry is not None:
+            metrics.CACHE_REQUESTS.inc(cache="copy", result="hit")
             await query.message.reply_text(
-                f"```json\n{json.dumps(entry['data'], indent=2)}\n```",
+                f"```json\n{json_dumps(entry, indent=True)}\n```",
                 parse_mode=ParseMode.MARKDOWN
             )
-            del copy_cache[uid]
         else:
-            copy_cache.pop(uid, None)
+            metrics.CACHE_REQUESTS.inc(cache="copy", result="miss")
             await query.message.reply_text("❌ **Copy data expired. Please run the command again.**", parse_mode=ParseMode.MARKDOWN)
     elif data.startswith("search:"):
         cmd = data.split(":", 1)[1]
         await query.message.reply_text(f"Send `/{cmd}` with your query.", parse_mode=ParseMode.MARKDOWN)
+    elif data.startswith("page:"):
+        _, result_id, index = data.split(":", 2)
+        entry = result_pager.get(result_id)
+        if entry is None:
+            metrics.CACHE_REQUESTS.inc(cache="pages", result="miss")
+            await query.message.reply_text("❌ **Result expired. Please run the command again.**", parse_mode=ParseMode.MARKDOWN)
+            return
+        metrics.CACHE_REQUESTS.inc(cache="pages", result="hit")
+        index = min(max(int(index), 0), len(entry.pages) - 1)
+        try:
+            await query.edit_message_text(
+                render_page(entry, index, render.RESULT_FOOTER),
+                parse_mode=ParseMode.HTML,
+                reply_markup=get_page_keyboard(result_id, index, len(entry.pages), entry.cmd)
+            )
+        except BadRequest as e:
+            # Double tap: same page dobara -> "message is not modified", ignore
+            if "not modified" not in str(e).lower():
+                raise
+    elif data.startswith("pagefile:"):
+        entry = result_pager.get(data.split(":", 1)[1])
+        if entry is None:
+            metrics.CACHE_REQUESTS.inc(cache="pages", result="miss")
+            await query.message.reply_text("❌ **Result expired. Please run the command again.**", parse_mode=ParseMode.MARKDOWN)
+            return
+        metrics.CACHE_REQUESTS.inc(cache="pages", result="hit")
+        await query.message.reply_document(
+            document=entry.text.encode('utf-8'),
+            filename=entry.filename,
+            caption="📎 Full output\n\nDeveloper: @Nullprotocol_X\nPowered by: NULL PROTOCOL"
+        )
 
 # ==================== CONVERSATION HANDLERS FOR BROADCAST/DM/BULKDM ====================
 async def broadcast_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -495,6 +828,15 @@ async def bulkdm_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
     return WAITING_MESSAGE
 
+async def copy_to(context, message, chat_id, priority):
+    """message.copy() through the send scheduler with the given priority."""
+    return await context.bot.copy_message(
+        chat_id=chat_id,
+        from_chat_id=message.chat_id,
+        message_id=message.message_id,
+        rate_limit_args=priority
+    )
+
 async def receive_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     message = update.message
 
@@ -505,7 +847,7 @@ async def receive_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
         success, fail = 0, 0
         for (uid,) in users:
             try:
-                await message.copy(chat_id=uid)
+                await copy_to(context, message, uid, PRIORITY_BROADCAST)
                 success += 1
             except Exception as e:
                 logger.error(f"Broadcast to {uid} failed: {e}")
@@ -516,7 +858,7 @@ async def receive_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
         targets = context.user_data['dm_targets']
         for uid in targets:
             try:
-                await message.copy(chat_id=uid)
+                await copy_to(context, message, uid, PRIORITY_ADMIN)
                 await message.reply_text(f"✅ Message sent to {uid}")
             except Exception as e:
                 await message.reply_text(f"❌ Failed to send to {uid}: {e}")
@@ -526,7 +868,7 @@ async def receive_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
         success, fail = 0, 0
         for uid in targets:
             try:
-                await message.copy(chat_id=uid)
+                await copy_to(context, message, uid, PRIORITY_ADMIN)
                 success += 1
             except Exception as e:
                 logger.error(f"BulkDM to {uid} failed: {e}")
@@ -680,9 +1022,86 @@ async def stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
     stats_data = await get_stats()
     text = f"📈 Bot Statistics:\n"
     text += f"Total Users: {stats_data['total_users']}\n"
-    text += f"Total Lookups: {stats_data['total_lookups']}\n"
+    text += f"Total Lookups: {stats_data['total_lookups']} ({stats_data['archived_lookups']} in archived months)\n"
     text += f"Total Admins: {stats_data['total_admins']}\n"
     text += f"Total Banned: {stats_data['total_banned']}\n"
+    text += f"Upstream calls avoided (invalid queries, since start): {metrics.INVALID_QUERIES.total()}\n"
+    text += f"Lookups shed under load (since start): {metrics.SHED.total()}\n"
+    text += f"Duplicate lookups suppressed (since start): {metrics.DEDUPED.total()}\n"
+    await update.message.reply_text(text)
+
+@admin_only
+async def api_status(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if not PROBE_ENABLED:
+        await update.message.reply_text("API probing is disabled (PROBE_ENABLED=0).")
+        return
+    text = "🩺 API Status (background probes):\n"
+    for cmd in COMMANDS:
+        summary = probe_history.summary(cmd)
+        if summary is None:
+            text += f"\n/{cmd}: no probes yet\n"
+            continue
+        icon = "✅" if summary["success_rate"] >= 0.9 else "⚠️" if summary["success_rate"] > 0 else "❌"
+        text += (
+            f"\n{icon} /{cmd}: {summary['success_rate']:.0%} ok ({summary['samples']} probes), "
+            f"p50 {summary['p50']:.2f}s, p95 {summary['p95']:.2f}s\n"
+        )
+        if summary["last_error"]:
+            ts, error = summary["last_error"]
+            text += f"   last error {datetime.fromtimestamp(ts):%d %b %H:%M}: {error}\n"
+    await update.message.reply_text(text)
+
+@admin_only
+async def db_status(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    info = await get_db_info()
+    size_mb = info['pages'] * info['page_size'] / 1024 / 1024
+    free_mb = info['free_pages'] * info['page_size'] / 1024 / 1024
+    text = (
+        f"🗄 Database: {size_mb:.1f} MB ({free_mb:.1f} MB free pages), "
+        f"WAL {info['wal_bytes'] / 1024 / 1024:.1f} MB\n"
+        f"journal={info['journal_mode']}, auto_vacuum={info['auto_vacuum']}\n"
+    )
+    if db_maintenance is None:
+        text += "\nMaintenance is not running in this worker."
+        await update.message.reply_text(text)
+        return
+    text += "\nMaintenance (every / last run / took / result):\n"
+    for name, interval, last_run, duration, result, error in db_maintenance.status():
+        if last_run is None:
+            text += f"{name}: every {interval // 60}m, not run yet\n"
+            continue
+        outcome = f"❌ {error}" if error else (result if result is not None else "ok")
+        text += (
+            f"{name}: every {interval // 60}m, {datetime.fromtimestamp(last_run):%d %b %H:%M}, "
+            f"{duration * 1000:.0f} ms, {outcome}\n"
+        )
+    await update.message.reply_text(text)
+
+PARTITION_MONTH_RE = re.compile(r"\d{4}-\d{2}")
+
+@admin_only
+async def partitions(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    args = context.args or []
+    if len(args) == 2 and args[0].lower() == "archive" and PARTITION_MONTH_RE.fullmatch(args[1]):
+        month = args[1].replace("-", "")
+        try:
+            path, rows = await archive_partition(month, LOOKUP_ARCHIVE_DIR)
+        except ValueError as e:
+            await update.message.reply_text(f"❌ {e}")
+            return
+        await update.message.reply_text(f"🧊 {args[1]}: {rows} lookups archived to {path}")
+        return
+    if args:
+        await update.message.reply_text("Usage: /partitions [archive YYYY-MM]")
+        return
+    info = await get_partition_info()
+    text = "🗂 Lookup partitions (month: lookups):\n"
+    for month, rows in info:
+        text += f"{month[:4]}-{month[4:]}: {rows}\n"
+    if not info:
+        text += "none yet\n"
+    auto = f"older than {LOOKUP_HOT_MONTHS} months" if LOOKUP_HOT_MONTHS > 0 else "off"
+    text += f"\nArchive dir: {LOOKUP_ARCHIVE_DIR} (auto-archive: {auto})"
     await update.message.reply_text(text)
 
 @admin_only
@@ -741,10 +1160,169 @@ async def list_admins(update: Update, context: ContextTypes.DEFAULT_TYPE):
     text = "👑 Admins:\n" + "\n".join(str(a) for a in admins)
     await update.message.reply_text(text)
 
+@owner_only
+async def perf(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    stats = tracer.stats
+    if not tracer.sample_rate:
+        await update.message.reply_text("Tracing is off (TRACE_SAMPLE_RATE=0).")
+        return
+    if context.args:
+        cmd = context.args[0].lstrip('/').lower()
+        rows = stats.summary(cmd)
+        if not rows:
+            await update.message.reply_text(f"No traced lookups for /{cmd} yet.")
+            return
+        text = f"⏱ /{cmd} stages (p50 / p95 ms, (bg) = after the reply, not in total):\n"
+        for stage, n, p50, p95 in rows:
+            text += f"{stage}: {p50 * 1000:.1f} / {p95 * 1000:.1f} ({n})\n"
+        await update.message.reply_text(text)
+        return
+    commands = stats.commands()
+    if not commands:
+        await update.message.reply_text(f"No traced lookups yet (sampling {tracer.sample_rate:.0%}).")
+        return
+    text = f"⏱ Lookup latency (sampling {tracer.sample_rate:.0%}), p50 / p95 ms:\n"
+    for cmd in commands:
+        rows = dict((stage, (n, p50, p95)) for stage, n, p50, p95 in stats.summary(cmd))
+        n, p50, p95 = rows.pop("total")
+        rows = {stage: row for stage, row in rows.items() if not tracing.is_background(stage)}
+        slowest = max(rows.items(), key=lambda kv: kv[1][1])[0] if rows else "-"
+        text += f"/{cmd}: {p50 * 1000:.0f} / {p95 * 1000:.0f} ({n}), slowest stage: {slowest}\n"
+    text += "\nDetails: /perf <command>"
+    await update.message.reply_text(text)
+
+def cache_sizes():
+    """Entry counts of every in-process cache/state the bot keeps."""
+    sizes = {
+        "lookup_rate_buckets": len(lookup_limiter),
+        "send_queue_pending": send_scheduler.pending(),
+        "lookups_in_flight": admission.in_flight,
+        "probe_results": len(probe_history),
+        "perf_commands": len(tracer.stats.commands()),
+        "result_pages": len(result_pager),
+        "log_posts_pending": len(log_posts),
+        "dedupe_keys": len(deduper),
+    }
+    if isinstance(state_store, MemoryStore):
+        sizes["state_store"] = len(state_store)
+    if bot_application is not None:
+        sizes["user_data"] = len(bot_application.user_data)
+        sizes["chat_data"] = len(bot_application.chat_data)
+    return sizes
+
+memory_inspector = None
+if MEMDEBUG_ENABLED:
+    from memdebug import MemoryInspector  # diagnostics only, default off
+    memory_inspector = MemoryInspector(cache_sizes)
+
+def format_memory_report(report):
+    lines = ["🧠 Memory", "", "Caches (entries):"]
+    lines += [f"  {name}: {n}" for name, n in report["caches"].items()]
+    tasks = report["tasks"]
+    lines += ["", f"Asyncio tasks: {sum(n for _, n in tasks)}"]
+    lines += [f"  {name}: {n}" for name, n in tasks[:10]]
+    gc_info = report["gc"]
+    lines += ["", f"GC counts {gc_info['counts']}, thresholds {gc_info['thresholds']}, frozen {gc_info['frozen']}"]
+    for gen, st in enumerate(gc_info["generations"]):
+        lines.append(f"  gen{gen}: {st['collections']} runs, {st['collected']} collected")
+    alloc = report["tracemalloc"]
+    if alloc is None:
+        lines += ["", "tracemalloc off (/mem trace start)"]
+    else:
+        lines += ["", f"tracemalloc: {alloc['traced_bytes'] / 1024:.0f} KiB traced, peak {alloc['peak_bytes'] / 1024:.0f} KiB"]
+        for where, size, diff, count in alloc["top"]:
+            delta = "" if diff is None else f" ({diff / 1024:+.0f})"
+            lines.append(f"  {size / 1024:.0f} KiB{delta} x{count} {where}")
+    return "\n".join(lines)
+
+@owner_only
+async def mem(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if memory_inspector is None:
+        await update.message.reply_text("Memory diagnostics are off (MEMDEBUG=0).")
+        return
+    if context.args[:1] == ["trace"]:
+        action = context.args[1].lower() if len(context.args) > 1 else ""
+        if action == "start":
+            memory_inspector.start_tracing()
+            await update.message.reply_text("tracemalloc started. /mem again later to see top allocators and diffs.")
+            return
+        if action == "stop":
+            memory_inspector.stop_tracing()
+            await update.message.reply_text("tracemalloc stopped.")
+            return
+        await update.message.reply_text("Usage: /mem trace start|stop")
+        return
+    report = memory_inspector.report(allocations=memory_inspector.tracing)
+    text = format_memory_report(report)
+    await update.message.reply_text(text[:4000])
+
 @owner_only
 async def settings(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text("Settings command - under development.")
 
+EXPORT_USAGE = (
+    "Usage: /export lookups [days|YYYY-MM-DD|YYYY-MM-DD..YYYY-MM-DD] [command] [jsonl|csv]\n"
+    "       /export users [jsonl|csv]"
+)
+DATE_RANGE_RE = re.compile(r"(\d{4}-\d{2}-\d{2})(?:\.\.(\d{4}-\d{2}-\d{2}))?")
+
+@admin_only
+async def export_data(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    args = [a.lower() for a in context.args]
+    if not args or args[0] not in ("lookups", "users"):
+        await update.message.reply_text(EXPORT_USAGE)
+        return
+    table, fmt = args[0], "jsonl"
+    since = until = command = None
+    for arg in args[1:]:
+        date_range = DATE_RANGE_RE.fullmatch(arg)
+        if arg in EXPORT_FORMATS:
+            fmt = arg
+        elif arg.isdigit():
+            since = (datetime.now() - timedelta(days=int(arg))).date().isoformat()
+        elif date_range:
+            # Akeli date = sirf woh din (range ka dono end same)
+            since, until = date_range.group(1), date_range.group(2) or date_range.group(1)
+        elif table == "lookups" and arg.lstrip('/') in COMMANDS:
+            command = arg.lstrip('/')
+        else:
+            await update.message.reply_text(f"❌ Unknown option: {arg}\n\n{EXPORT_USAGE}")
+            return
+    if export_lock.locked():
+        await update.message.reply_text("⏳ Another export is already running. Try again later.")
+        return
+
+    if table == "lookups":
+        chunks = iter_lookups(since, until, command, chunk=EXPORT_CHUNK_ROWS)
+        columns = LOOKUP_EXPORT_COLUMNS
+    else:
+        chunks = iter_users(chunk=EXPORT_CHUNK_ROWS)
+        columns = USER_EXPORT_COLUMNS
+    basename = f"{table}_{command + '_' if command else ''}{datetime.now():%Y%m%d_%H%M}"
+
+    async def send_part(fileobj, part_no, rows):
+        # reply_document rate_limit_args forward nahi karta, isliye bot.send_document.
+        # Bytes: PTB upload poora memory me padhta hi hai, aur in-memory SpooledTemporaryFile
+        # ka name None hota hai jis pe PTB ka filename guess crash karta hai.
+        await context.bot.send_document(
+            chat_id=update.effective_chat.id,
+            document=fileobj.read(),
+            filename=f"{basename}_part{part_no}.{fmt}.gz",
+            caption=f"📦 {table} part {part_no} ({rows} rows)",
+            rate_limit_args=PRIORITY_ADMIN
+        )
+
+    async with export_lock:
+        await update.message.reply_text(f"📦 Exporting {table} as gzipped {fmt}...")
+        try:
+            total, parts = await export_rows(chunks, fmt, columns, send_part,
+                                             part_bytes=EXPORT_PART_BYTES, spool_bytes=EXPORT_SPOOL_BYTES)
+        except Exception as e:
+            logger.error(f"❌ Export failed: {e}", exc_info=True)
+            await update.message.reply_text(f"❌ Export failed: {e}")
+            return
+    await update.message.reply_text(f"✅ Export done: {total} rows in {parts} file(s).")
+
 @owner_only
 async def full_db_backup(update: Update, context: ContextTypes.DEFAULT_TYPE):
     try:
@@ -772,89 +1350,385 @@ async def track_groups(update: Update, context: ContextTypes.DEFAULT_TYPE):
     elif status == 'left':
         await remove_bot_group(chat.id)
 
+# ==================== TRAFFIC CAPTURE ====================
+async def capture_update(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    try:
+        recorder.update(update)
+    except Exception as e:
+        logger.warning(f"Traffic capture failed: {e}")
+
 # ==================== BOT INITIALIZATION ====================
 async def post_init(app: Application):
     await init_db()
-    for aid in INITIAL_ADMINS:
-        await add_admin(aid, OWNER_ID)
+    await add_admins(INITIAL_ADMINS, OWNER_ID)
     logger.info("✅ Bot initialized, database ready.")
 
-def run_bot():
+def build_application():
+    """Create the Application and register every handler."""
+    builder = (
+        Application.builder()
+        .token(BOT_TOKEN)
+        .base_url(BOT_API_BASE_URL)
+        .request(InstrumentedRequest(connection_pool_size=256))
+        .get_updates_request(InstrumentedRequest())
+        .concurrent_updates(PerUserUpdateProcessor(CONCURRENT_UPDATES))
+    )
+    builder = builder.rate_limiter(ScheduledRateLimiter(enabled=SEND_LIMITS_ENABLED))
+    bot_app = builder.build()
+
+    global recorder
+    if CAPTURE_PATH:
+        from capture import TrafficRecorder  # load-test tooling, default off
+        recorder = TrafficRecorder(CAPTURE_PATH, CAPTURE_SALT or None)
+        # Group -1: baaki sab handlers se pehle, kisi ko block nahi karta
+        bot_app.add_handler(TypeHandler(Update, capture_update), group=-1)
+        logger.info(f"🎙 Capturing anonymized traffic to {CAPTURE_PATH}")
+
+    bot_app.add_handler(CommandHandler("start", start))
+    bot_app.add_handler(CommandHandler("help", help_command))
+    bot_app.add_handler(CommandHandler("admin", admin_help))
+
+    broadcast_conv = ConversationHandler(
+        entry_points=[CommandHandler('broadcast', broadcast_start)],
+        states={
+            WAITING_MESSAGE: [MessageHandler(filters.ALL & ~filters.COMMAND, receive_message)]
+        },
+        fallbacks=[CommandHandler('cancel', cancel)]
+    )
+    dm_conv = ConversationHandler(
+        entry_points=[CommandHandler('dm', dm_start)],
+        states={
+            WAITING_MESSAGE: [MessageHandler(filters.ALL & ~filters.COMMAND, receive_message)]
+        },
+        fallbacks=[CommandHandler('cancel', cancel)]
+    )
+    bulkdm_conv = ConversationHandler(
+        entry_points=[CommandHandler('bulkdm', bulkdm_start)],
+        states={
+            WAITING_MESSAGE: [MessageHandler(filters.ALL & ~filters.COMMAND, receive_message)]
+        },
+        fallbacks=[CommandHandler('cancel', cancel)]
+    )
+    bot_app.add_handler(broadcast_conv)
+    bot_app.add_handler(dm_conv)
+    bot_app.add_handler(bulkdm_conv)
+
+    bot_app.add_handler(CommandHandler("group", list_groups))
+    bot_app.add_handler(CommandHandler("ban", ban))
+    bot_app.add_handler(CommandHandler("unban", unban))
+    bot_app.add_handler(CommandHandler("deleteuser", delete_user))
+    bot_app.add_handler(CommandHandler("searchuser", search_user))
+    bot_app.add_handler(CommandHandler("users", users))
+    bot_app.add_handler(CommandHandler("recentusers", recent_users))
+    bot_app.add_handler(CommandHandler("inactiveusers", inactive_users))
+    bot_app.add_handler(CommandHandler("userlookups", user_lookups))
+    bot_app.add_handler(CommandHandler("leaderboard", leaderboard))
+    bot_app.add_handler(CommandHandler("stats", stats))
+    bot_app.add_handler(CommandHandler("apistatus", api_status))
+    bot_app.add_handler(CommandHandler("dbstatus", db_status))
+    bot_app.add_handler(CommandHandler("partitions", partitions))
+    bot_app.add_handler(CommandHandler("dailystats", daily_stats))
+    bot_app.add_handler(CommandHandler("lookupstats", lookup_stats))
+
+    bot_app.add_handler(CommandHandler("addadmin", add_admin_cmd))
+    bot_app.add_handler(CommandHandler("removeadmin", remove_admin_cmd))
+    bot_app.add_handler(CommandHandler("listadmins", list_admins))
+    bot_app.add_handler(CommandHandler("settings", settings))
+    bot_app.add_handler(CommandHandler("perf", perf))
+    bot_app.add_handler(CommandHandler("mem", mem))
+    bot_app.add_handler(CommandHandler("fulldbbackup", full_db_backup))
+    bot_app.add_handler(CommandHandler("export", export_data))
+
+    bot_app.add_handler(MessageHandler(filters.COMMAND, message_handler))
+    bot_app.add_handler(CallbackQueryHandler(callback_handler))
+    bot_app.add_handler(ChatMemberHandler(track_groups, ChatMemberHandler.CHAT_MEMBER))
+    return bot_app
+
+# ==================== WEB SERVER ====================
+bot_application = None
+webhook_secret = None  # set only when webhook mode is active
+started_at = time.time()
+
+async def home(request):
+    return web.json_response({"status": "running", "message": "OSINT Pro Bot is active", "time": datetime.now().isoformat()})
+
+async def health(request):
+    if bot_application is None:
+        # Token missing: sirf web server chal raha hai
+        return web.json_response({"status": "healthy", "bot": "disabled"})
+    if not bot_application.running:
+        return web.json_response({"status": "unhealthy", "reason": "bot is not running"}, status=503)
+    if webhook_secret is not None:
+        # Webhook mode: koi polling loop nahi, updates Telegram push karta hai
+        return web.json_response({"status": "healthy", "mode": "webhook"})
+    if not bot_application.updater.running:
+        return web.json_response({"status": "unhealthy", "reason": "polling is not running"}, status=503)
+    last_poll = metrics.last_poll_time
+    reference = last_poll if last_poll is not None else started_at
+    stalled_for = time.time() - reference
+    if stalled_for > HEALTH_POLL_STALL_SECONDS:
+        return web.json_response({"status": "unhealthy", "reason": "polling stalled", "seconds_since_poll": int(stalled_for)}, status=503)
+    return web.json_response({"status": "healthy", "seconds_since_poll": int(stalled_for)})
+
+async def metrics_endpoint(request):
+    if isinstance(state_store, MemoryStore):
+        metrics.CACHE_SIZE.set(len(state_store), cache="state")
+    return web.Response(text=metrics.render_all(), content_type="text/plain", charset="utf-8")
+
+async def debug_memory(request):
+    if memory_inspector is None or not MEMDEBUG_TOKEN:
+        raise web.HTTPNotFound()
+    token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+    if not hmac.compare_digest(token, MEMDEBUG_TOKEN):
+        raise web.HTTPForbidden()
+    report = memory_inspector.report(allocations=memory_inspector.tracing)
+    return web.Response(text=json_dumps(report), content_type="application/json")
+
+async def telegram_webhook(request):
+    if webhook_secret is None or bot_application is None:
+        raise web.HTTPNotFound()
+    token = request.headers.get("X-Telegram-Bot-Api-Secret-Token", "")
+    if not hmac.compare_digest(token, webhook_secret):
+        raise web.HTTPForbidden()
     try:
-        if not BOT_TOKEN or BOT_TOKEN == "YOUR_BOT_TOKEN_HERE":
-            logger.error("❌ BOT_TOKEN not set!")
-            return
+        data = json_loads(await request.read())
+    except JSONDecodeError:
+        raise web.HTTPBadRequest()
+    # Valid JSON lekin object nahi ([] / 1) ya update_id missing: 500 nahi, 400
+    if not isinstance(data, dict):
+        raise web.HTTPBadRequest()
+    try:
+        update = Update.de_json(data, bot_application.bot)
+    except (KeyError, TypeError, ValueError, AttributeError):
+        raise web.HTTPBadRequest()
+    if update is not None:
+        await bot_application.update_queue.put(update)
+    return web.Response(text="ok")
+
+def build_web_app():
+    web_app = web.Application()
+    web_app.router.add_get('/', home)
+    web_app.router.add_get('/health', health)
+    web_app.router.add_get('/metrics', metrics_endpoint)
+    web_app.router.add_get('/debug/memory', debug_memory)
+    web_app.router.add_post(WEBHOOK_PATH, telegram_webhook)
+    return web_app
+
+def get_webhook_url():
+    """Public webhook URL, or None when updates should come via polling."""
+    if UPDATE_MODE != "webhook":
+        return None
+    if not WEBHOOK_URL:
+        logger.warning("⚠️ UPDATE_MODE=webhook but no WEBHOOK_URL/RENDER_EXTERNAL_URL set, falling back to polling.")
+        return None
+    return WEBHOOK_URL.rstrip("/") + WEBHOOK_PATH
+
+def start_prober():
+    """Start the background upstream prober (only in worker 0 when sharded)."""
+    if not PROBE_ENABLED or (WORKER_INDEX is not None and WORKER_INDEX != 0):
+        return None
+    prober = UpstreamProber(
+        COMMANDS, call_api, probe_history,
+        interval=PROBE_INTERVAL,
+        is_busy=lambda: metrics.LOOKUPS_IN_FLIGHT.total() >= PROBE_MAX_IN_FLIGHT,
+        on_result=lambda endpoint, latency, ok: upstream_selector.record(endpoint["url"], latency, ok),
+    )
+    return asyncio.create_task(prober.run())
+
+def start_db_maintenance():
+    """Start background SQLite maintenance (only in worker 0; workers share the DB file)."""
+    global db_maintenance
+    if not DB_MAINTENANCE_ENABLED or (WORKER_INDEX is not None and WORKER_INDEX != 0):
+        return None
+
+    async def checkpoint():
+        mode, busy, log, done = await wal_checkpoint(DB_WAL_MAX_BYTES)
+        return f"{mode} {done}/{log} pages" + (" (busy)" if busy else "")
+
+    async def vacuum():
+        return f"{await incremental_vacuum(DB_VACUUM_PAGES)} pages freed"
+
+    async def gc_blobs():
+        return f"{await gc_result_blobs()} blobs removed"
+
+    async def archive():
+        archived = await archive_old_partitions(LOOKUP_HOT_MONTHS, LOOKUP_ARCHIVE_DIR)
+        return f"archived {', '.join(archived)}" if archived else "nothing to archive"
+
+    jobs = {
+        "wal_checkpoint": checkpoint,
+        "incremental_vacuum": vacuum,
+        "optimize": optimize_db,
+        "analyze": lambda: analyze_db(DB_ANALYZE_LIMIT),
+        "gc_result_blobs": gc_blobs,
+    }
+    if LOOKUP_HOT_MONTHS > 0:
+        jobs["archive_partitions"] = archive
+    db_maintenance = DatabaseMaintenance(
+        [(name, interval, jobs[name]) for name, interval in DB_MAINTENANCE.items() if name in jobs],
+        is_busy=lambda: metrics.LOOKUPS_IN_FLIGHT.total() >= DB_MAINTENANCE_MAX_IN_FLIGHT,
+    )
+    return asyncio.create_task(db_maintenance.run())
+
+# ==================== MULTI-WORKER ROUTER ====================
+def routing_key(update_data):
+    """Chat ID an update belongs to, so one chat always lands on the same worker."""
+    for field in ("message", "edited_message", "channel_post"):
+        msg = update_data.get(field)
+        if msg:
+            return msg["chat"]["id"]
+    cq = update_data.get("callback_query")
+    if cq:
+        msg = cq.get("message")
+        return msg["chat"]["id"] if msg else cq["from"]["id"]
+    member = update_data.get("chat_member") or update_data.get("my_chat_member")
+    if member:
+        return member["chat"]["id"]
+    return update_data.get("update_id", 0)
+
+async def run_router(webhook_url, stop_event):
+    """Receive the webhook and forward each update to one of WORKERS worker processes.
+
+    Updates are sharded by chat ID, so ConversationHandler state and
+    context.user_data for a chat always live in the same worker.
+    """
+    secret = WEBHOOK_SECRET or secrets.token_urlsafe(32)
+    workers = []
+    for i in range(WORKERS):
+        env = dict(os.environ, PORT=str(WORKER_BASE_PORT + i), WORKER_INDEX=str(i), WEBHOOK_SECRET=secret)
+        workers.append(await asyncio.create_subprocess_exec(sys.executable, os.path.abspath(__file__), env=env))
+    logger.info(f"👷 Started {WORKERS} workers on ports {WORKER_BASE_PORT}-{WORKER_BASE_PORT + WORKERS - 1}")
+    session = aiohttp.ClientSession()
+
+    async def forward(request):
+        if not hmac.compare_digest(request.headers.get("X-Telegram-Bot-Api-Secret-Token", ""), secret):
+            raise web.HTTPForbidden()
+        body = await request.read()
+        try:
+            data = json_loads(body)
+            if not isinstance(data, dict):
+                raise TypeError("update is not a JSON object")
+            idx = routing_key(data) % WORKERS
+        except (JSONDecodeError, KeyError, TypeError):
+            raise web.HTTPBadRequest()
+        worker_url = f"http://127.0.0.1:{WORKER_BASE_PORT + idx}{WEBHOOK_PATH}"
+        headers = {"X-Telegram-Bot-Api-Secret-Token": secret, "Content-Type": "application/json"}
+        try:
+            async with session.post(worker_url, data=body, headers=headers, timeout=10) as resp:
+                return web.Response(status=resp.status)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            # Non-2xx pe Telegram update dobara bhejta hai
+            return web.Response(status=502)
+
+    async def router_health(request):
+        dead = [i for i, proc in enumerate(workers) if proc.returncode is not None]
+        if dead:
+            return web.json_response({"status": "unhealthy", "reason": "worker exited", "workers": dead}, status=503)
+        return web.json_response({"status": "healthy", "mode": "router", "workers": WORKERS})
+
+    web_app = web.Application()
+    web_app.router.add_get('/', home)
+    web_app.router.add_get('/health', router_health)
+    web_app.router.add_post(WEBHOOK_PATH, forward)
+    runner = web.AppRunner(web_app, access_log=None)
+    await runner.setup()
+    port = int(os.environ.get("PORT", 5000))
+    await web.TCPSite(runner, host="0.0.0.0", port=port).start()
+    logger.info(f"🌐 Router listening on port {port}")
 
-        bot_app = Application.builder().token(BOT_TOKEN).post_init(post_init).build()
+    try:
+        async with Bot(BOT_TOKEN, base_url=BOT_API_BASE_URL) as bot:
+            await bot.set_webhook(url=webhook_url, secret_token=secret, allowed_updates=ALLOWED_UPDATES)
+        logger.info(f"🚀 Webhook registered at {webhook_url}")
+        await stop_event.wait()
+    finally:
+        for proc in workers:
+            if proc.returncode is None:
+                proc.terminate()
+        await asyncio.gather(*(proc.wait() for proc in workers))
+        await session.close()
+        await runner.cleanup()
 
-        bot_app.add_handler(CommandHandler("start", start))
-        bot_app.add_handler(CommandHandler("help", help_command))
-        bot_app.add_handler(CommandHandler("admin", admin_help))
+# ==================== MAIN ====================
+def install_stop_event():
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:
+            pass
+    return stop_event
+
+async def run():
+    """Run the web server and the bot on one event loop until SIGINT/SIGTERM."""
+    global bot_application, webhook_secret
+    stop_event = install_stop_event()
+
+    webhook_url = get_webhook_url() if WORKER_INDEX is None else None
+    if webhook_url and WORKERS > 1:
+        await run_router(webhook_url, stop_event)
+        return
 
-        broadcast_conv = ConversationHandler(
-            entry_points=[CommandHandler('broadcast', broadcast_start)],
-            states={
-                WAITING_MESSAGE: [MessageHandler(filters.ALL & ~filters.COMMAND, receive_message)]
-            },
-            fallbacks=[CommandHandler('cancel', cancel)]
-        )
-        dm_conv = ConversationHandler(
-            entry_points=[CommandHandler('dm', dm_start)],
-            states={
-                WAITING_MESSAGE: [MessageHandler(filters.ALL & ~filters.COMMAND, receive_message)]
-            },
-            fallbacks=[CommandHandler('cancel', cancel)]
-        )
-        bulkdm_conv = ConversationHandler(
-            entry_points=[CommandHandler('bulkdm', bulkdm_start)],
-            states={
-                WAITING_MESSAGE: [MessageHandler(filters.ALL & ~filters.COMMAND, receive_message)]
-            },
-            fallbacks=[CommandHandler('cancel', cancel)]
-        )
-        bot_app.add_handler(broadcast_conv)
-        bot_app.add_handler(dm_conv)
-        bot_app.add_handler(bulkdm_conv)
-
-        bot_app.add_handler(CommandHandler("group", list_groups))
-        bot_app.add_handler(CommandHandler("ban", ban))
-        bot_app.add_handler(CommandHandler("unban", unban))
-        bot_app.add_handler(CommandHandler("deleteuser", delete_user))
-        bot_app.add_handler(CommandHandler("searchuser", search_user))
-        bot_app.add_handler(CommandHandler("users", users))
-        bot_app.add_handler(CommandHandler("recentusers", recent_users))
-        bot_app.add_handler(CommandHandler("inactiveusers", inactive_users))
-        bot_app.add_handler(CommandHandler("userlookups", user_lookups))
-        bot_app.add_handler(CommandHandler("leaderboard", leaderboard))
-        bot_app.add_handler(CommandHandler("stats", stats))
-        bot_app.add_handler(CommandHandler("dailystats", daily_stats))
-        bot_app.add_handler(CommandHandler("lookupstats", lookup_stats))
-
-        bot_app.add_handler(CommandHandler("addadmin", add_admin_cmd))
-        bot_app.add_handler(CommandHandler("removeadmin", remove_admin_cmd))
-        bot_app.add_handler(CommandHandler("listadmins", list_admins))
-        bot_app.add_handler(CommandHandler("settings", settings))
-        bot_app.add_handler(CommandHandler("fulldbbackup", full_db_backup))
-
-        bot_app.add_handler(MessageHandler(filters.COMMAND, message_handler))
-        bot_app.add_handler(CallbackQueryHandler(callback_handler))
-        bot_app.add_handler(ChatMemberHandler(track_groups, ChatMemberHandler.CHAT_MEMBER))
-
-        logger.info("🚀 Bot polling started...")
-        bot_app.run_polling(stop_signals=None)
-    except Exception as e:
-        logger.exception(f"Bot thread crashed: {e}")
+    port = int(os.environ.get("PORT", 5000))
+    runner = web.AppRunner(build_web_app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host="0.0.0.0", port=port).start()
+    logger.info(f"🌐 Web server listening on port {port}")
 
-# ==================== FLASK WEB SERVER ====================
-@flask_app.route('/')
-def home():
-    return jsonify({"status": "running", "message": "OSINT Pro Bot is active", "time": datetime.now().isoformat()})
+    if not BOT_TOKEN or BOT_TOKEN == "YOUR_BOT_TOKEN_HERE":
+        logger.warning("⚠️ Bot not started due to missing token. Web server only.")
+        await stop_event.wait()
+        await runner.cleanup()
+        return
 
-@flask_app.route('/health')
-def health():
-    return jsonify({"status": "healthy"}), 200
+    bot_app = build_application()
+    bot_application = bot_app
+    try:
+        async with bot_app:
+            await post_init(bot_app)
+            if RUNTIME_GC_FREEZE:
+                runtime.freeze_startup_objects()
+            await bot_app.start()
+            if WORKER_INDEX is not None:
+                # Router process ne webhook register kiya hai, updates wahi forward karega
+                webhook_secret = WEBHOOK_SECRET
+                logger.info(f"🚀 Worker {WORKER_INDEX} ready for routed updates")
+            elif webhook_url:
+                secret = WEBHOOK_SECRET or secrets.token_urlsafe(32)
+                await bot_app.bot.set_webhook(
+                    url=webhook_url,
+                    secret_token=secret,
+                    allowed_updates=ALLOWED_UPDATES
+                )
+                webhook_secret = secret
+                logger.info(f"🚀 Webhook registered at {webhook_url}")
+            else:
+                await bot_app.updater.start_polling(allowed_updates=ALLOWED_UPDATES)
+                logger.info("🚀 Bot polling started...")
+            background = [t for t in (start_prober(), start_db_maintenance()) if t]
+            await stop_event.wait()
+            for task in background:
+                task.cancel()
+            if log_posts:
+                # Pending log channel posts ko thoda time do
+                await asyncio.wait(list(log_posts), timeout=10)
+            if bot_app.updater.running:
+                await bot_app.updater.stop()
+            await bot_app.stop()
+    except Exception as e:
+        logger.exception(f"Bot crashed: {e}")
+        if WORKER_INDEX is not None:
+            # Worker exit kare: router ka /health dead worker ko 503 report karta hai
+            raise
+        # Web server chalta rahega taaki /health 503 report kare
+        await stop_event.wait()
+    finally:
+        if recorder:
+            recorder.close()
+        await state_store.close()
+        await runner.cleanup()
 
-# ==================== MAIN ====================
 def main():
     logger.info("🔧 Starting OSINT Pro Bot on Render Web Service...")
     if not BOT_TOKEN or BOT_TOKEN == "YOUR_BOT_TOKEN_HERE":
@@ -863,16 +1737,8 @@ def main():
     logger.warning("⚠️ SQLite database is being used. Data will be lost on every restart!")
     logger.warning("⚠️ For production, use PostgreSQL or attach a persistent disk.")
 
-    if BOT_TOKEN and BOT_TOKEN != "YOUR_BOT_TOKEN_HERE":
-        bot_thread = threading.Thread(target=run_bot, daemon=True)
-        bot_thread.start()
-        logger.info("✅ Bot thread started")
-    else:
-        logger.warning("⚠️ Bot not started due to missing token. Flask server only.")
-
-    port = int(os.environ.get("PORT", 5000))
-    logger.info(f"🌐 Flask server starting on port {port}")
-    flask_app.run(host="0.0.0.0", port=port)
+    runtime.tune_gc(GC_THRESHOLDS)
+    runtime.run(run, use_uvloop=RUNTIME_UVLOOP)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,68 @@
+# maintenance.py - Background SQLite maintenance (vacuum, optimize, ANALYZE, WAL checkpoint)
+# Har job ka apna interval hai. Ek tick me sirf ek due job chalta hai, aur sirf jab
+# traffic kam ho, taaki lookups ke saath DB lock ke liye race na ho.
+
+import time
+import random
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MaintenanceJob:
+    __slots__ = ("name", "interval", "func", "next_due", "last_run", "duration", "result", "error")
+
+    def __init__(self, name, interval, func):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        # Pehla run spread out, sab jobs ek saath startup pe na chalein
+        self.next_due = time.monotonic() + random.uniform(0.1, 0.5) * interval
+        self.last_run = None   # wall clock
+        self.duration = None
+        self.result = None
+        self.error = None
+
+
+class DatabaseMaintenance:
+    """Runs due jobs one at a time while is_busy() is false.
+
+    jobs: iterable of (name, interval_seconds, async func). Whatever func
+    returns is kept as the job's last result for /dbstatus.
+    """
+
+    def __init__(self, jobs, is_busy=lambda: False, tick=30):
+        self.jobs = [MaintenanceJob(name, interval, func) for name, interval, func in jobs]
+        self.is_busy = is_busy
+        self.tick = tick
+
+    def due(self, now=None):
+        now = time.monotonic() if now is None else now
+        ready = [job for job in self.jobs if job.next_due <= now]
+        return min(ready, key=lambda job: job.next_due) if ready else None
+
+    async def run_job(self, job):
+        start = time.perf_counter()
+        try:
+            job.result = await job.func()
+            job.error = None
+        except Exception as e:
+            job.error = str(e)
+            logger.warning(f"DB maintenance job {job.name} failed: {e}")
+        job.duration = time.perf_counter() - start
+        job.last_run = time.time()
+        job.next_due = time.monotonic() + job.interval
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.tick)
+            if self.is_busy():
+                continue
+            job = self.due()
+            if job is not None:
+                await self.run_job(job)
+
+    def status(self):
+        """[(name, interval, last_run, duration, result, error)] in schedule order."""
+        return [(j.name, j.interval, j.last_run, j.duration, j.result, j.error) for j in self.jobs]
@@ -0,0 +1,80 @@
+# memdebug.py - Runtime memory introspection (owner /mem and GET /debug/memory)
+# MEMDEBUG=1 pe hi enable hota hai. Normal handlers me kuch nahi badalta: sab kaam
+# sirf report maangne pe hota hai. tracemalloc alag se start karna padta hai
+# (/mem trace start) kyunki woh har allocation pe overhead daalta hai.
+
+import gc
+import asyncio
+import tracemalloc
+from collections import Counter
+
+
+def task_counts():
+    """Running asyncio tasks grouped by coroutine name, most common first."""
+    counts = Counter()
+    for task in asyncio.all_tasks():
+        coro = task.get_coro()
+        counts[getattr(coro, "__qualname__", type(coro).__name__)] += 1
+    return counts.most_common()
+
+
+def gc_stats():
+    return {
+        "counts": gc.get_count(),
+        "thresholds": gc.get_threshold(),
+        "generations": gc.get_stats(),
+        "frozen": gc.get_freeze_count(),
+        "garbage": len(gc.garbage),
+    }
+
+
+class MemoryInspector:
+    """Builds memory reports; keeps the previous tracemalloc snapshot for diffs.
+
+    sizes is a callable returning {name: entries} for the bot's own caches.
+    """
+
+    def __init__(self, sizes, top=15, frames=1):
+        self.sizes = sizes
+        self.top = top
+        self.frames = frames
+        self._last = None
+
+    @property
+    def tracing(self):
+        return tracemalloc.is_tracing()
+
+    def start_tracing(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        self._last = None
+
+    def stop_tracing(self):
+        tracemalloc.stop()
+        self._last = None
+
+    def allocations(self):
+        """Top allocators by line and their change since the previous call, or None if not tracing."""
+        if not tracemalloc.is_tracing():
+            return None
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+        if self._last is None:
+            stats = snapshot.statistics("lineno")
+            rows = [(str(s.traceback[0]), s.size, None, s.count) for s in stats[:self.top]]
+        else:
+            stats = snapshot.compare_to(self._last, "lineno")
+            rows = [(str(s.traceback[0]), s.size, s.size_diff, s.count) for s in stats[:self.top]]
+        self._last = snapshot
+        return {"traced_bytes": current, "peak_bytes": peak, "top": rows}
+
+    def report(self, allocations=False):
+        return {
+            "caches": self.sizes(),
+            "tasks": task_counts(),
+            "gc": gc_stats(),
+            "tracemalloc": self.allocations() if allocations else None,
+        }
@@ -0,0 +1,204 @@
+# metrics.py - Thread-safe Prometheus-style metrics for OSINT Bot
+# Handlers metrics update karte hain, web server /metrics pe render karta hai.
+
+import time
+import threading
+import functools
+from bisect import bisect_left
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0)
+
+REGISTRY = []
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    idx = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[idx]
+
+
+def _label_str(labelnames, key, extra=None):
+    pairs = list(zip(labelnames, key))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    inner = ",".join(
+        '{}="{}"'.format(n, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for n, v in pairs
+    )
+    return "{" + inner + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+        REGISTRY.append(self)
+
+    def _key(self, labels):
+        return tuple(labels.get(n, "") for n in self.labelnames)
+
+    def total(self):
+        """Sum over all label sets (counters and gauges)."""
+        with self._lock:
+            return sum(self._values.values())
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_label_str(self.labelnames, key)} {value}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def get(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][idx] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def total(self):
+        """Number of observations over all label sets."""
+        with self._lock:
+            return sum(e[2] for e in self._values.values())
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = [(key, (list(e[0]), e[1], e[2])) for key, e in self._values.items()]
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, c in zip(self.buckets + ("+Inf",), counts):
+                cumulative += c
+                lines.append(f"{self.name}_bucket{_label_str(self.labelnames, key, ('le', bound))} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_str(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_label_str(self.labelnames, key)} {count}")
+        return lines
+
+
+def render_all():
+    """Render every registered metric in Prometheus text format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ==================== BOT METRICS ====================
+LOOKUPS = Counter("osint_lookups_total", "Lookups handled", ("command",))
+LOOKUP_LATENCY = Histogram("osint_lookup_duration_seconds", "End-to-end lookup latency", ("command",))
+LOOKUPS_IN_FLIGHT = Gauge("osint_lookups_in_flight", "Lookups currently being handled", ("command",))
+
+UPSTREAM_REQUESTS = Counter("osint_upstream_requests_total", "Upstream API requests", ("host", "status"))
+UPSTREAM_LATENCY = Histogram("osint_upstream_duration_seconds", "Upstream API latency", ("host",))
+
+TELEGRAM_REQUESTS = Counter("osint_telegram_requests_total", "Bot API requests", ("method", "status"))
+TELEGRAM_LATENCY = Histogram("osint_telegram_duration_seconds", "Bot API request latency", ("method",))
+
+DB_LATENCY = Histogram("osint_db_duration_seconds", "Database operation latency", ("op",))
+DB_ERRORS = Counter("osint_db_errors_total", "Database operation failures", ("op",))
+
+CACHE_REQUESTS = Counter("osint_cache_requests_total", "Cache lookups", ("cache", "result"))
+CACHE_SIZE = Gauge("osint_cache_entries", "Entries currently held in a cache", ("cache",))
+
+LOG_POSTS_DROPPED = Counter("osint_log_posts_dropped_total", "Log channel posts dropped because too many were pending")
+RATE_LIMITED = Counter("osint_rate_limited_total", "Lookups rejected by the rate limiter", ("command",))
+SHED = Counter("osint_lookups_shed_total", "Lookups rejected by admission control", ("command", "reason"))
+DEDUPED = Counter("osint_lookups_deduped_total", "Duplicate lookups suppressed (original in flight or recent)", ("command", "state"))
+INVALID_QUERIES = Counter("osint_invalid_queries_total", "Lookups rejected by validation (upstream calls avoided)", ("command",))
+
+# Bot thread ka heartbeat: har getUpdates response pe update hota hai
+last_poll_time = None
+
+
+def mark_poll():
+    global last_poll_time
+    last_poll_time = time.time()
+
+
+def timed_db(func):
+    """Record latency and failures of an async database function."""
+    op = func.__name__
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        except Exception:
+            DB_ERRORS.inc(op=op)
+            raise
+        finally:
+            DB_LATENCY.observe(time.perf_counter() - start, op=op)
+    return wrapper
+
+
+def track_lookup(func):
+    """Count, time and track in-flight calls of handle_command(update, context, cmd, query).
+
+    cmd becomes a label value, so callers must only pass COMMANDS keys.
+    """
+    @functools.wraps(func)
+    async def wrapper(update, context, cmd, query):
+        LOOKUPS.inc(command=cmd)
+        LOOKUPS_IN_FLIGHT.inc(command=cmd)
+        start = time.perf_counter()
+        try:
+            return await func(update, context, cmd, query)
+        finally:
+            LOOKUPS_IN_FLIGHT.dec(command=cmd)
+            LOOKUP_LATENCY.observe(time.perf_counter() - start, command=cmd)
+    return wrapper
@@ -0,0 +1,106 @@
+# pager.py - Long lookup results as pages in chat instead of a file upload
+# Result text ek baar line boundaries pe pages me split hota hai (sirf offsets),
+# aur har page tabhi render (HTML escape) hota hai jab user ◀ ▶ dabata hai.
+
+import time
+import uuid
+from collections import OrderedDict
+
+from render import escape_html
+
+
+def escaped_len(line):
+    """Length of render.escape_html(line) without building it."""
+    return len(line) + 4 * line.count("&") + 3 * (line.count("<") + line.count(">"))
+
+
+def split_pages(text, budget):
+    """[(start, end)] offsets into text; each slice escapes to at most budget chars.
+
+    Splits on newlines; a single line longer than budget is cut into pieces.
+    """
+    pages = []
+    start = pos = size = 0
+    for line in text.splitlines(keepends=True):
+        n = escaped_len(line)
+        if size and size + n > budget:
+            pages.append((start, pos))
+            start, size = pos, 0
+        while n > budget:
+            # Bahut lambi line: budget ke hisaab se tod do (worst case har char escape ho)
+            cut = max(1, budget // 5) if n > len(line) else budget
+            pages.append((pos, pos + cut))
+            pos += cut
+            line = line[cut:]
+            n = escaped_len(line)
+            start = pos
+        pos += len(line)
+        size += n
+    if pos > start or not pages:
+        pages.append((start, pos))
+    return pages
+
+
+class PagedResult:
+    __slots__ = ("text", "pages", "filename", "cmd", "expires_at")
+
+    def __init__(self, text, pages, filename, cmd, expires_at):
+        self.text = text
+        self.pages = pages
+        self.filename = filename
+        self.cmd = cmd
+        self.expires_at = expires_at
+
+    def page(self, index):
+        start, end = self.pages[index]
+        return self.text[start:end]
+
+
+class ResultPager:
+    """Bounded TTL cache of paged results, oldest evicted first.
+
+    Lives in process memory: callbacks for a chat reach the same worker
+    that produced the result (the router shards by chat).
+    """
+
+    def __init__(self, page_chars=3500, ttl=1800, max_entries=200, clock=time.monotonic):
+        self.page_chars = page_chars
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries = OrderedDict()  # id -> PagedResult
+
+    def __len__(self):
+        return len(self._entries)
+
+    def put(self, text, filename, cmd):
+        now = self.clock()
+        self._expire(now)
+        while len(self._entries) >= self.max_entries:
+            self._entries.popitem(last=False)
+        result_id = uuid.uuid4().hex[:16]
+        self._entries[result_id] = PagedResult(text, split_pages(text, self.page_chars), filename, cmd, now + self.ttl)
+        return result_id
+
+    def get(self, result_id):
+        entry = self._entries.get(result_id)
+        if entry is None:
+            return None
+        if entry.expires_at <= self.clock():
+            del self._entries[result_id]
+            return None
+        return entry
+
+    def _expire(self, now):
+        # Entries insertion order me hain aur sabka TTL same hai, isliye aage se hatao
+        while self._entries:
+            result_id, entry = next(iter(self._entries.items()))
+            if entry.expires_at > now:
+                break
+            del self._entries[result_id]
+
+
+def render_page(entry, index, footer=""):
+    """HTML message for one page: header, escaped page body in <pre>, footer."""
+    header = f"📄 <b>/{entry.cmd}</b> - page {index + 1}/{len(entry.pages)}\n"
+    return f"{header}<pre>{escape_html(entry.page(index))}</pre>{footer}"
@@ -0,0 +1,100 @@
+# prober.py - Background upstream health prober
+# Har command ke endpoints ko periodically ek canary query se check karta hai,
+# taaki API down hone ka pata users se pehle chale (/apistatus).
+
+import time
+import random
+import asyncio
+import logging
+from collections import deque
+
+from metrics import percentile
+from upstream import get_endpoints
+
+logger = logging.getLogger(__name__)
+
+
+class ProbeHistory:
+    """Fixed-size ring buffer of probe results per command."""
+
+    def __init__(self, size=50):
+        self.size = size
+        self._buffers = {}  # cmd -> deque of (timestamp, latency, ok, error)
+
+    def __len__(self):
+        return sum(len(buf) for buf in self._buffers.values())
+
+    def record(self, cmd, latency, ok, error=None):
+        buf = self._buffers.get(cmd)
+        if buf is None:
+            buf = self._buffers[cmd] = deque(maxlen=self.size)
+        buf.append((time.time(), latency, ok, error))
+
+    def summary(self, cmd):
+        buf = self._buffers.get(cmd)
+        if not buf:
+            return None
+        latencies = sorted(r[1] for r in buf)
+        last_error = next(((ts, err) for ts, _, ok, err in reversed(buf) if not ok), None)
+        return {
+            "samples": len(buf),
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "success_rate": sum(1 for r in buf if r[2]) / len(buf),
+            "last_probe": buf[-1][0],
+            "last_error": last_error,
+        }
+
+
+class UpstreamProber:
+    """Probes every endpoint of every command, one at a time, forever.
+
+    fetch(url) must return (ok, data) like main.call_api. A cycle starts
+    every `interval` seconds (± `jitter` fraction) and probes are spread
+    across the cycle, so at most one probe is in flight. While is_busy()
+    is true (user traffic), probes are skipped.
+    """
+
+    def __init__(self, commands, fetch, history, interval=300, jitter=0.2,
+                 is_busy=lambda: False, on_result=None):
+        self.commands = commands
+        self.fetch = fetch
+        self.history = history
+        self.interval = interval
+        self.jitter = jitter
+        self.is_busy = is_busy
+        self.on_result = on_result
+
+    def _targets(self):
+        targets = []
+        for cmd, info in self.commands.items():
+            canary = info.get("canary")
+            if not canary:
+                continue
+            for endpoint in get_endpoints(info):
+                targets.append((cmd, endpoint, canary))
+        return targets
+
+    async def probe(self, cmd, endpoint, canary):
+        url = endpoint["url"].format(canary)
+        start = time.perf_counter()
+        ok, data = await self.fetch(url)
+        latency = time.perf_counter() - start
+        self.history.record(cmd, latency, ok, None if ok else data.get("error"))
+        if self.on_result:
+            self.on_result(endpoint, latency, ok)
+
+    async def run(self):
+        # Startup ke turant baad probe nahi, pehle thoda traffic settle hone do
+        await asyncio.sleep(random.uniform(0, self.interval))
+        while True:
+            cycle = self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+            targets = self._targets()
+            gap = cycle / max(len(targets), 1)
+            for cmd, endpoint, canary in targets:
+                if not self.is_busy():
+                    try:
+                        await self.probe(cmd, endpoint, canary)
+                    except Exception as e:
+                        logger.warning(f"Probe for /{cmd} failed unexpectedly: {e}")
+                await asyncio.sleep(gap * random.uniform(0.5, 1.5))
@@ -0,0 +1,69 @@
+# ratelimit.py - In-memory token bucket rate limiting for lookups
+# Har user, har chat aur har command ka apna bucket hota hai.
+
+import time
+from collections import OrderedDict
+
+
+class TokenBucketLimiter:
+    """Token buckets keyed by arbitrary hashable keys.
+
+    Buckets are kept in an OrderedDict ordered by last use, so every check is
+    O(1) and idle buckets are evicted from the front without a full scan.
+    """
+
+    def __init__(self, idle_ttl=600, clock=time.monotonic):
+        self.idle_ttl = idle_ttl
+        self.clock = clock
+        self._buckets = OrderedDict()  # key -> [tokens, last_refill]
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def _refill(self, key, rate, burst, now):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [float(burst), now]
+            self._buckets[key] = bucket
+        else:
+            bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def try_acquire(self, limits):
+        """Take one token from every bucket in limits, or from none.
+
+        limits is an iterable of (key, rate_per_sec, burst).
+        Returns (allowed, retry_after_seconds).
+        """
+        now = self.clock()
+        self._evict(now)
+        buckets = []
+        retry_after = 0.0
+        for key, rate, burst in limits:
+            bucket = self._refill(key, rate, burst, now)
+            if bucket[0] < 1:
+                retry_after = max(retry_after, (1 - bucket[0]) / rate)
+            buckets.append(bucket)
+        if retry_after:
+            return False, retry_after
+        for bucket in buckets:
+            bucket[0] -= 1
+        return True, 0.0
+
+    def wait_time(self, key, rate, burst):
+        """Seconds until key's bucket holds a token (0.0 = now), without taking it."""
+        now = self.clock()
+        self._evict(now)
+        bucket = self._refill(key, rate, burst, now)
+        return 0.0 if bucket[0] >= 1 else (1 - bucket[0]) / rate
+
+    def _evict(self, now):
+        cutoff = now - self.idle_ttl
+        buckets = self._buckets
+        while buckets:
+            key, bucket = next(iter(buckets.items()))
+            if bucket[1] >= cutoff:
+                break
+            del buckets[key]
@@ -0,0 +1,79 @@
+# render.py - Response rendering: static texts, escaping, result/log messages
+# Command lists startup pe ek baar bante hain. Bade JSON bodies pe sirf zaroori
+# chars ka str.replace chain chalta hai (char present na ho toh pass skip);
+# chhote MarkdownV2 fields (username, query) ek str.translate table se escape hote hain.
+#
+# Note: bade strings pe str.translate in replacements ke liye replace chain se
+# 10-30x slow hai (CPython ka translate str->str mapping pe slow path leta hai),
+# isliye bodies ke liye table nahi. Numbers: benchmarks/bench_rendering.py
+
+# HTML inside <pre>: quotes escape karne ki zaroorat nahi
+HTML_ESCAPES = (("&", "&amp;"), ("<", "&lt;"), (">", "&gt;"))
+# MarkdownV2 ``` block ke andar sirf backslash aur backtick special hain
+MD_CODE_ESCAPES = (("\\", "\\\\"), ("`", "\\`"))
+# MarkdownV2 normal text: yeh sab chars escape hone chahiye
+MD_TABLE = str.maketrans({ch: "\\" + ch for ch in "\\_*[]()~`>#+-=|{}.!"})
+
+RESULT_FOOTER = "\n\n━━━━━━━━━━━━━━━━━━━━\n👨‍💻 <b>Developer:</b> @Nullprotocol_X\n⚡ <b>Powered by:</b> NULL PROTOCOL"
+
+
+def _replace_all(text, pairs):
+    for old, new in pairs:
+        if old in text:
+            text = text.replace(old, new)
+    return text
+
+
+def escape_html(text):
+    return _replace_all(text, HTML_ESCAPES)
+
+
+def escape_md_code(text):
+    return _replace_all(text, MD_CODE_ESCAPES)
+
+
+def escape_md(text):
+    return str(text).translate(MD_TABLE)
+
+
+# ==================== STATIC TEXTS ====================
+def commands_text(commands, footer):
+    lines = ["📋 **AVAILABLE COMMANDS**", "────────────────────────────"]
+    for cmd, info in commands.items():
+        lines.append(f"• `/{cmd} [{info['param']}]` → {info['desc']}")
+    lines.append(footer)
+    return "\n".join(lines)
+
+
+def admin_commands_text(admin_lines, footer):
+    return "\n".join(["👑 **ADMIN COMMANDS**", "────────────────────────────", *admin_lines, footer])
+
+
+# ==================== LOOKUP RESULTS ====================
+def result_html(cleaned):
+    """User reply for a result that fits in one message."""
+    return f"<pre>{escape_html(cleaned)}</pre>{RESULT_FOOTER}"
+
+
+def log_markdown(user_id, username, cmd, query, json_str):
+    """MarkdownV2 log channel message with the JSON in a code block.
+
+    json_str is the raw serialized payload, not the branding-cleaned text
+    the user got (the log channel keeps the upstream's original output).
+    """
+    return (
+        f"👤 *User:* {user_id} \\(@{escape_md(username or 'N/A')}\\)\n"
+        f"🔍 *Command:* /{escape_md(cmd)}\n"
+        f"📝 *Query:* `{escape_md_code(query)}`\n\n"
+        f"```json\n{escape_md_code(json_str)}\n```"
+    )
+
+
+def log_caption_html(user_id, username, cmd, query):
+    """HTML caption for the log channel copy of a long result."""
+    return (
+        f"👤 <b>User:</b> {user_id} (@{escape_html(username or 'N/A')})\n"
+        f"🔍 <b>Command:</b> /{cmd}\n"
+        f"📝 <b>Query:</b> <code>{escape_html(query)}</code>\n\n"
+        f"📎 Output too long, sent as file."
+    )
@@ -0,0 +1,48 @@
+# runtime.py - Optional runtime profile: uvloop event loop and GC tuning
+# Default asyncio loop aur default GC thresholds hi rehte hain jab tak env se on na karo
+# (RUNTIME_PROFILE=fast ya individual RUNTIME_UVLOOP / RUNTIME_GC_FREEZE / GC_THRESHOLDS).
+
+import gc
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def loop_factory(use_uvloop):
+    """uvloop.new_event_loop when requested and installed, else None (default loop)."""
+    if not use_uvloop:
+        return None
+    try:
+        import uvloop
+    except ImportError:  # uvloop optional hai (Windows pe available nahi)
+        logger.warning("⚠️ RUNTIME_UVLOOP set but uvloop is not installed, using default asyncio loop")
+        return None
+    return uvloop.new_event_loop
+
+
+def run(main, use_uvloop=False):
+    """asyncio.run(main()) on uvloop if requested."""
+    factory = loop_factory(use_uvloop)
+    with asyncio.Runner(loop_factory=factory) as runner:
+        if factory is not None:
+            logger.info("⚡ Running on uvloop")
+        return runner.run(main())
+
+
+def tune_gc(thresholds):
+    """Set gc thresholds (gen0, gen1, gen2); None keeps the interpreter defaults."""
+    if thresholds:
+        gc.set_threshold(*thresholds)
+        logger.info(f"♻️ GC thresholds set to {gc.get_threshold()}")
+
+
+def freeze_startup_objects():
+    """Move everything allocated during startup to the permanent generation.
+
+    Modules, handlers, config and the PTB application are never garbage, so
+    later collections stop re-scanning them. Call once, after post_init.
+    """
+    gc.collect()
+    gc.freeze()
+    logger.info(f"🧊 GC froze {gc.get_freeze_count()} startup objects")
@@ -0,0 +1,118 @@
+# sendqueue.py - Central scheduler for outgoing Telegram messages
+# Global token bucket (Telegram ~30 msg/s), per-chat limits aur priority classes,
+# taaki /broadcast chalte waqt bhi lookup replies pehle jaayein.
+
+import time
+import heapq
+import asyncio
+import itertools
+
+from ratelimit import TokenBucketLimiter
+
+# Chhota number = pehle bheja jayega. 1 se shuru: PTB falsy rate_limit_args (0) chupchap drop kar deta hai
+PRIORITY_INTERACTIVE = 1
+PRIORITY_ADMIN = 2
+PRIORITY_LOG = 3
+PRIORITY_BROADCAST = 4
+
+
+def is_private_chat(chat_id):
+    return isinstance(chat_id, int) and chat_id > 0
+
+
+class SendScheduler:
+    """Grants send slots by priority under a global and per-chat rate limit.
+
+    A caller first waits until its chat's bucket has a token (that only
+    delays that chat), then joins a priority heap for the global bucket. A
+    single dispatcher task hands out global tokens, always to the most
+    urgent waiter. The chat token is taken only once the global slot is
+    granted, so a backed-up global queue cannot release several sends of one
+    chat at once; if another send took the chat's token meanwhile, the
+    global token goes back and the caller waits again. pause() blocks all
+    global grants, e.g. after a RetryAfter.
+    Chats in log_chats (the log channels) get log_limit instead of the
+    group limit, so lookup logs don't share a bucket with user groups.
+    All limits are per process; with several workers pass each its share.
+    """
+
+    def __init__(self, global_limit=(25.0, 5), private_limit=(1.0, 3), group_limit=(20 / 60, 5),
+                 log_chats=(), log_limit=None, clock=time.monotonic):
+        self.global_rate, self.global_burst = global_limit
+        self.private_limit = private_limit
+        self.group_limit = group_limit
+        self.log_chats = frozenset(log_chats)
+        self.log_limit = log_limit or group_limit
+        self.clock = clock
+        self._tokens = float(self.global_burst)
+        self._last = clock()
+        self._paused_until = 0.0
+        self._chats = TokenBucketLimiter(idle_ttl=600, clock=clock)
+        self._waiters = []  # heap of (priority, seq, future)
+        self._seq = itertools.count()
+        self._dispatcher = None
+
+    def pending(self):
+        """Number of sends waiting for a global slot."""
+        return sum(1 for _, _, fut in self._waiters if not fut.done())
+
+    async def acquire(self, chat_id=None, priority=PRIORITY_INTERACTIVE):
+        if chat_id is None:
+            await self._acquire_global(priority)
+            return
+        limit = self._chat_limit(chat_id)
+        while True:
+            await self._wait_chat(chat_id, limit)
+            await self._acquire_global(priority)
+            ok, _ = self._chats.try_acquire(((chat_id, *limit),))
+            if ok:
+                return
+            # Global queue ke wait me is chat ka token kisi aur send ne le liya
+            self._tokens = min(self.global_burst, self._tokens + 1)
+
+    def pause(self, seconds):
+        self._paused_until = max(self._paused_until, self.clock() + seconds)
+
+    def _chat_limit(self, chat_id):
+        if chat_id in self.log_chats:
+            return self.log_limit
+        return self.private_limit if is_private_chat(chat_id) else self.group_limit
+
+    async def _wait_chat(self, chat_id, limit):
+        while True:
+            delay = self._chats.wait_time(chat_id, *limit)
+            if not delay:
+                return
+            await asyncio.sleep(delay)
+
+    def _refill(self, now):
+        self._tokens = min(self.global_burst, self._tokens + (now - self._last) * self.global_rate)
+        self._last = now
+
+    async def _acquire_global(self, priority):
+        now = self.clock()
+        self._refill(now)
+        if not self._waiters and self._tokens >= 1 and now >= self._paused_until:
+            self._tokens -= 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), fut))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        await fut
+
+    async def _dispatch(self):
+        while self._waiters:
+            now = self.clock()
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+            self._refill(now)
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.global_rate)
+                continue
+            _, _, fut = heapq.heappop(self._waiters)
+            if fut.done():  # caller cancelled
+                continue
+            self._tokens -= 1
+            fut.set_result(None)
@@ -0,0 +1,97 @@
+# statestore.py - Shared runtime state (copy cache etc.) for one or many workers
+# Single process: MemoryStore. Multiple workers/replicas: REDIS_URL set karo -> RedisStore.
+
+import time
+
+from jsonutil import dumps as json_dumps, loads as json_loads
+
+
+class MemoryStore:
+    """In-process key/value store with per-key TTL.
+
+    Expired keys are dropped lazily on access and by an amortized sweep,
+    so no background task is needed.
+    """
+
+    SWEEP_EVERY = 1000  # har itne writes pe ek sweep
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._data = {}  # key -> (expires_at or None, value)
+        self._writes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    async def get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= self.clock():
+            del self._data[key]
+            return None
+        return value
+
+    async def set(self, key, value, ttl=None):
+        now = self.clock()
+        self._data[key] = (now + ttl if ttl else None, value)
+        self._writes += 1
+        if self._writes % self.SWEEP_EVERY == 0:
+            self._sweep(now)
+
+    async def pop(self, key):
+        value = await self.get(key)
+        self._data.pop(key, None)
+        return value
+
+    async def delete(self, key):
+        self._data.pop(key, None)
+
+    async def close(self):
+        pass
+
+    def _sweep(self, now):
+        expired = [k for k, (exp, _) in self._data.items() if exp is not None and exp <= now]
+        for k in expired:
+            del self._data[k]
+
+
+class RedisStore:
+    """Same interface as MemoryStore, backed by Redis (or anything speaking its protocol).
+
+    Values are stored as JSON, so only JSON-serializable state should go in.
+    """
+
+    def __init__(self, url, prefix="osint:", client=None):
+        if client is None:
+            import redis.asyncio as redis  # optional dependency, only needed with REDIS_URL
+            client = redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key):
+        raw = await self.client.get(self.prefix + key)
+        return None if raw is None else json_loads(raw)
+
+    async def set(self, key, value, ttl=None):
+        await self.client.set(self.prefix + key, json_dumps(value), ex=int(ttl) if ttl else None)
+
+    async def pop(self, key):
+        # GETDEL (Redis >= 6.2) taaki do workers ek hi entry na le sakein
+        raw = await self.client.getdel(self.prefix + key)
+        return None if raw is None else json_loads(raw)
+
+    async def delete(self, key):
+        await self.client.delete(self.prefix + key)
+
+    async def close(self):
+        close = getattr(self.client, "aclose", None) or self.client.close
+        await close()
+
+
+def create_store(redis_url=None):
+    """RedisStore when a URL is configured, MemoryStore otherwise."""
+    if redis_url:
+        return RedisStore(redis_url)
+    return MemoryStore()
@@ -0,0 +1,16 @@
+# tests/conftest.py - Offline settings for importing the bot modules under pytest
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+# config.py env se padhta hai, isliye kisi bhi bot module ke import se pehle set karo
+os.environ.setdefault("BOT_TOKEN", "123456:TEST")
+os.environ.setdefault("OWNER_ID", "1")
+os.environ.setdefault("INITIAL_ADMINS", "1")
+os.environ.setdefault("DB_PATH", os.path.join(tempfile.mkdtemp(prefix="osint-tests-"), "bot.db"))
+os.environ.setdefault("PROBE_ENABLED", "0")
+os.environ.setdefault("LOG_QUEUE", "0")
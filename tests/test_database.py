@@ -0,0 +1,103 @@
+import asyncio
+import sqlite3
+
+import database
+
+
+def build_v0_db(path, months=("202001", "202002", "202003"), per_month=50):
+    """Pre-partitioning schema: one lookups table with results stored inline."""
+    db = sqlite3.connect(path)
+    db.execute('''
+        CREATE TABLE lookups (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER, command TEXT, query TEXT, result TEXT,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    rows = [
+        (i % 7, "num", f"q{i}", '{"n": %d}' % (i % 5), f"{m[:4]}-{m[4:]}-15 10:00:00")
+        for m in months for i in range(per_month)
+    ]
+    db.executemany('INSERT INTO lookups (user_id, command, query, result, timestamp) VALUES (?, ?, ?, ?, ?)', rows)
+    db.commit()
+    db.close()
+    return len(rows)
+
+
+def test_concurrent_init_migrates_once(tmp_path, monkeypatch):
+    path = str(tmp_path / "bot.db")
+    total = build_v0_db(path)
+    monkeypatch.setattr(database, "DB_PATH", path)
+
+    async def start_workers():
+        # Har call apna connection kholta hai, jaise alag worker processes
+        return await asyncio.gather(*(database.init_db() for _ in range(4)), return_exceptions=True)
+
+    results = asyncio.run(start_workers())
+    assert [r for r in results if isinstance(r, Exception)] == []
+
+    db = sqlite3.connect(path)
+    assert db.execute('PRAGMA user_version').fetchone()[0] == database.SCHEMA_VERSION
+    assert db.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    assert db.execute("SELECT type FROM sqlite_master WHERE name = 'lookups'").fetchone()[0] == 'view'
+    assert db.execute('SELECT COUNT(*) FROM lookups').fetchone()[0] == total
+    assert db.execute('SELECT COUNT(*) FROM result_blobs').fetchone()[0] == 5
+    tables = {row[0] for row in db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert {"lookups_202001", "lookups_202002", "lookups_202003",
+            database.partition_table(database.current_month())} <= tables
+    db.close()
+
+
+def test_failed_migration_rolls_back(tmp_path, monkeypatch):
+    path = str(tmp_path / "bot.db")
+    total = build_v0_db(path)
+    monkeypatch.setattr(database, "DB_PATH", path)
+
+    async def broken(db):
+        raise RuntimeError("crash mid-migration")
+
+    monkeypatch.setattr(database, "_partition_legacy_lookups", broken)
+    try:
+        asyncio.run(database.init_db())
+    except RuntimeError:
+        pass
+    monkeypatch.undo()
+    monkeypatch.setattr(database, "DB_PATH", path)
+
+    db = sqlite3.connect(path)
+    # Kuch bhi half-migrated nahi: purani table, bina result_hash column ke
+    assert db.execute('PRAGMA user_version').fetchone()[0] == 0
+    assert 'result_hash' not in [row[1] for row in db.execute('PRAGMA table_info(lookups)')]
+    db.close()
+
+    asyncio.run(database.init_db())
+    db = sqlite3.connect(path)
+    assert db.execute('SELECT COUNT(*) FROM lookups').fetchone()[0] == total
+    db.close()
+
+
+def test_stats_total_counts_archived_months(tmp_path, monkeypatch):
+    path = str(tmp_path / "bot.db")
+    total = build_v0_db(path)
+    archive_dir = str(tmp_path / "archive")
+    monkeypatch.setattr(database, "DB_PATH", path)
+    monkeypatch.setattr(database, "LOOKUP_ARCHIVE_DIR", archive_dir)
+
+    async def scenario():
+        await database.init_db()
+        before = (await database.get_stats())['total_lookups']
+        await database.archive_partition("202001", archive_dir)
+        after = await database.get_stats()
+        return before, after
+
+    before, after = asyncio.run(scenario())
+    assert before == after['total_lookups'] == total
+    assert after['archived_lookups'] == 50
+
+    # v2 DB jisme archive file hai par archived_lookups table nahi: migration file se count bharta hai
+    db = sqlite3.connect(path)
+    db.execute('DROP TABLE archived_lookups')
+    db.execute('PRAGMA user_version = 2')
+    db.close()
+    asyncio.run(database.init_db())
+    assert asyncio.run(database.get_stats())['total_lookups'] == total
@@ -0,0 +1,65 @@
+# tests/test_dedupe.py - Duplicate lookups get one short notice instead of silence
+import asyncio
+import types
+
+from telegram import Update
+from telegram.ext import ExtBot
+
+import main
+from config import COMMANDS
+from dedupe import RequestDeduper
+from stubs import FakeBotAPI
+
+CHAT_ID = -1001234567890
+CMD = next(cmd for cmd, info in COMMANDS.items() if info.get("canary"))
+TEXT = f"/{CMD} {COMMANDS[CMD]['canary']}"
+
+
+def group_update(bot, update_id, text=TEXT):
+    return Update.de_json({
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": CHAT_ID, "type": "supergroup", "title": "Test"},
+            "from": {"id": 77, "is_bot": False, "first_name": "User"},
+            "text": text,
+        },
+    }, bot)
+
+
+def duplicates_after(monkeypatch, finished, count=3):
+    """Register the lookup as running (or just answered), send `count` duplicates, return the notices sent."""
+    monkeypatch.setattr(main, "deduper", RequestDeduper(window=60))
+
+    async def scenario():
+        fake = FakeBotAPI()
+        url = await fake.start()
+        try:
+            bot = ExtBot("123456:TEST", base_url=url, rate_limiter=main.ScheduledRateLimiter())
+            async with bot:
+                context = types.SimpleNamespace(bot=bot)
+                key = main.dedupe_key(group_update(bot, 1))
+                assert main.deduper.begin(key) is None
+                if finished:
+                    main.deduper.finish(key, completed=True)
+                for i in range(count):
+                    await main.message_handler(group_update(bot, 2 + i), context)
+        finally:
+            await fake.stop()
+        return [text for chat_id, text in fake.texts if chat_id == CHAT_ID]
+
+    return asyncio.run(scenario())
+
+
+def test_in_flight_duplicate_gets_one_notice(monkeypatch):
+    assert duplicates_after(monkeypatch, finished=False) == [main.DEDUPE_NOTICES["in_flight"]]
+
+
+def test_recent_duplicate_gets_one_notice(monkeypatch):
+    assert duplicates_after(monkeypatch, finished=True) == [main.DEDUPE_NOTICES["recent"]]
+
+
+def test_notice_can_be_disabled(monkeypatch):
+    monkeypatch.setattr(main, "DEDUPE_NOTICE", False)
+    assert duplicates_after(monkeypatch, finished=True) == []
@@ -0,0 +1,22 @@
+from e2e import log_errors
+
+
+def test_log_errors(tmp_path):
+    path = tmp_path / "bot.log"
+    path.write_text(
+        "2026-10-19 10:00:00,001 - __main__ - INFO - [-] 🚀 Worker 0 ready\n"
+        "2026-10-19 10:00:01,002 - osint.lookup - ERROR - [u7] ❌ MarkdownV2 send failed: boom\n"
+        "Traceback (most recent call last):\n"
+        "ValueError: boom\n"
+        "2026-10-19 10:00:02,003 - __main__ - WARNING - [u8] slow\n"
+        "Traceback (most recent call last):\n"
+        "RuntimeError: unlogged\n"
+        '{"ts": "2026-10-19 10:00:03,004", "level": "CRITICAL", "logger": "x", "request_id": "-", "msg": "down"}\n'
+        '{"ts": "2026-10-19 10:00:04,005", "level": "INFO", "logger": "x", "request_id": "-", "msg": "ok"}\n'
+    )
+    errors = log_errors(str(path))
+    # ERROR record ka apna traceback alag count nahi hota; WARNING ke baad wala hota hai
+    assert len(errors) == 3
+    assert "MarkdownV2 send failed" in errors[0]
+    assert errors[1].startswith("Traceback")
+    assert '"CRITICAL"' in errors[2]
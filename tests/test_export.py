@@ -0,0 +1,80 @@
+# tests/test_export.py - /export end to end: admin command -> DB -> gzip parts -> fake Bot API
+import asyncio
+import csv
+import gzip
+import io
+import json
+import types
+
+from telegram import Update
+from telegram.ext import ExtBot
+
+import database
+import main
+from stubs import FakeBotAPI
+
+ADMIN_ID = 1
+
+
+def admin_update(bot, text):
+    return Update.de_json({
+        "update_id": 1,
+        "message": {
+            "message_id": 10,
+            "date": 0,
+            "chat": {"id": ADMIN_ID, "type": "private"},
+            "from": {"id": ADMIN_ID, "is_bot": False, "first_name": "Admin"},
+            "text": text,
+        },
+    }, bot)
+
+
+def run_export(tmp_path, monkeypatch, args, lookups=5):
+    """Seed the DB, run export_data through a real ExtBot + the production limiter, return the fake API."""
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "bot.db"))
+
+    async def scenario():
+        await database.init_db()
+        await database.update_user(ADMIN_ID, "admin", "Admin", None)
+        for i in range(lookups):
+            await database.save_lookup(ADMIN_ID, "num", f"98765432{i:02d}", {"i": i})
+        fake = FakeBotAPI()
+        url = await fake.start()
+        try:
+            bot = ExtBot("123456:TEST", base_url=url, rate_limiter=main.ScheduledRateLimiter())
+            async with bot:
+                await main.export_data(admin_update(bot, "/export " + " ".join(args)), types.SimpleNamespace(args=args, bot=bot))
+        finally:
+            await fake.stop()
+        return fake
+
+    return asyncio.run(scenario())
+
+
+def test_export_lookups_jsonl(tmp_path, monkeypatch):
+    fake = run_export(tmp_path, monkeypatch, ["lookups"])
+    assert len(fake.documents) == 1
+    method, chat_id, filename, body = fake.documents[0]
+    assert (method, chat_id) == ("sendDocument", ADMIN_ID)
+    assert filename.startswith("lookups_") and filename.endswith("_part1.jsonl.gz")
+    rows = [json.loads(line) for line in gzip.decompress(body).decode().splitlines()]
+    assert [r["query"] for r in rows] == [f"98765432{i:02d}" for i in range(5)]
+    assert json.loads(rows[0]["result"]) == {"i": 0}
+    assert fake.texts[-1] == (ADMIN_ID, "✅ Export done: 5 rows in 1 file(s).")
+
+
+def test_export_users_csv(tmp_path, monkeypatch):
+    fake = run_export(tmp_path, monkeypatch, ["users", "csv"], lookups=2)
+    (_, _, filename, body), = fake.documents
+    assert filename.endswith("_part1.csv.gz")
+    rows = list(csv.reader(io.StringIO(gzip.decompress(body).decode())))
+    assert rows[0] == list(database.USER_EXPORT_COLUMNS)
+    assert rows[1][:2] == [str(ADMIN_ID), "admin"] and rows[1][4] == "2"
+    assert "Export done: 1 rows" in fake.texts[-1][1]
+
+
+def test_export_single_date_is_that_day_only(tmp_path, monkeypatch):
+    # Seeded lookups aaj ke hain; ek purani date pe kuch nahi aana chahiye (pehle "us din se aaj tak" tha)
+    fake = run_export(tmp_path, monkeypatch, ["lookups", "2020-01-01"])
+    assert all(gzip.decompress(body) == b"" for _, _, _, body in fake.documents)
+    assert fake.texts[-1][1].startswith("✅ Export done: 0 rows")
@@ -0,0 +1,31 @@
+# tests/test_logsetup.py - httpx stays at WARNING (bot token in URLs) unless named in LOG_LEVELS
+import logging
+
+import pytest
+
+from logsetup import parse_levels, setup_logging, stop_logging
+
+
+@pytest.fixture
+def restore_logging():
+    root = logging.getLogger()
+    saved = root.handlers[:], root.level
+    names = ("httpx", "osint.lookup")
+    levels = {name: logging.getLogger(name).level for name in names}
+    yield
+    stop_logging()
+    root.handlers[:], root.level = saved[0], saved[1]
+    for name, level in levels.items():
+        logging.getLogger(name).setLevel(level)
+
+
+@pytest.mark.parametrize("spec, httpx_level", [
+    ("", logging.WARNING),
+    ("osint.lookup=WARNING", logging.WARNING),
+    ("osint.lookup=ERROR,httpx=DEBUG", logging.DEBUG),
+])
+def test_httpx_default_survives_unrelated_overrides(restore_logging, spec, httpx_level):
+    setup_logging("INFO", module_levels=parse_levels(spec), use_queue=False)
+    assert logging.getLogger("httpx").level == httpx_level
+    if "osint.lookup" in spec:
+        assert logging.getLogger("osint.lookup").level != logging.NOTSET
@@ -0,0 +1,41 @@
+# tests/test_metrics_labels.py - Unknown /commands must not create new metric series
+import asyncio
+import types
+
+from telegram import Update
+from telegram.ext import ExtBot
+
+import database
+import main
+import metrics
+from stubs import FakeBotAPI, command_update
+
+OWNER_ID = 1  # force-join / ban checks skip the owner
+
+
+def series_count():
+    return {m.name: len(m._values) for m in (metrics.LOOKUPS, metrics.LOOKUP_LATENCY, metrics.LOOKUPS_IN_FLIGHT)}
+
+
+def test_unknown_commands_add_no_series(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "bot.db"))
+
+    async def scenario():
+        await database.init_db()
+        fake = FakeBotAPI()
+        url = await fake.start()
+        try:
+            bot = ExtBot("123456:TEST", base_url=url, rate_limiter=main.ScheduledRateLimiter())
+            async with bot:
+                context = types.SimpleNamespace(bot=bot)
+                before = series_count()
+                for i in range(20):
+                    _, data = command_update(OWNER_ID, -1001000000000 - i, f"/made_up_{i} something")
+                    await main.message_handler(Update.de_json(data, bot), context)
+                return before, series_count(), fake.texts
+        finally:
+            await fake.stop()
+
+    before, after, texts = asyncio.run(scenario())
+    assert after == before
+    assert [text for _, text in texts] == ["❌ Command not found."] * 20
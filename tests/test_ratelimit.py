@@ -0,0 +1,54 @@
+# tests/test_ratelimit.py - Fair sharing between a heavy and a light user, with the configured limits
+# Spammer har 100 ms pe lookup bhejta hai, normal user har 10 s pe, dono same group me.
+# Spammer apne user bucket tak throttle hota hai; light user kabhi reject nahi hota.
+import main
+from config import RATE_LIMITS, SEND_LIMITS
+from ratelimit import TokenBucketLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_heavy_user_does_not_starve_light_user(monkeypatch):
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(idle_ttl=600, clock=clock)
+    monkeypatch.setattr(main, "lookup_limiter", limiter)
+    chat_id = -100123
+    duration, step = 300.0, 0.1
+    stats = {"heavy": [0, 0], "light": [0, 0]}  # [allowed, rejected]
+    for i in range(int(duration / step)):
+        clock.now = i * step
+        ok, _ = main.check_rate_limit(1, chat_id, "num")
+        stats["heavy"][0 if ok else 1] += 1
+        if i % int(10 / step) == 0:
+            ok, retry_after = main.check_rate_limit(2, chat_id, "num")
+            assert ok, f"light user throttled at t={clock.now}s (retry after {retry_after:.1f}s)"
+            stats["light"][0] += 1
+
+    rate, burst = RATE_LIMITS["user"]
+    assert stats["heavy"][0] <= burst + rate * duration + 1
+    assert stats["heavy"][1] > 0
+    assert stats["light"] == [duration // 10, 0]
+    # Idle user buckets stay bounded: two users + one chat + one command
+    assert len(limiter) == 4
+
+
+def test_chat_admission_fits_group_send_budget():
+    """A group cannot admit lookups faster than its replies can be sent."""
+    chat_rate, chat_burst = RATE_LIMITS["chat"]
+    send_rate, send_burst = SEND_LIMITS["group"]
+    assert chat_rate <= send_rate and chat_burst <= send_burst
+
+
+def test_command_budget_is_split_between_workers(monkeypatch):
+    monkeypatch.setattr(main, "WORKER_INDEX", 2)
+    monkeypatch.setattr(main, "WORKERS", 4)
+    rate, burst = RATE_LIMITS["command"]
+    assert main.worker_share(RATE_LIMITS["command"]) == (rate / 4, max(1, burst // 4))
+    monkeypatch.setattr(main, "WORKER_INDEX", None)
+    assert main.worker_share(RATE_LIMITS["command"]) == RATE_LIMITS["command"]
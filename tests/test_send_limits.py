@@ -0,0 +1,135 @@
+# tests/test_send_limits.py - ScheduledRateLimiter through a real ExtBot against a rate-enforcing fake Bot API
+# Fake API Telegram jaisa 429 (retry_after) deta hai jab kisi 1s window me limit cross ho.
+# Scheduler limits usse thode neeche set hain, jaise production me (25/s vs Telegram ke 30/s).
+import asyncio
+import time
+from collections import defaultdict
+
+from aiohttp import web
+from telegram.ext import ExtBot
+
+import main
+from sendqueue import SendScheduler, PRIORITY_INTERACTIVE, PRIORITY_ADMIN, PRIORITY_LOG, PRIORITY_BROADCAST
+from stubs import FakeBotAPI
+
+GROUP = -1001000000001
+LOG_CHANNEL = -1002000000001
+
+
+class EnforcingBotAPI(FakeBotAPI):
+    """FakeBotAPI that answers 429 when a send would exceed a per-second cap."""
+
+    def __init__(self, global_cap=12, group_cap=3, log_cap=6, log_chats=(), reject_first=0):
+        super().__init__()
+        self.caps = {"global": global_cap, "group": group_cap, "log": log_cap}
+        self.log_chats = set(log_chats)
+        self.reject_first = reject_first
+        self.sent = []      # (time, chat_id, text) of accepted sends
+        self.rejected = []  # (time, chat_id, reason)
+
+    def _count(self, since, chat_id=None):
+        return sum(1 for t, c, _ in self.sent if t > since and (chat_id is None or c == chat_id))
+
+    async def handle(self, request):
+        method = request.match_info["method"]
+        if method == "sendMessage":
+            params = dict(await request.post())
+            chat_id, now = int(params["chat_id"]), time.monotonic()
+            reason = None
+            if self.reject_first:
+                self.reject_first -= 1
+                reason = "forced"
+            elif self._count(now - 1) >= self.caps["global"]:
+                reason = "global"
+            elif chat_id in self.log_chats and self._count(now - 1, chat_id) >= self.caps["log"]:
+                reason = "log"
+            elif chat_id < 0 and chat_id not in self.log_chats and self._count(now - 1, chat_id) >= self.caps["group"]:
+                reason = "group"
+            if reason:
+                self.rejected.append((now, chat_id, reason))
+                return web.json_response({"ok": False, "error_code": 429, "description": "Too Many Requests: retry after 1",
+                                          "parameters": {"retry_after": 1}}, status=429)
+            self.sent.append((now, chat_id, params.get("text", "")))
+        return await super().handle(request)
+
+
+def max_per_window(times, window=1.0):
+    times = sorted(times)
+    best, lo = 0, 0
+    for hi, t in enumerate(times):
+        while times[lo] <= t - window:
+            lo += 1
+        best = max(best, hi - lo + 1)
+    return best
+
+
+def run_sends(monkeypatch, fake, scheduler, sends):
+    """sends: [(delay_before_start, chat_id, text, rate_limit_args)], started as concurrent tasks."""
+    monkeypatch.setattr(main, "send_scheduler", scheduler)
+
+    async def scenario():
+        url = await fake.start()
+        try:
+            bot = ExtBot("123456:TEST", base_url=url, rate_limiter=main.ScheduledRateLimiter())
+            async with bot:
+                tasks = []
+                for delay, chat_id, text, args in sends:
+                    if delay:
+                        await asyncio.sleep(delay)
+                    kwargs = {} if args is None else {"rate_limit_args": args}
+                    tasks.append(asyncio.create_task(bot.send_message(chat_id=chat_id, text=text, **kwargs)))
+                await asyncio.gather(*tasks)
+        finally:
+            await fake.stop()
+
+    asyncio.run(scenario())
+
+
+def test_caps_respected(monkeypatch):
+    fake = EnforcingBotAPI(log_chats={LOG_CHANNEL})
+    scheduler = SendScheduler(global_limit=(8.0, 2), private_limit=(2.0, 1), group_limit=(1.0, 1),
+                              log_chats={LOG_CHANNEL}, log_limit=(3.0, 2))
+    sends = ([(0, GROUP, f"g{i}", None) for i in range(5)]
+             + [(0, LOG_CHANNEL, f"l{i}", PRIORITY_LOG) for i in range(12)]
+             + [(0, 100 + i, f"p{i}", PRIORITY_ADMIN) for i in range(10)])
+    run_sends(monkeypatch, fake, scheduler, sends)
+
+    assert fake.rejected == []
+    assert len(fake.sent) == len(sends)
+    by_chat = defaultdict(list)
+    for t, chat_id, _ in fake.sent:
+        by_chat[chat_id].append(t)
+    # Token bucket bound: burst + rate * 1s
+    assert max_per_window([t for t, _, _ in fake.sent]) <= 2 + 8
+    assert max_per_window(by_chat[GROUP]) <= 1 + 1
+    assert max_per_window(by_chat[LOG_CHANNEL]) <= 2 + 3
+    # Log channel ka apna bucket: group rate (1/s) pe 12 posts ~11s lagte
+    log_times = by_chat[LOG_CHANNEL]
+    assert max(log_times) - min(log_times) < 6
+
+
+def test_priority_order(monkeypatch):
+    fake = EnforcingBotAPI()
+    scheduler = SendScheduler(global_limit=(5.0, 1), private_limit=(5.0, 1))
+    # Pehle broadcast queue bhar do, phir baaki classes aayein; sab alag private chats
+    sends = [(0, 200 + i, f"broadcast{i}", PRIORITY_BROADCAST) for i in range(4)]
+    sends += [(0.05, 300, "log", PRIORITY_LOG), (0, 301, "admin", PRIORITY_ADMIN),
+              (0, 302, "interactive", PRIORITY_INTERACTIVE), (0, 303, "default", None)]
+    run_sends(monkeypatch, fake, scheduler, sends)
+
+    order = [text for _, _, text in fake.sent]
+    assert fake.rejected == []
+    # broadcast0 ne burst token turant le liya; baaki priority se
+    assert order == ["broadcast0", "interactive", "default", "admin", "log", "broadcast1", "broadcast2", "broadcast3"]
+
+
+def test_retry_after_pauses_and_retries(monkeypatch):
+    fake = EnforcingBotAPI(reject_first=1)
+    scheduler = SendScheduler(global_limit=(50.0, 5))
+    start = time.monotonic()
+    run_sends(monkeypatch, fake, scheduler, [(0, 100, "hello", None), (0.05, 101, "second", None)])
+
+    assert [reason for _, _, reason in fake.rejected] == ["forced"]
+    assert sorted(text for _, _, text in fake.sent) == ["hello", "second"]
+    # retry_after=1: dono sends pause ke baad hi gaye
+    assert min(t for t, _, _ in fake.sent) - start >= 0.9
@@ -0,0 +1,119 @@
+# tests/test_statestore.py - RedisStore against an in-memory fake client (and a real Redis if available)
+import asyncio
+import os
+import uuid
+
+import pytest
+
+from statestore import MemoryStore, RedisStore, create_store
+
+
+class FakeRedis:
+    """The redis.asyncio calls RedisStore uses: bytes values, EX in seconds, GETDEL."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.data = {}  # key -> (expires_at or None, bytes)
+        self.calls = []
+        self.closed = False
+
+    def _live(self, key):
+        entry = self.data.get(key)
+        if entry is not None and entry[0] is not None and entry[0] <= self.now:
+            del self.data[key]
+            entry = None
+        return entry
+
+    async def get(self, key):
+        self.calls.append(("get", key))
+        entry = self._live(key)
+        return None if entry is None else entry[1]
+
+    async def set(self, key, value, ex=None):
+        self.calls.append(("set", key, ex))
+        self.data[key] = (self.now + ex if ex else None, value.encode() if isinstance(value, str) else value)
+        return True
+
+    async def getdel(self, key):
+        self.calls.append(("getdel", key))
+        entry = self._live(key)
+        self.data.pop(key, None)
+        return None if entry is None else entry[1]
+
+    async def delete(self, key):
+        self.calls.append(("delete", key))
+        return int(self.data.pop(key, None) is not None)
+
+    async def aclose(self):
+        self.closed = True
+
+
+def test_redis_store_roundtrip_and_ttl():
+    async def scenario():
+        client = FakeRedis()
+        store = RedisStore("redis://unused", client=client)
+        value = {"text": "नमस्ते", "rows": [1, 2], "nested": {"ok": True}}
+        await store.set("copy:1", value, ttl=300.7)
+        # Prefix aur integer EX ke saath Redis tak pahunchta hai
+        assert client.calls[-1] == ("set", "osint:copy:1", 300)
+        assert await store.get("copy:1") == value
+        assert await store.get("missing") is None
+
+        await store.set("forever", [1])
+        assert client.data["osint:forever"][0] is None
+        client.now = 301
+        assert await store.get("copy:1") is None
+        assert await store.get("forever") == [1]
+
+        await store.delete("forever")
+        assert await store.get("forever") is None
+        await store.close()
+        assert client.closed
+
+    asyncio.run(scenario())
+
+
+def test_redis_store_shared_between_workers():
+    """Two workers' stores on one Redis: state set by one is seen by the other, pop hands it out once."""
+    async def scenario():
+        client = FakeRedis()
+        worker_a = RedisStore("redis://unused", client=client)
+        worker_b = RedisStore("redis://unused", client=client)
+        await worker_a.set("copy:42", {"text": "result"}, ttl=300)
+        assert await worker_b.get("copy:42") == {"text": "result"}
+        results = await asyncio.gather(worker_a.pop("copy:42"), worker_b.pop("copy:42"))
+        assert sorted(results, key=lambda r: r is None) == [{"text": "result"}, None]
+        assert ("getdel", "osint:copy:42") in client.calls
+
+    asyncio.run(scenario())
+
+
+def test_create_store():
+    assert isinstance(create_store(None), MemoryStore)
+    assert isinstance(create_store(""), MemoryStore)
+
+
+def test_real_redis():
+    """Same checks against a local Redis; skipped unless redis-py is installed and TEST_REDIS_URL answers."""
+    redis = pytest.importorskip("redis.asyncio")
+    url = os.environ.get("TEST_REDIS_URL", "redis://127.0.0.1:6379/15")
+
+    async def scenario():
+        client = redis.from_url(url)
+        try:
+            await client.ping()
+        except Exception as e:
+            await client.aclose()
+            pytest.skip(f"no Redis at {url}: {e}")
+        store = RedisStore(url, prefix=f"osint-test-{uuid.uuid4().hex}:", client=client)
+        try:
+            await store.set("copy:1", {"text": "नमस्ते"}, ttl=60)
+            assert await store.get("copy:1") == {"text": "नमस्ते"}
+            assert 0 < await client.ttl(store.prefix + "copy:1") <= 60
+            assert await store.pop("copy:1") == {"text": "नमस्ते"}
+            assert await store.pop("copy:1") is None
+        finally:
+            await store.delete("copy:1")
+            await store.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,37 @@
+# tests/test_tracing.py - Background log posts are traced as their own stage
+import asyncio
+
+import tracing
+
+
+def test_background_post_recorded_after_trace_finished():
+    tracer = tracing.Tracer(sample_rate=1.0)
+    tasks = []
+
+    async def post():
+        await asyncio.sleep(0.02)
+
+    @tracer.traced
+    async def handler(update, context):
+        tracing.set_command("num")
+        t = tracing.mark()
+        tracing.record("reply", t)
+        tasks.append(asyncio.create_task(tracing.background("log_channel", post())))
+
+    async def scenario():
+        await handler(None, None)
+        assert "log_channel (bg)" not in [row[0] for row in tracer.stats.summary("num")]
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    rows = {stage: (n, p50) for stage, n, p50, _ in tracer.stats.summary("num")}
+    assert set(rows) == {"reply", "total", "log_channel (bg)"}
+    assert rows["log_channel (bg)"][1] >= 0.02 > rows["total"][1]
+    assert tracing.is_background("log_channel (bg)")
+
+
+def test_untraced_background_just_awaits():
+    async def post():
+        return "sent"
+
+    assert asyncio.run(tracing.background("log_channel", post())) == "sent"
@@ -0,0 +1,70 @@
+# tests/test_update_processor.py - Conversation state survives concurrent update processing
+import asyncio
+
+from telegram import Update
+
+import database
+import main
+from stubs import FakeBotAPI, command_update
+
+OWNER_ID = 1
+DM_TARGET = 555
+
+
+def test_dm_reply_sent_right_after_command_reaches_conversation(tmp_path, monkeypatch):
+    """/dm and the message to forward arrive back to back; the message must still be DM'd."""
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "bot.db"))
+
+    async def scenario():
+        await database.init_db()
+        fake = FakeBotAPI()
+        url = await fake.start()
+        monkeypatch.setattr(main, "BOT_API_BASE_URL", url)
+        try:
+            app = main.build_application()
+            async with app:
+                await app.start()
+                # Dono updates ek saath queue me: /dm ka reply abhi network pe hota hai
+                for text in (f"/dm {DM_TARGET}", "hello"):
+                    _, data = command_update(OWNER_ID, OWNER_ID, text)
+                    if not text.startswith("/"):
+                        del data["message"]["entities"]
+                    await app.update_queue.put(Update.de_json(data, app.bot))
+                for _ in range(200):
+                    if any(chat_id == OWNER_ID and text.startswith("✅ Message sent") for chat_id, text in fake.texts):
+                        break
+                    await asyncio.sleep(0.01)
+                await app.stop()
+        finally:
+            await fake.stop()
+        return fake
+
+    fake = asyncio.run(scenario())
+    assert fake.calls["copyMessage"] == 1
+    assert (OWNER_ID, f"✅ Message sent to {DM_TARGET}") in fake.texts
+
+
+def test_different_users_run_concurrently():
+    processor = main.PerUserUpdateProcessor(8)
+    order = []
+
+    async def handle(name, delay):
+        order.append(f"{name} start")
+        await asyncio.sleep(delay)
+        order.append(f"{name} end")
+
+    def update(user_id, update_id):
+        return Update.de_json(command_update(user_id, -100500, "/x")[1] | {"update_id": update_id}, None)
+
+    async def scenario():
+        await asyncio.gather(
+            processor.process_update(update(1, 1), handle("a1", 0.05)),
+            processor.process_update(update(1, 2), handle("a2", 0)),
+            processor.process_update(update(2, 3), handle("b", 0)),
+        )
+
+    asyncio.run(scenario())
+    # Same user: a2 a1 ke baad; dusra user b a1 ke khatam hone ka wait nahi karta
+    assert order.index("a2 start") > order.index("a1 end")
+    assert order.index("b end") < order.index("a1 end")
+    assert processor._keys == {}
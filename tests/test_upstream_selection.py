@@ -0,0 +1,116 @@
+# tests/test_upstream_selection.py - call_command_api against real local HTTP upstreams
+# Har provider ek StubUpstreams server hai (fixed latency, 0% ya 100% errors), taaki
+# endpoint choice, HTTP failover, timeouts aur EWMA updates real requests se check hon.
+import asyncio
+import json
+import time
+
+import pytest
+
+import main
+from config import COMMANDS
+from stubs import StubUpstreams
+from upstream import EndpointSelector
+
+CMD = next(iter(COMMANDS))
+
+
+def run_with_upstreams(monkeypatch, specs, scenario, timeout=5):
+    """Start one stub per (latency, error_rate) spec and run scenario(stubs, cmd_info) against them."""
+    monkeypatch.setattr(main, "upstream_selector", EndpointSelector(explore=0))
+    monkeypatch.setattr(main, "UPSTREAM_TIMEOUT", timeout)
+
+    async def wrapper():
+        stubs = [StubUpstreams([CMD], latency=0, error_rate=error_rate, latency_samples={CMD: [latency]})
+                 for latency, error_rate in specs]
+        urls = [await stub.start() for stub in stubs]
+        try:
+            cmd_info = {"endpoints": [{"url": f"{url}/{CMD}?q={{}}"} for url in urls]}
+            return await scenario(stubs, cmd_info)
+        finally:
+            for stub in stubs:
+                await stub.stop()
+
+    return asyncio.run(wrapper())
+
+
+def expected_payload(stub):
+    return json.loads(stub._bodies[CMD])
+
+
+def stats(cmd_info, i):
+    return main.upstream_selector.snapshot()[cmd_info["endpoints"][i]["url"]]
+
+
+def test_http_error_fails_over_and_is_demoted(monkeypatch):
+    async def scenario(stubs, cmd_info):
+        broken, good = stubs
+        # Dono untried: config order, broken pehle -> HTTP 500 -> good
+        assert await main.call_command_api(CMD, cmd_info, "x") == expected_payload(good)
+        assert (broken.requests, good.requests) == (1, 1)
+        assert stats(cmd_info, 0)[1] == 0.0 and stats(cmd_info, 1)[1] == 1.0
+        # Ab good ki score kam hai: broken ko dobara try hi nahi kiya jaata
+        for _ in range(3):
+            assert await main.call_command_api(CMD, cmd_info, "x") == expected_payload(good)
+        assert (broken.requests, good.requests) == (1, 4)
+
+    run_with_upstreams(monkeypatch, [(0.0, 1.0), (0.0, 0.0)], scenario)
+
+
+def test_all_endpoints_failing_returns_last_error(monkeypatch):
+    async def scenario(stubs, cmd_info):
+        assert await main.call_command_api(CMD, cmd_info, "x") == {"error": "HTTP 500"}
+        assert [stub.requests for stub in stubs] == [1, 1]
+
+    run_with_upstreams(monkeypatch, [(0.0, 1.0), (0.0, 1.0)], scenario)
+
+
+def test_prefers_lower_latency(monkeypatch):
+    async def scenario(stubs, cmd_info):
+        slow, fast, spare = stubs
+        # Pehle teen lookups har untried endpoint ko ek baar try karte hain
+        for _ in range(3):
+            await main.call_command_api(CMD, cmd_info, "x")
+        assert [stub.requests for stub in stubs] == [1, 1, 1]
+        for _ in range(5):
+            await main.call_command_api(CMD, cmd_info, "x")
+        assert fast.requests == 6 and slow.requests == 1 and spare.requests == 1
+        slow_latency, fast_latency = stats(cmd_info, 0)[0], stats(cmd_info, 1)[0]
+        assert slow_latency >= 0.25 and fast_latency < slow_latency
+        assert stats(cmd_info, 1)[2] == 6
+
+    run_with_upstreams(monkeypatch, [(0.3, 0.0), (0.01, 0.0), (0.15, 0.0)], scenario)
+
+
+def test_timeout_fails_over(monkeypatch):
+    async def scenario(stubs, cmd_info):
+        hanging, good = stubs
+        start = time.perf_counter()
+        assert await main.call_command_api(CMD, cmd_info, "x") == expected_payload(good)
+        # Ek timeout (0.2s) + good ka jawab, hanging ke 3s ka wait nahi
+        assert time.perf_counter() - start < 1.5
+        latency, success, samples = stats(cmd_info, 0)
+        assert success == 0.0 and latency >= 0.2 and samples == 1
+        await main.call_command_api(CMD, cmd_info, "x")
+        assert good.requests == 2
+
+    run_with_upstreams(monkeypatch, [(3.0, 0.0), (0.0, 0.0)], scenario, timeout=0.2)
+
+
+def test_ewma_demotes_endpoint_that_starts_failing(monkeypatch):
+    async def scenario(stubs, cmd_info):
+        primary, backup = stubs
+        for _ in range(2):
+            await main.call_command_api(CMD, cmd_info, "x")
+        assert main.upstream_selector.order(cmd_info["endpoints"])[0] == cmd_info["endpoints"][0]
+
+        primary.error_rate = 1.0
+        assert await main.call_command_api(CMD, cmd_info, "x") == expected_payload(backup)
+        # Ek failure: success EWMA 1.0 -> 0.8, score me 0.2 * penalty judta hai
+        assert stats(cmd_info, 0)[1] == pytest.approx(0.8)
+        assert main.upstream_selector.order(cmd_info["endpoints"])[0] == cmd_info["endpoints"][1]
+        before = primary.requests
+        await main.call_command_api(CMD, cmd_info, "x")
+        assert primary.requests == before
+
+    run_with_upstreams(monkeypatch, [(0.0, 0.0), (0.05, 0.0)], scenario)
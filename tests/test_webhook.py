@@ -0,0 +1,77 @@
+# tests/test_webhook.py - POST fake updates to the local /telegram/webhook endpoint
+import asyncio
+import types
+
+from aiohttp.test_utils import TestClient, TestServer
+
+import main
+from config import WEBHOOK_PATH
+from stubs import command_update
+
+SECRET = "test-secret"
+
+
+def post_all(monkeypatch, requests):
+    """POST each (headers, body) to the webhook; return ([status], updates put on update_queue)."""
+    app = types.SimpleNamespace(bot=None, update_queue=asyncio.Queue())
+    monkeypatch.setattr(main, "bot_application", app)
+    monkeypatch.setattr(main, "webhook_secret", SECRET)
+
+    async def scenario():
+        async with TestClient(TestServer(main.build_web_app())) as client:
+            statuses = []
+            for headers, body in requests:
+                resp = await client.post(WEBHOOK_PATH, data=body, headers=headers)
+                statuses.append(resp.status)
+        updates = []
+        while not app.update_queue.empty():
+            updates.append(app.update_queue.get_nowait())
+        return statuses, updates
+
+    return asyncio.run(scenario())
+
+
+def signed(body):
+    return {"X-Telegram-Bot-Api-Secret-Token": SECRET, "Content-Type": "application/json"}, body
+
+
+def test_update_reaches_queue(monkeypatch):
+    _, data = command_update(7, -1001, "/num 9876543210")
+    statuses, updates = post_all(monkeypatch, [signed(main.json_dumps(data))])
+    assert statuses == [200]
+    assert [u.update_id for u in updates] == [data["update_id"]]
+    assert updates[0].message.text == "/num 9876543210"
+
+
+def test_bad_or_missing_secret_is_forbidden(monkeypatch):
+    body = main.json_dumps(command_update(7, -1001, "/num 1")[1])
+    statuses, updates = post_all(monkeypatch, [
+        ({}, body),
+        ({"X-Telegram-Bot-Api-Secret-Token": "wrong"}, body),
+    ])
+    assert statuses == [403, 403]
+    assert updates == []
+
+
+def test_malformed_bodies_are_rejected(monkeypatch):
+    statuses, updates = post_all(monkeypatch, [
+        signed("{not json"),
+        signed("[]"),
+        signed("1"),
+        signed('"text"'),
+        signed("{}"),
+        signed('{"update_id": 1, "message": 5}'),
+    ])
+    assert statuses == [400] * 6
+    assert updates == []
+
+
+def test_webhook_disabled_without_secret(monkeypatch):
+    monkeypatch.setattr(main, "bot_application", None)
+    monkeypatch.setattr(main, "webhook_secret", None)
+
+    async def scenario():
+        async with TestClient(TestServer(main.build_web_app())) as client:
+            return (await client.post(WEBHOOK_PATH, data="{}")).status
+
+    assert asyncio.run(scenario()) == 404
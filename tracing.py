@@ -0,0 +1,150 @@
+# tracing.py - Per-stage latency tracing for lookups
+# Sampled lookups ke har stage (force join, API call, JSON dump, reply, ...) ka time
+# record hota hai; owner /perf se per-command breakdown dekh sakta hai.
+# Jo lookup sample nahi hua uske liye mark()/record() sirf ek ContextVar read hai.
+# Background kaam (log channel post) lookup ke baad khatam hota hai: background() usse
+# alag "(bg)" stage me record karta hai, "total" me nahi gina jaata.
+
+import time
+import random
+import logging
+import functools
+import contextvars
+from collections import deque
+
+from jsonutil import dumps as json_dumps
+from metrics import percentile
+
+perf_logger = logging.getLogger("osint.perf")
+
+_current = contextvars.ContextVar("osint_trace", default=None)
+
+
+class Trace:
+    __slots__ = ("tracer", "start", "command", "spans")
+
+    def __init__(self, tracer=None):
+        self.tracer = tracer
+        self.start = time.perf_counter()
+        self.command = None
+        self.spans = []  # (stage, seconds)
+
+
+class PerfStats:
+    """Rolling window of stage durations per (command, stage)."""
+
+    def __init__(self, window=200):
+        self.window = window
+        self._samples = {}  # cmd -> {stage: deque}
+
+    def add(self, cmd, stage, seconds):
+        stages = self._samples.setdefault(cmd, {})
+        buf = stages.get(stage)
+        if buf is None:
+            buf = stages[stage] = deque(maxlen=self.window)
+        buf.append(seconds)
+
+    def commands(self):
+        return list(self._samples)
+
+    def summary(self, cmd):
+        """[(stage, samples, p50, p95)] for cmd, slowest p50 first."""
+        rows = []
+        for stage, buf in self._samples.get(cmd, {}).items():
+            values = sorted(buf)
+            rows.append((stage, len(values), percentile(values, 50), percentile(values, 95)))
+        rows.sort(key=lambda r: r[2], reverse=True)
+        return rows
+
+
+class Tracer:
+    def __init__(self, sample_rate=0.0, json_logs=False, window=200):
+        self.sample_rate = sample_rate
+        self.json_logs = json_logs
+        self.stats = PerfStats(window)
+
+    def traced(self, handler):
+        """Decorator for an update handler: maybe start a trace, finish it afterwards."""
+        @functools.wraps(handler)
+        async def wrapper(update, context):
+            if not self.sample_rate or random.random() >= self.sample_rate:
+                return await handler(update, context)
+            trace = Trace(self)
+            token = _current.set(trace)
+            try:
+                return await handler(update, context)
+            finally:
+                _current.reset(token)
+                self._finish(trace)
+        return wrapper
+
+    def _finish(self, trace):
+        if trace.command is None:  # lookup tak pahuncha hi nahi
+            return
+        total = time.perf_counter() - trace.start
+        for stage, seconds in trace.spans:
+            self.stats.add(trace.command, stage, seconds)
+        self.stats.add(trace.command, "total", total)
+        if self.json_logs:
+            perf_logger.info(json_dumps({
+                "event": "lookup_trace",
+                "command": trace.command,
+                "total_ms": round(total * 1000, 2),
+                "stages_ms": {stage: round(s * 1000, 2) for stage, s in trace.spans},
+            }))
+
+
+    def add_background(self, trace, stage, seconds):
+        """Record a span that finished after the lookup's trace did."""
+        if trace.command is None:
+            return
+        self.stats.add(trace.command, stage, seconds)
+        if self.json_logs:
+            perf_logger.info(json_dumps({
+                "event": "lookup_trace_background",
+                "command": trace.command,
+                "stage": stage,
+                "ms": round(seconds * 1000, 2),
+            }))
+
+
+def is_background(stage):
+    return stage.endswith(" (bg)")
+
+
+async def background(stage, coro):
+    """Await coro (run as its own task) and record it as the stage "<stage> (bg)".
+
+    The task copies the lookup's context, so it still sees the trace, but the
+    trace is usually finished by then; the span goes straight to the stats.
+    """
+    trace = _current.get()
+    if trace is None or trace.tracer is None:
+        return await coro
+    started = time.perf_counter()
+    try:
+        return await coro
+    finally:
+        trace.tracer.add_background(trace, f"{stage} (bg)", time.perf_counter() - started)
+
+
+def mark():
+    """Start time for a stage, or None when this lookup is not traced."""
+    if _current.get() is None:
+        return None
+    return time.perf_counter()
+
+
+def record(stage, started):
+    """Close a stage opened with mark()."""
+    if started is None:
+        return
+    trace = _current.get()
+    if trace is not None:
+        trace.spans.append((stage, time.perf_counter() - started))
+
+
+def set_command(cmd):
+    trace = _current.get()
+    if trace is not None:
+        trace.command = cmd
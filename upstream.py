@@ -0,0 +1,98 @@
+# upstream.py - Multiple upstream endpoints per command with latency-aware selection
+# Har endpoint ki recent latency aur success rate (EWMA) track hoti hai;
+# sabse sasta endpoint pehle try hota hai, error pe agla.
+
+import random
+
+# ==================== RESPONSE ADAPTERS ====================
+# Alag providers ka response same shape me laane ke liye. Naya provider add karo
+# toh uska adapter yahan register karo aur config me "adapter" key se refer karo.
+
+
+def identity(payload):
+    return payload
+
+
+def unwrap_data(payload):
+    """{"status": ..., "data": {...}} style responses."""
+    if isinstance(payload, dict) and "data" in payload:
+        return payload["data"]
+    return payload
+
+
+def unwrap_result(payload):
+    """{"success": ..., "result": {...}} style responses."""
+    if isinstance(payload, dict) and "result" in payload:
+        return payload["result"]
+    return payload
+
+
+ADAPTERS = {
+    "identity": identity,
+    "unwrap_data": unwrap_data,
+    "unwrap_result": unwrap_result,
+}
+
+
+def get_endpoints(cmd_info):
+    """Ordered endpoint list of a COMMANDS entry.
+
+    Entries may define "endpoints": [{"url": ..., "adapter": ...}, ...]; a
+    plain "url" is treated as a single endpoint with the identity adapter.
+    """
+    endpoints = cmd_info.get("endpoints")
+    if endpoints:
+        return endpoints
+    return [{"url": cmd_info["url"]}]
+
+
+def adapt(endpoint, payload):
+    return ADAPTERS[endpoint.get("adapter", "identity")](payload)
+
+
+# ==================== SELECTION ====================
+class EndpointSelector:
+    """Orders endpoints by expected cost: EWMA latency + failure rate * penalty.
+
+    The penalty approximates what a failed attempt costs on top of its own
+    latency (roughly one failover to the next endpoint); timeouts already
+    show up as high latency. Endpoints never tried go first (in config
+    order). With probability `explore` a random non-best endpoint is
+    promoted so a recovered provider gets noticed again.
+    """
+
+    def __init__(self, alpha=0.2, failure_penalty=2.0, explore=0.05, rng=random.random):
+        self.alpha = alpha
+        self.failure_penalty = failure_penalty
+        self.explore = explore
+        self.rng = rng
+        self._stats = {}  # url template -> [latency_ewma, success_ewma, samples]
+
+    def score(self, url):
+        stats = self._stats.get(url)
+        if stats is None:
+            return None
+        latency, success, _ = stats
+        return latency + (1.0 - success) * self.failure_penalty
+
+    def order(self, endpoints):
+        untried = [ep for ep in endpoints if ep["url"] not in self._stats]
+        tried = sorted((ep for ep in endpoints if ep["url"] in self._stats), key=lambda ep: self.score(ep["url"]))
+        if len(tried) > 1 and self.rng() < self.explore:
+            idx = 1 + int(self.rng() * (len(tried) - 1))
+            tried.insert(0, tried.pop(idx))
+        return untried + tried
+
+    def record(self, url, latency, ok):
+        stats = self._stats.get(url)
+        if stats is None:
+            self._stats[url] = [latency, 1.0 if ok else 0.0, 1]
+            return
+        a = self.alpha
+        stats[0] += a * (latency - stats[0])
+        stats[1] += a * ((1.0 if ok else 0.0) - stats[1])
+        stats[2] += 1
+
+    def snapshot(self):
+        """{url: (latency_ewma, success_ewma, samples)} for status displays."""
+        return {url: tuple(stats) for url, stats in self._stats.items()}
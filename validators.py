@@ -0,0 +1,117 @@
+# validators.py - Per-command query validation & normalization
+# Har validator raw query leta hai aur canonical string return karta hai,
+# ya None agar query invalid hai (tab upstream API call hi nahi hoti).
+
+import re
+import ipaddress
+
+_SEPARATORS = re.compile(r"[\s\-().]")
+
+_RC = re.compile(r"^(?:[A-Z]{2}\d{1,2}[A-Z]{0,3}\d{1,4}|\d{2}BH\d{4}[A-Z]{1,2})$")
+_IFSC = re.compile(r"^[A-Z]{4}0[A-Z0-9]{6}$")
+_GST = re.compile(r"^\d{2}[A-Z]{5}\d{4}[A-Z][1-9A-Z]Z[0-9A-Z]$")
+_PINCODE = re.compile(r"^[1-9]\d{5}$")
+_EMAIL = re.compile(r"^[^@\s]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)+$")
+_INSTA = re.compile(r"^[a-z0-9._]{1,30}$")
+_TG_USERNAME = re.compile(r"^[a-z][a-z0-9_]{3,31}$")
+_GITHUB = re.compile(r"^[a-z0-9](?:[a-z0-9-]{0,38})$")
+
+
+def indian_mobile(query):
+    digits = _SEPARATORS.sub("", query).lstrip("+")
+    if len(digits) == 12 and digits.startswith("91"):
+        digits = digits[2:]
+    elif len(digits) == 11 and digits.startswith("0"):
+        digits = digits[1:]
+    return digits if len(digits) == 10 and digits.isdigit() and digits[0] in "6789" else None
+
+
+def pakistan_number(query):
+    digits = _SEPARATORS.sub("", query).lstrip("+")
+    return digits if digits.isdigit() and 10 <= len(digits) <= 12 else None
+
+
+def numeric_id(query):
+    q = query.strip()
+    return q if q.isdigit() and 5 <= len(q) <= 15 else None
+
+
+def rc_number(query):
+    rc = _SEPARATORS.sub("", query).upper()
+    return rc if _RC.match(rc) else None
+
+
+def ip_address(query):
+    try:
+        ip = ipaddress.ip_address(query.strip())
+    except ValueError:
+        return None
+    if ip.version == 6 and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    return str(ip)
+
+
+def email(query):
+    q = query.strip().lower()
+    return q if _EMAIL.match(q) else None
+
+
+def pincode(query):
+    q = _SEPARATORS.sub("", query)
+    return q if _PINCODE.match(q) else None
+
+
+def ifsc(query):
+    q = query.strip().upper()
+    return q if _IFSC.match(q) else None
+
+
+def gst(query):
+    q = _SEPARATORS.sub("", query).upper()
+    return q if _GST.match(q) else None
+
+
+def instagram_username(query):
+    q = query.strip().lstrip("@").lower()
+    return q if _INSTA.match(q) else None
+
+
+def telegram_user(query):
+    q = query.strip().lstrip("@")
+    if q.isdigit():
+        return numeric_id(q)
+    q = q.lower()
+    return q if _TG_USERNAME.match(q) else None
+
+
+def github_username(query):
+    q = query.strip().lstrip("@").lower()
+    return q if _GITHUB.match(q) else None
+
+
+VALIDATORS = {
+    "indian_mobile": indian_mobile,
+    "pakistan_number": pakistan_number,
+    "numeric_id": numeric_id,
+    "rc_number": rc_number,
+    "ip_address": ip_address,
+    "email": email,
+    "pincode": pincode,
+    "ifsc": ifsc,
+    "gst": gst,
+    "instagram_username": instagram_username,
+    "telegram_user": telegram_user,
+    "github_username": github_username,
+}
+
+
+def normalize_query(cmd_info, query):
+    """Canonical query for cmd_info, or None if it fails validation.
+
+    Commands without a "validator" key only get surrounding whitespace stripped.
+    """
+    name = cmd_info.get("validator")
+    if not name:
+        q = query.strip()
+        return q or None
+    return VALIDATORS[name](query)